@@ -1,15 +1,26 @@
 # app.py
 
+import os
+from functools import lru_cache
+
 import dash
 from dash import dcc, html
 import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output, State, ALL
+from dash.exceptions import PreventUpdate
 
 # Import components
 from app.components.compound_viewer import CompoundViewer, create_compound_batch_viewer
+from app.components.compound_grid import CompoundGrid
+from app.components.compound_search import CompoundSearch
+from app.components.dashboard_widgets import DashboardWidgets
+from app.components.series_browser import SeriesBrowser
 from app.components.structure_viewer import StructureViewer
+from app.components.structure_comparison import StructureComparison
+from app.components.batch_structure_upload import BatchStructureUpload
 from app.components.file_upload import FileUploadComponent
 from app.components.relationship_manager import RelationshipManager
+from app.components.target_browser import TargetBrowser
 
 # Import database models and functions
 from app.models.database import get_session, init_db
@@ -17,6 +28,8 @@ from app.models.targets import Target
 from app.models.diseases import Disease
 from app.models.compounds import Compound, CompoundActivity
 from app.models.structures import Structure
+from app.services.callback_metrics import init_callback_metrics
+from app.services.query_audit import init_query_audit
 
 # Initialize the app
 app = dash.Dash(
@@ -25,17 +38,30 @@ app = dash.Dash(
         dbc.themes.BOOTSTRAP,
         "https://use.fontawesome.com/releases/v5.15.4/css/all.css"
     ],
+    assets_folder=os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "assets"),
     suppress_callback_exceptions=True
 )
 
 # Initialize the database
 init_db()
 
+# Time every server callback (SQL statements, payload size); totals at /metrics
+init_callback_metrics(app)
+# Report repeated (N+1) queries per request when N_PLUS_ONE_MODE is warn or raise
+init_query_audit(app)
+
 # Initialize components
+dashboard_widgets = DashboardWidgets(app)
 compound_viewer = CompoundViewer(app)
+compound_grid = CompoundGrid(app)
+compound_search = CompoundSearch(app)
+series_browser = SeriesBrowser(app)
 structure_viewer = StructureViewer(app)
+structure_comparison = StructureComparison(app, structure_viewer)
+batch_structure_upload = BatchStructureUpload(app)
 file_upload = FileUploadComponent(app)
 relationship_manager = RelationshipManager(app)
+target_browser = TargetBrowser(app)
 
 # Define the layout
 app.layout = html.Div([
@@ -86,361 +112,472 @@ app.layout = html.Div([
     ], fluid=True)
 ])
 
-# Define callback to update page content based on URL
-@app.callback(
-    Output("page-content", "children"),
-    [Input("url", "pathname")]
-)
-def render_page_content(pathname):
-    """Render different content based on the URL pathname."""
-    
-    if pathname == "/" or pathname == "":
-        # Dashboard page
-        return html.Div([
-            html.H2("Drug Target Dashboard"),
-            html.Hr(),
+# Page layouts
+#
+# Page skeletons are built once per process. Tabs start out as empty
+# containers and get their contents from load_page_tab() when first
+# activated, so a navigation only sends the skeleton plus the open tab.
+# Tab contents without database lookups are built once as well; the rest
+# (target/disease/compound dropdown options) are rebuilt on activation.
+
+def _dashboard_page():
+    return html.Div([
+        html.H2("Drug Target Dashboard"),
+        html.Hr(),
+        
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Top Targets"),
+                    dbc.CardBody([
+                        html.Div(id="top-targets-list")
+                    ])
+                ])
+            ], md=6),
             
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Recent Compounds"),
+                    dbc.CardBody([
+                        html.Div(id="recent-compounds-list")
+                    ])
+                ])
+            ], md=6)
+        ]),
+        
+        html.Div(className="mt-4"),
+        
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Featured Structure"),
+                    dbc.CardBody([
+                        html.Div(id="featured-structure")
+                    ])
+                ])
+            ], md=12)
+        ])
+    ])
+
+def _targets_target_list_tab():
+    return [
+        html.Div(className="mt-3"),
+        target_browser.render()
+    ]
+
+def _targets_add_target_tab():
+    return [
+        html.Div(className="mt-3"),
+        html.H4("Add New Target"),
+        dbc.Form([
             dbc.Row([
                 dbc.Col([
-                    dbc.Card([
-                        dbc.CardHeader("Top Targets"),
-                        dbc.CardBody([
-                            html.Div(id="top-targets-list")
-                        ])
-                    ])
+                    dbc.Label("Target Name *"),
+                    dbc.Input(id="target-name-input", type="text", placeholder="Enter target name")
                 ], md=6),
-                
                 dbc.Col([
-                    dbc.Card([
-                        dbc.CardHeader("Recent Compounds"),
-                        dbc.CardBody([
-                            html.Div(id="recent-compounds-list")
-                        ])
-                    ])
+                    dbc.Label("Category"),
+                    dbc.Input(id="target-category-input", type="text", placeholder="e.g., Kinase, GPCR")
                 ], md=6)
             ]),
             
-            html.Div(className="mt-4"),
+            html.Div(className="mt-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Validation Status"),
+                    dbc.Select(
+                        id="target-validation-input",
+                        options=[
+                            {"label": "Validated", "value": "Validated"},
+                            {"label": "Emerging", "value": "Emerging"},
+                            {"label": "Putative", "value": "Putative"}
+                        ]
+                    )
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Priority"),
+                    dbc.Select(
+                        id="target-priority-input",
+                        options=[
+                            {"label": "High", "value": "High"},
+                            {"label": "Medium", "value": "Medium"},
+                            {"label": "Low", "value": "Low"}
+                        ]
+                    )
+                ], md=6)
+            ]),
             
+            html.Div(className="mt-3"),
             dbc.Row([
                 dbc.Col([
-                    dbc.Card([
-                        dbc.CardHeader("Featured Structure"),
-                        dbc.CardBody([
-                            html.Div(id="featured-structure")
-                        ])
-                    ])
+                    dbc.Label("Description"),
+                    dbc.Textarea(
+                        id="target-description-input",
+                        placeholder="Enter target description",
+                        style={"height": "150px"}
+                    )
                 ], md=12)
-            ])
-        ])
-    
-    elif pathname == "/targets":
-        # Targets page
-        return html.Div([
-            html.H2("Targets"),
-            html.Hr(),
+            ]),
             
-            dbc.Tabs([
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    html.Div(id="targets-list")
-                ], label="Target List"),
-                
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    html.H4("Add New Target"),
-                    dbc.Form([
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Target Name *"),
-                                dbc.Input(id="target-name-input", type="text", placeholder="Enter target name")
-                            ], md=6),
-                            dbc.Col([
-                                dbc.Label("Category"),
-                                dbc.Input(id="target-category-input", type="text", placeholder="e.g., Kinase, GPCR")
-                            ], md=6)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Validation Status"),
-                                dbc.Select(
-                                    id="target-validation-input",
-                                    options=[
-                                        {"label": "Validated", "value": "Validated"},
-                                        {"label": "Emerging", "value": "Emerging"},
-                                        {"label": "Putative", "value": "Putative"}
-                                    ]
-                                )
-                            ], md=6),
-                            dbc.Col([
-                                dbc.Label("Priority"),
-                                dbc.Select(
-                                    id="target-priority-input",
-                                    options=[
-                                        {"label": "High", "value": "High"},
-                                        {"label": "Medium", "value": "Medium"},
-                                        {"label": "Low", "value": "Low"}
-                                    ]
-                                )
-                            ], md=6)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Description"),
-                                dbc.Textarea(
-                                    id="target-description-input",
-                                    placeholder="Enter target description",
-                                    style={"height": "150px"}
-                                )
-                            ], md=12)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Mechanism"),
-                                dbc.Textarea(
-                                    id="target-mechanism-input",
-                                    placeholder="Enter target mechanism",
-                                    style={"height": "150px"}
-                                )
-                            ], md=12)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Button("Add Target", id="add-target-btn", color="primary"),
-                        html.Div(id="add-target-output", className="mt-3")
-                    ])
-                ], label="Add Target")
-            ])
-        ])
-    
-    elif pathname == "/diseases":
-        # Diseases page
-        return html.Div([
-            html.H2("Diseases"),
-            html.Hr(),
+            html.Div(className="mt-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Mechanism"),
+                    dbc.Textarea(
+                        id="target-mechanism-input",
+                        placeholder="Enter target mechanism",
+                        style={"height": "150px"}
+                    )
+                ], md=12)
+            ]),
             
-            dbc.Tabs([
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    html.Div(id="diseases-list")
-                ], label="Disease List"),
-                
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    html.H4("Add New Disease"),
-                    dbc.Form([
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Disease Name *"),
-                                dbc.Input(id="disease-name-input", type="text", placeholder="Enter disease name")
-                            ], md=6),
-                            dbc.Col([
-                                dbc.Label("Category"),
-                                dbc.Input(id="disease-category-input", type="text", placeholder="e.g., Infectious, Neurological")
-                            ], md=6)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Etiology"),
-                                dbc.Textarea(
-                                    id="disease-etiology-input",
-                                    placeholder="Enter disease etiology",
-                                    style={"height": "120px"}
-                                )
-                            ], md=12)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Prevalence"),
-                                dbc.Input(id="disease-prevalence-input", type="text", placeholder="e.g., 1 in 1000")
-                            ], md=12)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Treatment Landscape"),
-                                dbc.Textarea(
-                                    id="disease-treatment-input",
-                                    placeholder="Enter treatment landscape",
-                                    style={"height": "120px"}
-                                )
-                            ], md=12)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Button("Add Disease", id="add-disease-btn", color="primary"),
-                        html.Div(id="add-disease-output", className="mt-3")
-                    ])
-                ], label="Add Disease")
-            ])
+            html.Div(className="mt-3"),
+            dbc.Button("Add Target", id="add-target-btn", color="primary"),
+            html.Div(id="add-target-output", className="mt-3")
         ])
-    
-    elif pathname == "/compounds":
-        # Compounds page
-        return html.Div([
-            html.H2("Compounds"),
-            html.Hr(),
+    ]
+
+def _diseases_disease_list_tab():
+    return [
+        html.Div(className="mt-3"),
+        html.Div(id="diseases-list")
+    ]
+
+def _diseases_add_disease_tab():
+    return [
+        html.Div(className="mt-3"),
+        html.H4("Add New Disease"),
+        dbc.Form([
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Disease Name *"),
+                    dbc.Input(id="disease-name-input", type="text", placeholder="Enter disease name")
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Category"),
+                    dbc.Input(id="disease-category-input", type="text", placeholder="e.g., Infectious, Neurological")
+                ], md=6)
+            ]),
             
-            dbc.Tabs([
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    html.Div(id="compounds-list")
-                ], label="Compound List"),
-                
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    html.H4("Add New Compound"),
-                    dbc.Form([
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Compound Name *"),
-                                dbc.Input(id="compound-name-input", type="text", placeholder="Enter compound name")
-                            ], md=6),
-                            dbc.Col([
-                                dbc.Label("Molecular Formula"),
-                                dbc.Input(id="compound-formula-input", type="text", placeholder="e.g., C9H8O4")
-                            ], md=6)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("SMILES String"),
-                                dbc.Input(id="compound-smiles-input", type="text", placeholder="Enter SMILES notation")
-                            ], md=12)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Development Stage"),
-                                dbc.Select(
-                                    id="compound-stage-input",
-                                    options=[
-                                        {"label": "Discovery", "value": "Discovery"},
-                                        {"label": "Preclinical", "value": "Preclinical"},
-                                        {"label": "Phase I", "value": "Phase I"},
-                                        {"label": "Phase II", "value": "Phase II"},
-                                        {"label": "Phase III", "value": "Phase III"},
-                                        {"label": "Approved", "value": "Approved"}
-                                    ]
-                                )
-                            ], md=6)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        compound_viewer.render(),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Button("Add Compound", id="add-compound-btn", color="primary"),
-                        html.Div(id="add-compound-output", className="mt-3")
-                    ])
-                ], label="Add Compound")
-            ])
-        ])
-    
-    elif pathname == "/structures":
-        # Structures page
-        return html.Div([
-            html.H2("Protein Structures"),
-            html.Hr(),
+            html.Div(className="mt-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Etiology"),
+                    dbc.Textarea(
+                        id="disease-etiology-input",
+                        placeholder="Enter disease etiology",
+                        style={"height": "120px"}
+                    )
+                ], md=12)
+            ]),
             
-            dbc.Tabs([
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    html.Div(id="structures-list")
-                ], label="Structure List"),
-                
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    html.H4("Add New Structure"),
-                    dbc.Form([
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Target"),
-                                dcc.Dropdown(
-                                    id="structure-target-dropdown",
-                                    options=relationship_manager._get_target_options(),
-                                    placeholder="Select a target..."
-                                )
-                            ], md=6),
-                            dbc.Col([
-                                dbc.Label("PDB ID"),
-                                dbc.Input(id="structure-pdb-id-input", type="text", placeholder="e.g., 1XYZ")
-                            ], md=6)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Label("Resolution (Å)"),
-                                dbc.Input(id="structure-resolution-input", type="number", step="0.1", placeholder="e.g., 2.1")
-                            ], md=6)
-                        ]),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Label("Upload PDB File"),
-                        file_upload.render_upload(id_prefix="structure-pdb", upload_type="pdb"),
-                        
-                        html.Div(className="mt-3"),
-                        dbc.Button("Add Structure", id="add-structure-btn", color="primary"),
-                        html.Div(id="add-structure-output", className="mt-3")
-                    ]),
-                    
-                    html.Div(className="mt-4"),
-                    structure_viewer.render()
-                ], label="Add Structure")
-            ])
-        ])
-    
-    elif pathname == "/relationships":
-        # Relationships page
-        return html.Div([
-            html.H2("Relationship Management"),
-            html.Hr(),
+            html.Div(className="mt-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Prevalence"),
+                    dbc.Input(id="disease-prevalence-input", type="text", placeholder="e.g., 1 in 1000")
+                ], md=12)
+            ]),
             
-            dbc.Tabs([
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    relationship_manager.render_target_disease_manager()
-                ], label="Target-Disease"),
-                
-                dbc.Tab([
-                    html.Div(className="mt-3"),
-                    relationship_manager.render_compound_activity_manager()
-                ], label="Compound Activities")
-            ])
+            html.Div(className="mt-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Treatment Landscape"),
+                    dbc.Textarea(
+                        id="disease-treatment-input",
+                        placeholder="Enter treatment landscape",
+                        style={"height": "120px"}
+                    )
+                ], md=12)
+            ]),
+            
+            html.Div(className="mt-3"),
+            dbc.Button("Add Disease", id="add-disease-btn", color="primary"),
+            html.Div(id="add-disease-output", className="mt-3")
         ])
-    
-    elif pathname == "/import-export":
-        # Import/Export page
-        return html.Div([
-            html.H2("Data Import & Export"),
-            html.Hr(),
+    ]
+
+def _compounds_compound_list_tab():
+    return [
+        html.Div(className="mt-3"),
+        compound_grid.render()
+    ]
+
+def _compounds_structure_search_tab():
+    return [
+        html.Div(className="mt-3"),
+        compound_search.render()
+    ]
+
+def _compounds_series_tab():
+    return [
+        html.Div(className="mt-3"),
+        series_browser.render()
+    ]
+
+def _compounds_add_compound_tab():
+    return [
+        html.Div(className="mt-3"),
+        html.H4("Add New Compound"),
+        dbc.Form([
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Compound Name *"),
+                    dbc.Input(id="compound-name-input", type="text", placeholder="Enter compound name")
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Molecular Formula"),
+                    dbc.Input(id="compound-formula-input", type="text", placeholder="e.g., C9H8O4")
+                ], md=6)
+            ]),
+            
+            html.Div(className="mt-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("SMILES String"),
+                    dbc.Input(id="compound-smiles-input", type="text", placeholder="Enter SMILES notation")
+                ], md=12)
+            ]),
+            
+            html.Div(className="mt-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Development Stage"),
+                    dbc.Select(
+                        id="compound-stage-input",
+                        options=[
+                            {"label": "Discovery", "value": "Discovery"},
+                            {"label": "Preclinical", "value": "Preclinical"},
+                            {"label": "Phase I", "value": "Phase I"},
+                            {"label": "Phase II", "value": "Phase II"},
+                            {"label": "Phase III", "value": "Phase III"},
+                            {"label": "Approved", "value": "Approved"}
+                        ]
+                    )
+                ], md=6)
+            ]),
+            
+            html.Div(className="mt-3"),
+            compound_viewer.render(),
             
-            file_upload.render_data_import_export()
+            html.Div(className="mt-3"),
+            dbc.Button("Add Compound", id="add-compound-btn", color="primary"),
+            html.Div(id="add-compound-output", className="mt-3")
         ])
+    ]
+
+def _structures_structure_list_tab():
+    return [
+        html.Div(className="mt-3"),
+        html.Div(id="structures-list")
+    ]
+
+def _structures_add_structure_tab():
+    return [
+        html.Div(className="mt-3"),
+        html.H4("Add New Structure"),
+        dbc.Form([
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Target"),
+                    dcc.Dropdown(
+                        id="structure-target-dropdown",
+                        options=relationship_manager._get_target_options(),
+                        placeholder="Select a target..."
+                    )
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("PDB ID"),
+                    dbc.Input(id="structure-pdb-id-input", type="text", placeholder="e.g., 1XYZ")
+                ], md=6)
+            ]),
+            
+            html.Div(className="mt-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Resolution (Å)"),
+                    dbc.Input(id="structure-resolution-input", type="number", step="0.1", placeholder="e.g., 2.1")
+                ], md=6)
+            ]),
+            
+            html.Div(className="mt-3"),
+            dbc.Label("Upload PDB File"),
+            file_upload.render_upload(id_prefix="structure-pdb", upload_type="pdb"),
+            
+            html.Div(className="mt-3"),
+            dbc.Button("Add Structure", id="add-structure-btn", color="primary"),
+            html.Div(id="add-structure-output", className="mt-3")
+        ]),
+        
+        html.Div(className="mt-4"),
+        structure_viewer.render()
+    ]
+
+def _structures_compare_structures_tab():
+    return [
+        html.Div(className="mt-3"),
+        structure_comparison.render(
+            target_options=relationship_manager._get_target_options()
+        )
+    ]
+
+def _structures_batch_upload_tab():
+    return [
+        html.Div(className="mt-3"),
+        batch_structure_upload.render()
+    ]
+
+def _relationships_target_disease_tab():
+    return [
+        html.Div(className="mt-3"),
+        relationship_manager.render_target_disease_manager()
+    ]
+
+def _relationships_compound_activities_tab():
+    return [
+        html.Div(className="mt-3"),
+        relationship_manager.render_compound_activity_manager()
+    ]
+
+def _relationships_bulk_activity_entry_tab():
+    return [
+        html.Div(className="mt-3"),
+        relationship_manager.render_bulk_activity_entry()
+    ]
+
+def _import_export_page():
+    return html.Div([
+        html.H2("Data Import & Export"),
+        html.Hr(),
+        
+        file_upload.render_data_import_export()
+    ])
+
+# Pathname -> (title, [(tab ID, label), ...])
+PAGE_TABS = {
+    "/targets": ("Targets", [
+        ("targets-target-list-tab", "Target List"),
+        ("targets-add-target-tab", "Add Target")
+    ]),
+    "/diseases": ("Diseases", [
+        ("diseases-disease-list-tab", "Disease List"),
+        ("diseases-add-disease-tab", "Add Disease")
+    ]),
+    "/compounds": ("Compounds", [
+        ("compounds-compound-list-tab", "Compound List"),
+        ("compounds-structure-search-tab", "Structure Search"),
+        ("compounds-series-tab", "Series"),
+        ("compounds-add-compound-tab", "Add Compound")
+    ]),
+    "/structures": ("Protein Structures", [
+        ("structures-structure-list-tab", "Structure List"),
+        ("structures-add-structure-tab", "Add Structure"),
+        ("structures-compare-structures-tab", "Compare Structures"),
+        ("structures-batch-upload-tab", "Batch Upload")
+    ]),
+    "/relationships": ("Relationship Management", [
+        ("relationships-target-disease-tab", "Target-Disease"),
+        ("relationships-compound-activities-tab", "Compound Activities"),
+        ("relationships-bulk-activity-entry-tab", "Bulk Activity Entry")
+    ])
+}
+
+# Tab ID -> (content builder, static); static contents are built once
+TAB_CONTENT = {
+    "targets-target-list-tab": (_targets_target_list_tab, True),
+    "targets-add-target-tab": (_targets_add_target_tab, True),
+    "diseases-disease-list-tab": (_diseases_disease_list_tab, True),
+    "diseases-add-disease-tab": (_diseases_add_disease_tab, True),
+    "compounds-compound-list-tab": (_compounds_compound_list_tab, True),
+    "compounds-structure-search-tab": (_compounds_structure_search_tab, True),
+    "compounds-series-tab": (_compounds_series_tab, True),
+    "compounds-add-compound-tab": (_compounds_add_compound_tab, True),
+    "structures-structure-list-tab": (_structures_structure_list_tab, True),
+    "structures-add-structure-tab": (_structures_add_structure_tab, False),
+    "structures-compare-structures-tab": (_structures_compare_structures_tab, False),
+    "structures-batch-upload-tab": (_structures_batch_upload_tab, True),
+    "relationships-target-disease-tab": (_relationships_target_disease_tab, False),
+    "relationships-compound-activities-tab": (_relationships_compound_activities_tab, False),
+    "relationships-bulk-activity-entry-tab": (_relationships_bulk_activity_entry_tab, True)
+}
+
+@lru_cache(maxsize=None)
+def _static_tab_content(tab_id):
+    return TAB_CONTENT[tab_id][0]()
+
+def render_tab_content(tab_id):
+    """Contents of one page tab."""
+    builder, static = TAB_CONTENT[tab_id]
+    return _static_tab_content(tab_id) if static else builder()
+
+@lru_cache(maxsize=None)
+def page_layout(pathname):
+    """
+    Layout skeleton of a page, built once per process.
+    
+    Returns:
+        The page component, or None for an unknown pathname
+    """
+    if pathname in ("/", ""):
+        return _dashboard_page()
+    if pathname == "/import-export":
+        return _import_export_page()
+    if pathname not in PAGE_TABS:
+        return None
+    
+    title, tabs = PAGE_TABS[pathname]
+    return html.Div([
+        html.H2(title),
+        html.Hr(),
+        
+        dbc.Tabs([
+            dbc.Tab(html.Div(id={"type": "page-tab", "tab": tab_id}), label=label, tab_id=tab_id)
+            for tab_id, label in tabs
+        ], id="page-tabs", active_tab=tabs[0][0]),
+        # IDs of the tabs whose contents were already sent
+        dcc.Store(id="page-tabs-loaded", data=[])
+    ])
+
+# Define callback to update page content based on URL
+@app.callback(
+    Output("page-content", "children"),
+    [Input("url", "pathname")]
+)
+def render_page_content(pathname):
+    """Render different content based on the URL pathname."""
+    layout = page_layout(pathname)
+    if layout is not None:
+        return layout
     
     # If the user tries to reach a different page, return a 404 message
-    return dbc.Jumbotron(
+    return html.Div(
         [
             html.H1("404: Not found", className="text-danger"),
             html.Hr(),
             html.P(f"The pathname {pathname} was not recognized...")
-        ]
+        ],
+        className="p-5 bg-light rounded-3"
     )
 
+# Define callback to fill a page tab when it is first opened
+@app.callback(
+    [Output({"type": "page-tab", "tab": ALL}, "children"),
+     Output("page-tabs-loaded", "data")],
+    [Input("page-tabs", "active_tab")],
+    [State({"type": "page-tab", "tab": ALL}, "id"),
+     State("page-tabs-loaded", "data")]
+)
+def load_page_tab(active_tab, tab_ids, loaded):
+    """Send the contents of the active tab once; tabs keep their state afterwards."""
+    loaded = loaded or []
+    if active_tab not in TAB_CONTENT or active_tab in loaded:
+        raise PreventUpdate
+    
+    return [
+        render_tab_content(active_tab) if tab_id["tab"] == active_tab else dash.no_update
+        for tab_id in tab_ids
+    ], loaded + [active_tab]
+
 # Define callback to update quick stats
 @app.callback(
     Output("quick-stats", "children"),
@@ -0,0 +1,56 @@
+/*
+ * Lazy loading for compound tiles.
+ *
+ * Tiles built by app/components/compound_grid.py carry their image URL in
+ * data-src; the URL is only copied to src once the tile comes close to the
+ * viewport, so off-screen molecules are never requested.
+ */
+(function () {
+    var SELECTOR = "img.lazy-molecule[data-src]";
+
+    function load(img) {
+        img.src = img.getAttribute("data-src");
+        img.removeAttribute("data-src");
+    }
+
+    var observer = "IntersectionObserver" in window
+        ? new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    load(entry.target);
+                }
+            });
+        }, {rootMargin: "200px 0px"})
+        : null;
+
+    function watch(root) {
+        var images = root.querySelectorAll ? root.querySelectorAll(SELECTOR) : [];
+        Array.prototype.forEach.call(images, function (img) {
+            if (observer) {
+                observer.observe(img);
+            } else {
+                load(img);
+            }
+        });
+    }
+
+    // Dash adds tiles after page load, so watch for new ones
+    new MutationObserver(function (mutations) {
+        mutations.forEach(function (mutation) {
+            if (mutation.type === "attributes") {
+                watch(mutation.target.parentNode || document);
+            }
+            mutation.addedNodes.forEach(function (node) {
+                if (node.nodeType === 1) {
+                    watch(node.parentNode || node);
+                }
+            });
+        });
+    }).observe(document.documentElement, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ["data-src"]
+    });
+})();
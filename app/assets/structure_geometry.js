@@ -0,0 +1,160 @@
+/*
+ * Binary structure geometry loader.
+ *
+ * StructureViewer serves parsed structures as gzip-compressed typed-array
+ * buffers (see app/services/structure_geometry.py). These clientside
+ * callbacks fetch a buffer, decode it and build Molecule3dViewer
+ * modelData/styles in the browser, so coordinates never travel through a
+ * Dash callback response as JSON.
+ */
+(function () {
+    var MAGIC = "DTG1";
+    var TYPED_ARRAYS = {
+        float32: Float32Array,
+        int32: Int32Array,
+        uint8: Uint8Array,
+        uint16: Uint16Array,
+        uint32: Uint32Array
+    };
+
+    /* Keep in sync with the SS_* codes in app/services/structure_features.py */
+    var SS_COLORS = ["#BDC3C7", "#E74C3C", "#F39C12", "#3498DB"];
+    var MODEL_COLORS = ["#3498DB", "#E74C3C"];
+    var CHAIN_COLORS = [
+        "#320000", "#8a2be2", "#ff4500", "#00bfff", "#ff00ff", "#ffff00",
+        "#4682b4", "#ffb6c1", "#a52aaa", "#ee82ee", "#75FF33", "#FFBD33"
+    ];
+    var ATOM_COLORS = {
+        C: "#c8c8c8", H: "#ffffff", N: "#8f8fff", S: "#ffc832", O: "#f00000",
+        F: "#ffff00", P: "#ffa500", K: "#42f4ee"
+    };
+    var DEFAULT_ATOM_COLOR = "#3f3f3f";
+
+    var EMPTY_MODEL = {atoms: [], bonds: []};
+    var MAX_CACHED = 8;
+    var cache = new Map();
+
+    function decode(buffer) {
+        var magic = String.fromCharCode.apply(null, new Uint8Array(buffer, 0, 4));
+        if (magic !== MAGIC) {
+            throw new Error("Unexpected structure geometry format");
+        }
+        var headerLength = new DataView(buffer).getUint32(4, true);
+        var header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+        var base = 8 + headerLength;
+
+        var arrays = {};
+        header.buffers.forEach(function (spec) {
+            arrays[spec.name] = new TYPED_ARRAYS[spec.dtype](buffer, base + spec.offset, spec.length);
+        });
+        return {header: header, arrays: arrays};
+    }
+
+    function toModelData(geometry) {
+        var header = geometry.header;
+        var arrays = geometry.arrays;
+        var tables = header.tables;
+        var positions = arrays.positions;
+
+        var atoms = new Array(header.n_atoms);
+        for (var i = 0; i < header.n_atoms; i++) {
+            atoms[i] = {
+                serial: i,
+                name: tables.atom_names[arrays.atom_names[i]],
+                elem: tables.elements[arrays.elements[i]],
+                positions: [positions[3 * i], positions[3 * i + 1], positions[3 * i + 2]],
+                residue_index: arrays.residue_index[i],
+                residue_name: tables.residue_names[arrays.residue_names[i]],
+                chain: tables.chains[arrays.chains[i]]
+            };
+        }
+
+        var bonds = new Array(header.n_bonds);
+        for (var k = 0; k < header.n_bonds; k++) {
+            bonds[k] = {
+                atom1_index: arrays.bonds[2 * k],
+                atom2_index: arrays.bonds[2 * k + 1],
+                bond_order: 1
+            };
+        }
+        return {atoms: atoms, bonds: bonds};
+    }
+
+    function toStyles(geometry, colorMode) {
+        var header = geometry.header;
+        var arrays = geometry.arrays;
+        var elements = header.tables.elements;
+
+        var styles = new Array(header.n_atoms);
+        for (var i = 0; i < header.n_atoms; i++) {
+            var color;
+            if (colorMode === "chain") {
+                color = CHAIN_COLORS[arrays.chains[i] % CHAIN_COLORS.length];
+            } else if (colorMode === "element") {
+                color = ATOM_COLORS[elements[arrays.elements[i]].toUpperCase()] || DEFAULT_ATOM_COLOR;
+            } else if (colorMode === "model") {
+                color = MODEL_COLORS[arrays.model[i] % MODEL_COLORS.length];
+            } else {
+                color = SS_COLORS[arrays.secondary_structure[i]] || SS_COLORS[0];
+            }
+            styles[i] = {
+                visualization_type: arrays.hetatm[i] ? "stick" : "cartoon",
+                color: color
+            };
+        }
+        return styles;
+    }
+
+    function getGeometry(url) {
+        if (cache.has(url)) {
+            return cache.get(url);
+        }
+        var promise = fetch(url)
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error("Failed to load structure geometry: " + response.status);
+                }
+                return response.arrayBuffer();
+            })
+            .then(function (buffer) {
+                var geometry = decode(buffer);
+                geometry.modelData = toModelData(geometry);
+                return geometry;
+            });
+        promise.catch(function () {
+            cache.delete(url);
+        });
+
+        cache.set(url, promise);
+        if (cache.size > MAX_CACHED) {
+            cache.delete(cache.keys().next().value);
+        }
+        return promise;
+    }
+
+    function loadGeometry(url, colorMode) {
+        var dc = window.dash_clientside;
+        if (!url) {
+            return [EMPTY_MODEL, []];
+        }
+
+        // A colour change alone only needs new styles, not new model data
+        var triggered = (dc.callback_context && dc.callback_context.triggered) || [];
+        var colorOnly = triggered.length > 0 && triggered.every(function (t) {
+            return t.prop_id.endsWith(".value");
+        });
+
+        return getGeometry(url).then(function (geometry) {
+            return [colorOnly ? dc.no_update : geometry.modelData, toStyles(geometry, colorMode)];
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        structure_viewer: {
+            load_geometry: loadGeometry,
+            load_overlay: function (url) {
+                return loadGeometry(url, "model");
+            }
+        }
+    });
+})();
@@ -0,0 +1,43 @@
+/*
+ * Clientside callbacks for pure-UI interactions.
+ *
+ * Opening and closing modals or echoing a selected file name only changes
+ * component state, so these run in the browser instead of queueing behind
+ * database callbacks on the server workers. `python manage.py
+ * check-callbacks` lists server callbacks that could move here.
+ */
+(function () {
+    /* Keep in sync with ARCHIVE_EXTENSIONS in app/components/batch_structure_upload.py */
+    var ARCHIVE_EXTENSIONS = [".zip", ".tar", ".tar.gz", ".tgz"];
+    var INFO_CLASS = "mt-2 small text-muted";
+    var ERROR_CLASS = "mt-2 alert alert-danger";
+
+    function showFilename(filename) {
+        if (!filename) {
+            return ["", INFO_CLASS];
+        }
+        return ["Selected: " + filename, INFO_CLASS];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        ui: {
+            /* Flip is_open when any of the open/close buttons was clicked */
+            toggle_modal: function () {
+                var args = Array.prototype.slice.call(arguments);
+                var isOpen = args.pop();
+                var clicked = args.some(function (n) { return n; });
+                return clicked ? !isOpen : isOpen;
+            },
+            /* [children, className] of an upload's file name line */
+            show_filename: showFilename,
+            show_archive: function (filename) {
+                var name = (filename || "").toLowerCase();
+                var isArchive = ARCHIVE_EXTENSIONS.some(function (ext) { return name.endsWith(ext); });
+                if (filename && !isArchive) {
+                    return ["Please upload a .zip or .tar(.gz) archive", ERROR_CLASS];
+                }
+                return showFilename(filename);
+            }
+        }
+    });
+})();
@@ -0,0 +1,220 @@
+# components/batch_structure_upload.py
+
+import os
+import base64
+import datetime
+import dash
+from dash import dcc, html, dash_table
+import dash_bootstrap_components as dbc
+from dash.dependencies import Input, Output, State, ClientsideFunction
+
+from app.services.jobs import get_job, start_job
+from app.services.structure_ingest import ingest_structure_archive
+
+# Keep in sync with ARCHIVE_EXTENSIONS in assets/ui_callbacks.js
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+class BatchStructureUpload:
+    """
+    Component for importing many structure files at once.
+
+    An uploaded ZIP/tar archive is ingested in a background job: files are
+    parsed in parallel, matched to targets (via an optional mapping CSV or
+    their PDB ID) and bulk-inserted. The page polls the job for progress and
+    per-file status.
+    """
+    def __init__(self, app, upload_folder="uploads"):
+        self.app = app
+        self.upload_folder = upload_folder
+        os.makedirs(os.path.join(upload_folder, 'imports'), exist_ok=True)
+        self.register_callbacks()
+
+    def render(self, id_prefix="batch-structure"):
+        """
+        Render the batch upload component.
+
+        Args:
+            id_prefix: Prefix for component IDs
+        """
+        upload_style = {
+            'width': '100%',
+            'height': '60px',
+            'lineHeight': '60px',
+            'borderWidth': '1px',
+            'borderStyle': 'dashed',
+            'borderRadius': '5px',
+            'textAlign': 'center'
+        }
+
+        return html.Div([
+            dbc.Card([
+                dbc.CardHeader("Batch Structure Upload"),
+                dbc.CardBody([
+                    dbc.Label("Structure archive (.zip, .tar, .tar.gz)"),
+                    dcc.Upload(
+                        id=f"{id_prefix}-archive-upload",
+                        children=html.Div([
+                            html.I(className="fas fa-file-archive me-2"),
+                            'Drag and Drop or ',
+                            html.A('Select Archive')
+                        ]),
+                        style=upload_style,
+                        multiple=False,
+                        accept=','.join(ARCHIVE_EXTENSIONS)
+                    ),
+                    html.Div(id=f"{id_prefix}-archive-info", className="mt-2"),
+
+                    html.Div(className="mt-3"),
+                    dbc.Label("Target mapping CSV (optional)"),
+                    html.P(
+                        "Columns: 'file' or 'pdb_id', and 'target_id' or 'target'. "
+                        "Without a mapping, files are matched to targets that already "
+                        "have a structure with the same PDB ID.",
+                        className="text-muted small"
+                    ),
+                    dcc.Upload(
+                        id=f"{id_prefix}-mapping-upload",
+                        children=html.Div([
+                            html.I(className="fas fa-file-csv me-2"),
+                            'Drag and Drop or ',
+                            html.A('Select CSV')
+                        ]),
+                        style=upload_style,
+                        multiple=False,
+                        accept='.csv'
+                    ),
+                    html.Div(id=f"{id_prefix}-mapping-info", className="mt-2"),
+
+                    html.Div(className="mt-3"),
+                    dbc.Button("Start Import", id=f"{id_prefix}-start-btn", color="primary"),
+                    html.Div(id=f"{id_prefix}-status", className="mt-3"),
+                    html.Div(id=f"{id_prefix}-results", className="mt-3"),
+                    dcc.Store(id=f"{id_prefix}-job-id"),
+                    dcc.Interval(id=f"{id_prefix}-poll", interval=1000, disabled=True)
+                ])
+            ])
+        ])
+
+    def register_callbacks(self):
+        """Register Dash callbacks for the component."""
+        # Selected file names are shown in the browser (assets/ui_callbacks.js)
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="ui", function_name="show_archive"),
+            [Output("batch-structure-archive-info", "children"),
+             Output("batch-structure-archive-info", "className")],
+            [Input("batch-structure-archive-upload", "filename")]
+        )
+
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="ui", function_name="show_filename"),
+            [Output("batch-structure-mapping-info", "children"),
+             Output("batch-structure-mapping-info", "className")],
+            [Input("batch-structure-mapping-upload", "filename")]
+        )
+
+        @self.app.callback(
+            [Output("batch-structure-job-id", "data"),
+             Output("batch-structure-poll", "disabled"),
+             Output("batch-structure-status", "children")],
+            [Input("batch-structure-start-btn", "n_clicks")],
+            [State("batch-structure-archive-upload", "contents"),
+             State("batch-structure-archive-upload", "filename"),
+             State("batch-structure-mapping-upload", "contents")]
+        )
+        def start_import(n_clicks, contents, filename, mapping_contents):
+            if not n_clicks:
+                return None, True, None
+            if contents is None:
+                return None, True, dbc.Alert("Please select an archive first", color="warning")
+            if not filename.lower().endswith(ARCHIVE_EXTENSIONS):
+                return None, True, dbc.Alert("Please upload a .zip or .tar(.gz) archive", color="danger")
+
+            try:
+                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                clean_filename = ''.join(c for c in filename if c.isalnum() or c in ['_', '.', '-'])
+                archive_path = os.path.join(self.upload_folder, 'imports', f"{timestamp}_{clean_filename}")
+                with open(archive_path, 'wb') as f:
+                    f.write(base64.b64decode(contents.split(',')[1]))
+
+                mapping = base64.b64decode(mapping_contents.split(',')[1]) if mapping_contents else None
+
+                job_id = start_job(
+                    'structure_ingest',
+                    ingest_structure_archive,
+                    archive_path,
+                    mapping=mapping,
+                    upload_folder=os.path.join(self.upload_folder, 'structures')
+                )
+                return job_id, False, dbc.Alert(f"Importing {filename}...", color="info")
+
+            except Exception as e:
+                print(f"Error starting structure import: {e}")
+                return None, True, dbc.Alert(f"Error: {str(e)}", color="danger")
+
+        @self.app.callback(
+            [Output("batch-structure-results", "children"),
+             Output("batch-structure-poll", "disabled", allow_duplicate=True)],
+            [Input("batch-structure-poll", "n_intervals")],
+            [State("batch-structure-job-id", "data")],
+            prevent_initial_call=True
+        )
+        def poll_import(n_intervals, job_id):
+            job = get_job(job_id)
+            if job is None:
+                return None, True
+
+            return self._render_job(job), job['status'] != 'running'
+
+    def _render_job(self, job):
+        """Render progress and per-file results of an ingest job."""
+        done = job['status'] != 'running'
+        total = job['total'] or 0
+        progress = 100 if done else int(100 * job['progress'] / total) if total else 0
+
+        children = [
+            dbc.Progress(
+                value=progress,
+                label=f"{job['progress']}/{total}" if total else None,
+                striped=not done,
+                animated=not done,
+                color="danger" if job['status'] == 'failed' else "success" if done else "primary"
+            )
+        ]
+
+        if job['status'] == 'failed':
+            children.append(dbc.Alert(f"Import failed: {job['error']}", color="danger", className="mt-3"))
+        elif done and job['summary']:
+            summary = job['summary']
+            children.append(dbc.Alert(
+                f"Import finished: {summary['inserted']} added, {summary['updated']} updated, "
+                f"{summary['failed']} not imported",
+                color="success" if not summary['failed'] else "warning",
+                className="mt-3"
+            ))
+
+        if job['items']:
+            children.append(dash_table.DataTable(
+                data=job['items'],
+                columns=[
+                    {"name": "File", "id": "file"},
+                    {"name": "PDB ID", "id": "pdb_id"},
+                    {"name": "Target ID", "id": "target_id"},
+                    {"name": "Resolution (Å)", "id": "resolution"},
+                    {"name": "Status", "id": "status"},
+                    {"name": "Message", "id": "message"}
+                ],
+                style_table={"overflowX": "auto"},
+                style_cell={
+                    "textAlign": "left",
+                    "padding": "10px"
+                },
+                style_header={
+                    "backgroundColor": "rgb(230, 230, 230)",
+                    "fontWeight": "bold"
+                },
+                sort_action="native",
+                filter_action="native",
+                page_size=15
+            ))
+
+        return html.Div(children)
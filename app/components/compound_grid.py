@@ -0,0 +1,124 @@
+# components/compound_grid.py
+
+from dash import dcc, html
+import dash_bootstrap_components as dbc
+from dash.dependencies import Input, Output
+
+from app.models.compounds import Compound
+from app.models.database import get_session
+from app.services.molecule_render import molecule_image_url, prerender_molecules
+
+TILE_SIZE = 200
+PAGE_SIZES = [24, 48, 96]
+
+
+def compound_tile(name, smiles, size=TILE_SIZE):
+    """
+    Build one compound tile.
+
+    The image URL is kept in ``data-src`` and only copied to ``src`` by
+    assets/lazy_images.js once the tile scrolls into view.
+    """
+    url = molecule_image_url(smiles, size=size)
+    image = html.Img(
+        className="lazy-molecule img-fluid",
+        alt=name,
+        width=size,
+        height=size,
+        **{"data-src": url}
+    ) if url else html.Div("Invalid SMILES", className="text-muted small", style={"height": f"{size}px"})
+
+    return dbc.Col([
+        image,
+        html.P(name, className="small text-center mb-2 text-truncate", title=name)
+    ], xs=6, md=4, lg=3, className="text-center")
+
+
+class CompoundGrid:
+    """
+    Paginated grid of compound structure tiles.
+
+    Each page is queried with LIMIT/OFFSET and returned without waiting for
+    its images: the tiles of the page and the next are rendered in the
+    background in a process pool, the image route renders any tile the
+    browser asks for before that, and every tile image is cached individually.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.register_callbacks()
+
+    def render(self, id_prefix="compound-grid"):
+        """
+        Render the compound grid component.
+
+        Args:
+            id_prefix: Prefix for component IDs
+        """
+        return html.Div([
+            dbc.Row([
+                dbc.Col(html.Div(id=f"{id_prefix}-info", className="text-muted mt-2"), md=8),
+                dbc.Col([
+                    dbc.Select(
+                        id=f"{id_prefix}-page-size",
+                        options=[{"label": f"{size} per page", "value": str(size)} for size in PAGE_SIZES],
+                        value=str(PAGE_SIZES[0])
+                    )
+                ], md=4)
+            ], className="mb-3"),
+            dcc.Loading(html.Div(id=f"{id_prefix}-tiles")),
+            dbc.Pagination(
+                id=f"{id_prefix}-pagination",
+                max_value=1,
+                active_page=1,
+                fully_expanded=False,
+                first_last=True,
+                previous_next=True,
+                className="justify-content-center mt-3"
+            )
+        ])
+
+    def register_callbacks(self):
+        """Register Dash callbacks for the component."""
+        @self.app.callback(
+            [Output("compound-grid-tiles", "children"),
+             Output("compound-grid-pagination", "max_value"),
+             Output("compound-grid-info", "children")],
+            [Input("compound-grid-pagination", "active_page"),
+             Input("compound-grid-page-size", "value")]
+        )
+        def update_grid(active_page, page_size):
+            page_size = int(page_size or PAGE_SIZES[0])
+            try:
+                session = get_session()
+                total = session.query(Compound).count()
+                pages = max(1, -(-total // page_size))
+                page = min(max(active_page or 1, 1), pages)
+
+                rows = self._page_rows(session, page, page_size)
+                next_rows = self._page_rows(session, page + 1, page_size) if page < pages else []
+                session.close()
+
+                if not rows:
+                    return html.Div("No compounds to display"), pages, None
+
+                # Tiles are returned at once. This page and the next are rendered in
+                # the background; the image route renders tiles that aren't ready yet
+                prerender_molecules([smiles for _, smiles in rows], size=TILE_SIZE, timeout=0)
+                prerender_molecules([smiles for _, smiles in next_rows], size=TILE_SIZE, timeout=0)
+
+                first = (page - 1) * page_size + 1
+                return (
+                    dbc.Row([compound_tile(name, smiles) for name, smiles in rows]),
+                    pages,
+                    f"Compounds {first}-{first + len(rows) - 1} of {total}"
+                )
+
+            except Exception as e:
+                print(f"Error rendering compound grid: {e}")
+                return dbc.Alert(f"Error loading compounds: {str(e)}", color="danger"), 1, None
+
+    def _page_rows(self, session, page, page_size):
+        """(name, smiles) rows of one page, ordered by name."""
+        return session.query(Compound.name, Compound.smiles).order_by(
+            Compound.name, Compound.id
+        ).offset((page - 1) * page_size).limit(page_size).all()
@@ -0,0 +1,176 @@
+# components/compound_search.py
+
+from dash import dcc, html
+import dash_bootstrap_components as dbc
+from dash.dependencies import Input, Output, State
+from flask import jsonify, request
+
+from app.models.compounds import Compound
+from app.models.database import get_session
+from app.components.compound_grid import compound_tile
+from app.services.similarity_search import DEFAULT_K, similarity_search
+from app.services.substructure_search import substructure_search
+
+SIMILAR_API_URL = "/api/compounds/similar"
+MAX_K = 1000
+
+class CompoundSearch:
+    """
+    Component for structure searches over all compounds.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.register_callbacks()
+        self.register_routes()
+
+    def render(self, id_prefix="compound-search"):
+        """
+        Render the compound search component.
+
+        Args:
+            id_prefix: Prefix for component IDs
+        """
+        return html.Div([
+            dbc.Card([
+                dbc.CardHeader("Structure Search"),
+                dbc.CardBody([
+                    dbc.RadioItems(
+                        id=f"{id_prefix}-mode",
+                        options=[
+                            {"label": "Substructure", "value": "substructure"},
+                            {"label": "Similarity", "value": "similarity"}
+                        ],
+                        value="substructure",
+                        inline=True,
+                        className="mb-2"
+                    ),
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("Query (SMILES or SMARTS)"),
+                            dbc.Input(
+                                id=f"{id_prefix}-query-input",
+                                type="text",
+                                placeholder="e.g., c1ccc2[nH]ccc2c1"
+                            )
+                        ], md=6),
+                        dbc.Col([
+                            dbc.Label("Min. similarity"),
+                            dbc.Input(
+                                id=f"{id_prefix}-threshold",
+                                type="number",
+                                min=0,
+                                max=1,
+                                step=0.05,
+                                value=0.5
+                            )
+                        ], md=3),
+                        dbc.Col([
+                            dbc.Button(
+                                "Search",
+                                id=f"{id_prefix}-btn",
+                                color="primary",
+                                className="mt-4"
+                            )
+                        ], md=3)
+                    ]),
+                    html.Div(id=f"{id_prefix}-info", className="mt-3"),
+                    dcc.Loading(html.Div(id=f"{id_prefix}-results", className="mt-3"))
+                ])
+            ])
+        ])
+
+    def register_callbacks(self):
+        """Register Dash callbacks for the component."""
+        @self.app.callback(
+            [Output("compound-search-results", "children"),
+             Output("compound-search-info", "children")],
+            [Input("compound-search-btn", "n_clicks"),
+             Input("compound-search-query-input", "n_submit")],
+            [State("compound-search-query-input", "value"),
+             State("compound-search-mode", "value"),
+             State("compound-search-threshold", "value")]
+        )
+        def search_compounds(n_clicks, n_submit, query, mode, threshold):
+            if not (n_clicks or n_submit) or not query:
+                return None, None
+
+            try:
+                session = get_session()
+                if mode == "similarity":
+                    result = similarity_search(session, query, k=DEFAULT_K * 2, threshold=threshold)
+                    compounds = self._load_compounds(session, result['ids'])
+                    session.close()
+
+                    scores = dict(zip(result['ids'], result['scores']))
+                    info = (
+                        f"{len(result['ids'])} most similar of {result['n_searched']} compounds "
+                        f"(Tanimoto >= {threshold or 0}, {result['elapsed'] * 1000:.0f} ms)"
+                    )
+                    labels = [f"{compound.name} ({scores[compound.id]:.2f})" for compound in compounds]
+                    return self._render_results(compounds, labels), dbc.Alert(info, color="info")
+
+                result = substructure_search(session, query)
+                compounds = self._load_compounds(session, result['ids'])
+                session.close()
+
+                n_matches = result['n_matches'] if result['complete'] else f"At least {result['n_matches']}"
+                info = (
+                    f"{n_matches} of {result['n_searched']} compounds contain the query "
+                    f"({result['n_candidates']} passed the fingerprint screen, "
+                    f"{result['elapsed'] * 1000:.0f} ms)"
+                )
+                if result['n_matches'] > len(result['ids']) or not result['complete']:
+                    info += f"; showing the first {len(result['ids'])}"
+
+                return self._render_results(compounds), dbc.Alert(info, color="info")
+
+            except ValueError as e:
+                return None, dbc.Alert(str(e), color="warning")
+            except Exception as e:
+                print(f"Error searching compounds: {e}")
+                return None, dbc.Alert(f"Error: {str(e)}", color="danger")
+
+    def register_routes(self):
+        """Register the JSON similarity search API."""
+        @self.app.server.route(SIMILAR_API_URL)
+        def similar_compounds():
+            smiles = request.args.get("smiles", "")
+            try:
+                k = min(int(request.args.get("k", DEFAULT_K)), MAX_K)
+                threshold = float(request.args.get("threshold", 0))
+            except ValueError:
+                return jsonify({"error": "k and threshold must be numbers"}), 400
+
+            session = get_session()
+            try:
+                result = similarity_search(session, smiles, k=k, threshold=threshold)
+                compounds = self._load_compounds(session, result['ids'])
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            finally:
+                session.close()
+
+            scores = dict(zip(result['ids'], result['scores']))
+            return jsonify({
+                "results": [
+                    {"id": compound.id, "name": compound.name, "smiles": compound.smiles,
+                     "similarity": scores[compound.id]}
+                    for compound in compounds
+                ],
+                "n_searched": result['n_searched'],
+                "elapsed_ms": round(result['elapsed'] * 1000, 1)
+            })
+
+    def _load_compounds(self, session, compound_ids):
+        """(name, smiles) of the given compounds, in the given order."""
+        rows = session.query(Compound.id, Compound.name, Compound.smiles).filter(
+            Compound.id.in_(compound_ids)
+        ).all()
+        by_id = {row.id: row for row in rows}
+        return [by_id[compound_id] for compound_id in compound_ids if compound_id in by_id]
+
+    def _render_results(self, compounds, labels=None):
+        if not compounds:
+            return html.Div("No matching compounds")
+        labels = labels or [compound.name for compound in compounds]
+        return dbc.Row([compound_tile(label, compound.smiles) for label, compound in zip(labels, compounds)])
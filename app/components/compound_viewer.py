@@ -4,13 +4,15 @@ import dash
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
-import base64
-from io import BytesIO
+from flask import Response, abort, jsonify, request
 
-# Import RDKit for molecular visualization
-from rdkit import Chem
-from rdkit.Chem import Draw
-from rdkit.Chem import AllChem
+from app.models.compounds import Compound
+from app.models.database import get_session
+from app.services.molecule_render import (
+    MOLECULE_URL, clamp_size, image_etag, molecule_image_url, prerender_molecules,
+    render_cache, render_molecule_image, smiles_for_key
+)
+from app.components.compound_grid import TILE_SIZE, compound_tile
 
 class CompoundViewer:
     """
@@ -19,6 +21,7 @@ class CompoundViewer:
     def __init__(self, app):
         self.app = app
         self.register_callbacks()
+        self.register_routes()
     
     def render(self, id_prefix="compound-viewer"):
         """Render the compound viewer component."""
@@ -66,29 +69,46 @@ class CompoundViewer:
                 return ""
             
             try:
-                # Parse SMILES and generate molecule
-                mol = Chem.MolFromSmiles(smiles)
-                if mol is None:
-                    return ""
-                
-                # Add hydrogen atoms
-                mol = Chem.AddHs(mol)
-                
-                # Generate 2D coordinates
-                AllChem.Compute2DCoords(mol)
-                
-                # Create an image
-                img = Draw.MolToImage(mol, size=(300, 300))
-                
-                # Convert image to base64 string for display
-                buffered = BytesIO()
-                img.save(buffered, format="PNG")
-                img_str = base64.b64encode(buffered.getvalue()).decode()
-                
-                return f"data:image/png;base64,{img_str}"
+                # The browser fetches (and caches) the SVG from the image route
+                return molecule_image_url(smiles, size=300) or ""
             except Exception as e:
                 print(f"Error rendering molecule: {e}")
                 return ""
+    
+    def register_routes(self):
+        """Register the Flask routes serving molecule images and cache statistics."""
+        @self.app.server.route(MOLECULE_URL.format(key="<key>"))
+        def molecule_image(key):
+            smiles = smiles_for_key(key)
+            if smiles is None:
+                # Stored compounds can be looked up by their indexed InChIKey
+                session = get_session()
+                compound = session.query(Compound.canonical_smiles).filter(Compound.inchikey == key).first()
+                session.close()
+                if compound is None or not compound.canonical_smiles:
+                    abort(404)
+                smiles = compound.canonical_smiles
+            
+            size = clamp_size(request.args.get("size"))
+            headers = {
+                "ETag": image_etag(key, size),
+                "Cache-Control": "public, max-age=604800"
+            }
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return Response(status=304, headers=headers)
+            
+            image = render_molecule_image(smiles, size=size, image_format="svg")
+            if image is None:
+                abort(404)
+            return Response(image, mimetype="image/svg+xml", headers=headers)
+        
+        @self.app.server.route("/mol/cache-stats")
+        def molecule_cache_stats():
+            return jsonify(self.cache_stats())
+    
+    def cache_stats(self):
+        """Hit counters and hit rate of the molecule render cache."""
+        return render_cache.stats()
 
 def create_compound_batch_viewer(compounds):
     """
@@ -98,7 +118,9 @@ def create_compound_batch_viewer(compounds):
         compounds: List of compound objects with 'name' and 'smiles' attributes
     
     Returns:
-        HTML Div containing a grid of compound structures
+        HTML Div containing a grid of lazily loaded compound tiles
+    
+    For large collections use CompoundGrid, which pages through the compounds.
     """
     if not compounds:
         return html.Div("No compounds to display")
@@ -110,30 +132,13 @@ def create_compound_batch_viewer(compounds):
         return html.Div("No valid SMILES strings to display")
     
     try:
-        # Create molecule objects
-        mols = []
-        legends = []
-        for compound in valid_compounds:
-            mol = Chem.MolFromSmiles(compound.smiles)
-            if mol:
-                mols.append(mol)
-                legends.append(compound.name)
-        
-        if not mols:
-            return html.Div("Could not parse any valid molecules")
-        
-        # Generate a grid of images
-        img = Draw.MolsToGridImage(mols, molsPerRow=3, subImgSize=(200, 200), legends=legends)
-        
-        # Convert to base64 for display
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+        # Start rendering in the background; the image route renders on demand
+        prerender_molecules([c.smiles for c in valid_compounds], size=TILE_SIZE, timeout=0)
         
         return html.Div([
-            html.Img(src=f"data:image/png;base64,{img_str}", className="img-fluid")
-        ], className="text-center mt-3")
+            dbc.Row([compound_tile(c.name, c.smiles) for c in valid_compounds])
+        ], className="mt-3")
     
     except Exception as e:
         print(f"Error rendering compound batch: {e}")
-        return html.Div(f"Error rendering compounds: {str(e)}")
\ No newline at end of file
+        return html.Div(f"Error rendering compounds: {str(e)}")
@@ -0,0 +1,107 @@
+# components/dashboard_widgets.py
+
+from dash import html
+import dash_bootstrap_components as dbc
+from dash.dependencies import Input, Output
+
+from app.components.compound_grid import compound_tile
+from app.services.dashboard_rankings import get_rankings
+
+RECENT_TILE_SIZE = 150
+PRIORITY_COLORS = {"High": "danger", "Medium": "warning", "Low": "secondary"}
+
+
+class DashboardWidgets:
+    """
+    Top Targets, Recent Compounds and Featured Structure widgets of the
+    dashboard page.
+
+    The widgets are filled from precomputed rankings (see
+    app.services.dashboard_rankings), so loading the dashboard doesn't run
+    any ranking queries or parse structures.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.register_callbacks()
+
+    def register_callbacks(self):
+        """Register Dash callbacks for the component."""
+        @self.app.callback(
+            [Output("top-targets-list", "children"),
+             Output("recent-compounds-list", "children"),
+             Output("featured-structure", "children")],
+            [Input("url", "pathname")]
+        )
+        def update_widgets(pathname):
+            if pathname not in ("/", ""):
+                return None, None, None
+            try:
+                rankings = get_rankings()
+                return (
+                    self._render_top_targets(rankings["top_targets"]),
+                    self._render_recent_compounds(rankings["recent_compounds"]),
+                    self._render_featured_structure(rankings["featured_structure"])
+                )
+            except Exception as e:
+                print(f"Error loading dashboard rankings: {e}")
+                error = dbc.Alert(f"Error loading dashboard: {str(e)}", color="danger")
+                return error, None, None
+
+    def _render_top_targets(self, targets):
+        if not targets:
+            return html.P("No targets yet.", className="text-muted")
+
+        items = []
+        for target in targets:
+            details = [target["category"] or "Uncategorized", target["validation_status"] or "Unknown status"]
+            if target["activity_count"]:
+                details.append(f"{target['activity_count']} activities")
+            if target["disease_count"]:
+                details.append(f"{target['disease_count']} diseases")
+
+            items.append(dbc.ListGroupItem([
+                html.Div([
+                    html.Strong(target["name"]),
+                    dbc.Badge(
+                        target["priority"] or "No priority",
+                        color=PRIORITY_COLORS.get(target["priority"], "light"),
+                        className="ms-2"
+                    ),
+                    html.Span(f"{target['score']:.1f}", className="float-end text-muted", title="Ranking score")
+                ]),
+                html.Small(" · ".join(details), className="text-muted")
+            ]))
+        return dbc.ListGroup(items, flush=True)
+
+    def _render_recent_compounds(self, compounds):
+        if not compounds:
+            return html.P("No compounds yet.", className="text-muted")
+        return dbc.Row([
+            compound_tile(compound["name"], compound["smiles"], size=RECENT_TILE_SIZE)
+            for compound in compounds
+        ])
+
+    def _render_featured_structure(self, structure):
+        if not structure:
+            return html.P("No structure files uploaded yet.", className="text-muted")
+
+        resolution = f"{structure['resolution']:.2f} Å" if structure["resolution"] else "N/A"
+        return dbc.Row([
+            dbc.Col([
+                html.H4(structure["pdb_id"] or f"Structure {structure['id']}"),
+                html.P(structure["target_name"], className="lead"),
+                html.P(structure["description"] or "", className="text-muted")
+            ], md=6),
+            dbc.Col([
+                html.Table([
+                    html.Tbody([
+                        html.Tr([html.Th("Resolution"), html.Td(resolution)]),
+                        html.Tr([html.Th("Atoms"), html.Td(f"{structure['n_atoms']:,}")]),
+                        html.Tr([html.Th("Residues"), html.Td(f"{structure['n_residues']:,}")]),
+                        html.Tr([html.Th("Chains"), html.Td(", ".join(structure["chains"]))]),
+                        html.Tr([html.Th("Helix"), html.Td(f"{structure['helix_fraction']:.0%}")]),
+                        html.Tr([html.Th("Strand"), html.Td(f"{structure['strand_fraction']:.0%}")])
+                    ])
+                ], className="table table-sm")
+            ], md=6)
+        ])
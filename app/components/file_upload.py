@@ -14,6 +14,9 @@ from app.models.diseases import Disease
 from app.models.compounds import Compound
 from app.models.structures import Structure
 from app.models.database import get_session
+from app.services.structure_storage import write_structure_file
+from app.services.compound_import import import_compounds
+from app.services.activities import import_activities
 
 class FileUploadComponent:
     """Component for file uploads and data import/export."""
@@ -169,9 +172,12 @@ class FileUploadComponent:
                 subfolder = 'structures' if file_ext == 'pdb' else 'imports'
                 filepath = os.path.join(self.upload_folder, subfolder, f"{timestamp}_{clean_filename}")
                 
-                # Save file
-                with open(filepath, 'wb') as f:
-                    f.write(decoded)
+                # Save file; structure files are stored compressed
+                if subfolder == 'structures':
+                    filepath = write_structure_file(filepath, decoded)
+                else:
+                    with open(filepath, 'wb') as f:
+                        f.write(decoded)
                 
                 return dbc.Alert(
                     [html.I(className="fas fa-check-circle me-2"), f"File uploaded: {filename}"],
@@ -217,6 +223,47 @@ class FileUploadComponent:
                 df = pd.read_csv(filepath)
                 rows_imported = len(df)
                 
+                if data_type == 'compounds':
+                    # Compounds are inserted with computed descriptors
+                    session = get_session()
+                    try:
+                        result = import_compounds(session, df)
+                        session.commit()
+                    finally:
+                        session.close()
+                    
+                    message = f"Successfully imported {result['inserted']} compounds"
+                    if result['duplicates']:
+                        message += f", skipped {result['duplicates']} already in the database"
+                    if result['invalid']:
+                        shown = ', '.join(result['rejected'][:10])
+                        more = f" and {result['invalid'] - 10} more" if result['invalid'] > 10 else ""
+                        message += f"; rejected {result['invalid']} rows with unparseable SMILES: {shown}{more}"
+                    return dbc.Alert(
+                        [html.I(className="fas fa-check-circle me-2"), message],
+                        color="success" if not result['invalid'] else "warning"
+                    )
+                
+                if data_type == 'compound_activities':
+                    # Activities are validated as a whole and inserted with pActivity
+                    session = get_session()
+                    try:
+                        result = import_activities(session, df)
+                        session.commit()
+                    finally:
+                        session.close()
+                    
+                    message = f"Successfully imported {result['inserted']} activities"
+                    if not result['errors']:
+                        return dbc.Alert([html.I(className="fas fa-check-circle me-2"), message], color="success")
+                    return dbc.Alert([
+                        html.I(className="fas fa-exclamation-circle me-2"),
+                        f"{message}; {len(result['errors'])} rows rejected",
+                        html.Ul([
+                            html.Li(f"Row {error['row']}: {error['message']}") for error in result['errors'][:20]
+                        ], className="mb-0 mt-2")
+                    ], color="warning")
+                
                 # Here you would add logic to import data to the database
                 # based on data_type and the contents of the CSV
                 # For this example, we'll just acknowledge the import
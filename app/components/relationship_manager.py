@@ -1,13 +1,33 @@
 # components/relationship_manager.py
 
+import io
+import base64
+
 import dash
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
+import pandas as pd
 from app.models.targets import Target
 from app.models.diseases import Disease
 from app.models.compounds import Compound, CompoundActivity
 from app.models.database import get_session
+from app.services.activities import import_activities, validate_unit
+from app.services.target_diseases import (
+    EVIDENCE_LEVELS, RELATIONSHIP_TYPES, get_target_disease_rows, set_target_diseases
+)
+
+BULK_COLUMNS = ["compound", "target", "activity_type", "activity_value", "activity_unit", "mechanism", "notes"]
+BULK_EMPTY_ROWS = 10
+
+
+def _empty_bulk_rows(n=BULK_EMPTY_ROWS):
+    return [{column: "" for column in BULK_COLUMNS} for _ in range(n)]
+
+
+def _is_blank(row):
+    return all(str(row.get(column) or "").strip() == "" for column in BULK_COLUMNS)
+
 
 class RelationshipManager:
     """Component for managing relationships between entities."""
@@ -42,6 +62,25 @@ class RelationshipManager:
                         ], md=6)
                     ]),
                     html.Div(className="mt-3"),
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("Relationship Type (new diseases):"),
+                            dbc.Select(
+                                id="target-disease-type-input",
+                                options=[{"label": value.capitalize(), "value": value} for value in RELATIONSHIP_TYPES],
+                                value="primary"
+                            )
+                        ], md=6),
+                        dbc.Col([
+                            dbc.Label("Evidence Level (new diseases):"),
+                            dbc.Select(
+                                id="target-disease-evidence-input",
+                                options=[{"label": value.capitalize(), "value": value} for value in EVIDENCE_LEVELS],
+                                value="moderate"
+                            )
+                        ], md=6)
+                    ]),
+                    html.Div(className="mt-3"),
                     dbc.Button(
                         "Update Relationships",
                         id="target-disease-update-btn",
@@ -131,49 +170,123 @@ class RelationshipManager:
             ])
         ])
     
+    def render_bulk_activity_entry(self):
+        """Render the bulk activity entry grid (paste from a spreadsheet or upload a file)."""
+        return html.Div([
+            dbc.Card([
+                dbc.CardHeader("Bulk Activity Entry"),
+                dbc.CardBody([
+                    html.P(
+                        "Paste rows copied from a spreadsheet into the grid, or upload a CSV/TSV file with "
+                        "compound, target, activity_type, activity_value and activity_unit columns "
+                        "(mechanism and notes are optional). Compounds and targets are matched by name.",
+                        className="text-muted"
+                    ),
+                    dcc.Upload(
+                        id="activity-bulk-upload",
+                        children=html.Div(["Drag and drop or ", html.A("select a CSV/TSV file")]),
+                        style={
+                            "width": "100%",
+                            "height": "60px",
+                            "lineHeight": "60px",
+                            "borderWidth": "1px",
+                            "borderStyle": "dashed",
+                            "borderRadius": "5px",
+                            "textAlign": "center"
+                        },
+                        accept=".csv,.tsv,.txt",
+                        multiple=False
+                    ),
+                    html.Div(className="mt-3"),
+                    dash_table.DataTable(
+                        id="activity-bulk-table",
+                        data=_empty_bulk_rows(),
+                        columns=[
+                            {"name": "Compound", "id": "compound"},
+                            {"name": "Target", "id": "target"},
+                            {"name": "Activity Type", "id": "activity_type"},
+                            {"name": "Value", "id": "activity_value"},
+                            {"name": "Unit", "id": "activity_unit"},
+                            {"name": "Mechanism", "id": "mechanism"},
+                            {"name": "Notes", "id": "notes"},
+                            {"name": "Error", "id": "error", "editable": False}
+                        ],
+                        editable=True,
+                        row_deletable=True,
+                        style_table={"overflowX": "auto"},
+                        style_cell={
+                            "textAlign": "left",
+                            "padding": "6px",
+                            "minWidth": "90px"
+                        },
+                        style_header={
+                            "backgroundColor": "rgb(230, 230, 230)",
+                            "fontWeight": "bold"
+                        },
+                        style_data_conditional=[
+                            {"if": {"column_id": "error"}, "color": "#dc3545"}
+                        ],
+                        page_size=50
+                    ),
+                    html.Div(className="mt-3"),
+                    dbc.Button("Add Rows", id="activity-bulk-add-rows-btn", color="secondary", className="me-2"),
+                    dbc.Button("Save Activities", id="activity-bulk-save-btn", color="primary"),
+                    html.Div(id="activity-bulk-output", className="mt-3")
+                ])
+            ])
+        ])
+    
     def register_callbacks(self):
         """Register Dash callbacks for the relationship management components."""
+        @self.app.callback(
+            Output("target-disease-disease-dropdown", "value"),
+            [Input("target-disease-target-dropdown", "value")]
+        )
+        def load_target_diseases(target_id):
+            # Start from the current diseases so the update only applies the changes
+            if target_id is None:
+                return []
+            try:
+                session = get_session()
+                rows = get_target_disease_rows(session, target_id)
+                session.close()
+                return [row["disease_id"] for row in rows]
+            except Exception as e:
+                print(f"Error loading target diseases: {e}")
+                return []
+
         @self.app.callback(
             [Output("target-disease-update-output", "children"),
              Output("target-disease-table-container", "children")],
             [Input("target-disease-update-btn", "n_clicks")],
             [State("target-disease-target-dropdown", "value"),
-             State("target-disease-disease-dropdown", "value")]
+             State("target-disease-disease-dropdown", "value"),
+             State("target-disease-type-input", "value"),
+             State("target-disease-evidence-input", "value")]
         )
-        def update_target_disease_relationship(n_clicks, target_id, disease_ids):
+        def update_target_disease_relationship(n_clicks, target_id, disease_ids, relationship_type, evidence_level):
             if not n_clicks or target_id is None:
                 # Just display current relationships
                 return None, self._render_target_disease_table()
             
-            if disease_ids is None:
-                disease_ids = []
-            
+            session = get_session()
             try:
-                session = get_session()
-                
-                # Get the target
-                target = session.query(Target).get(target_id)
-                if not target:
-                    return dbc.Alert("Target not found", color="danger"), self._render_target_disease_table()
-                
-                # Get the selected diseases
-                selected_diseases = session.query(Disease).filter(Disease.id.in_(disease_ids)).all()
-                
-                # Update target's diseases
-                target.diseases = selected_diseases
-                
-                # Commit changes
+                added, removed = set_target_diseases(
+                    session, target_id, disease_ids or [], relationship_type, evidence_level
+                )
                 session.commit()
-                session.close()
                 
                 return dbc.Alert(
-                    f"Successfully updated disease relationships for target: {target.name}",
+                    f"Updated disease relationships: {len(added)} added, {len(removed)} removed",
                     color="success"
                 ), self._render_target_disease_table()
                 
             except Exception as e:
+                session.rollback()
                 print(f"Error updating target-disease relationships: {e}")
                 return dbc.Alert(f"Error: {str(e)}", color="danger"), self._render_target_disease_table()
+            finally:
+                session.close()
         
         @self.app.callback(
             [Output("activity-add-output", "children"),
@@ -196,36 +309,105 @@ class RelationshipManager:
                 return dbc.Alert("Compound and Target are required", color="danger"), self._render_activity_table()
             
             try:
-                session = get_session()
-                
-                # Create new activity
-                new_activity = CompoundActivity(
-                    compound_id=compound_id,
-                    target_id=target_id,
-                    activity_type=activity_type,
-                    activity_value=activity_value,
-                    activity_unit=activity_unit,
-                    reference=reference
-                )
-                
-                # Add to database
-                session.add(new_activity)
+                validate_unit(activity_unit, activity_type)
+            except ValueError as e:
+                return dbc.Alert(str(e), color="danger"), self._render_activity_table()
+            
+            session = get_session()
+            try:
+                # Same validated multi-row insert path as bulk entry, with one row
+                result = import_activities(session, pd.DataFrame([{
+                    "compound_id": compound_id,
+                    "target_id": target_id,
+                    "activity_type": activity_type,
+                    "activity_value": activity_value,
+                    "activity_unit": activity_unit,
+                    "notes": reference
+                }]))
+                if result['errors']:
+                    return dbc.Alert(result['errors'][0]['message'], color="danger"), self._render_activity_table()
                 session.commit()
                 
-                # Get compound and target names for the alert
-                compound_name = session.query(Compound).get(compound_id).name
-                target_name = session.query(Target).get(target_id).name
-                
-                session.close()
-                
-                return dbc.Alert(
-                    f"Successfully added activity data for {compound_name} against {target_name}",
-                    color="success"
-                ), self._render_activity_table()
+                return dbc.Alert("Successfully added activity data", color="success"), self._render_activity_table()
                 
             except Exception as e:
+                session.rollback()
                 print(f"Error adding compound activity: {e}")
                 return dbc.Alert(f"Error: {str(e)}", color="danger"), self._render_activity_table()
+            finally:
+                session.close()
+        
+        @self.app.callback(
+            [Output("activity-bulk-table", "data"),
+             Output("activity-bulk-output", "children")],
+            [Input("activity-bulk-add-rows-btn", "n_clicks"),
+             Input("activity-bulk-upload", "contents")],
+            [State("activity-bulk-upload", "filename"),
+             State("activity-bulk-table", "data")],
+            prevent_initial_call=True
+        )
+        def fill_bulk_table(n_clicks, contents, filename, rows):
+            rows = rows or []
+            if dash.ctx.triggered_id == "activity-bulk-add-rows-btn":
+                return rows + _empty_bulk_rows(), dash.no_update
+            if contents is None:
+                return dash.no_update, dash.no_update
+            
+            try:
+                df = self._parse_bulk_upload(contents, filename)
+                uploaded = df.reindex(columns=BULK_COLUMNS).fillna("").astype(str).to_dict("records")
+                return [row for row in rows if not _is_blank(row)] + uploaded, dbc.Alert(
+                    f"Loaded {len(uploaded)} rows from {filename}; review them and click 'Save Activities'",
+                    color="info"
+                )
+            except Exception as e:
+                print(f"Error reading activity file: {e}")
+                return dash.no_update, dbc.Alert(f"Error reading {filename}: {str(e)}", color="danger")
+        
+        @self.app.callback(
+            [Output("activity-bulk-table", "data", allow_duplicate=True),
+             Output("activity-bulk-output", "children", allow_duplicate=True)],
+            [Input("activity-bulk-save-btn", "n_clicks")],
+            [State("activity-bulk-table", "data")],
+            prevent_initial_call=True
+        )
+        def save_bulk_activities(n_clicks, rows):
+            rows = [row for row in rows or [] if not _is_blank(row)]
+            if not n_clicks or not rows:
+                return dash.no_update, dbc.Alert("Enter or paste activity rows first", color="warning")
+            
+            session = get_session()
+            try:
+                result = import_activities(session, pd.DataFrame(rows, columns=BULK_COLUMNS))
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"Error saving activities: {e}")
+                return dash.no_update, dbc.Alert(f"Error: {str(e)}", color="danger")
+            finally:
+                session.close()
+            
+            # Keep the rejected rows in the grid, with the reason, for correction
+            rejected = [dict(rows[error['row'] - 1], error=error['message']) for error in result['errors']]
+            message = f"Saved {result['inserted']} activities"
+            if not rejected:
+                return _empty_bulk_rows(), dbc.Alert(message, color="success")
+            return rejected, dbc.Alert(
+                f"{message}; {len(rejected)} rows were rejected and are left in the grid", color="warning"
+            )
+    
+    def _parse_bulk_upload(self, contents, filename):
+        """DataFrame from an uploaded CSV or tab-separated file, with lower-case column names."""
+        _, content_string = contents.split(',')
+        text = base64.b64decode(content_string).decode("utf-8-sig")
+        sep = "\t" if filename.lower().endswith((".tsv", ".txt")) else ","
+        df = pd.read_csv(io.StringIO(text), sep=sep, dtype=str)
+        df = df.rename(columns=lambda column: str(column).strip().lower())
+        missing = [column for column in ("compound", "target", "activity_type", "activity_value", "activity_unit")
+                   if column not in df.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        return df
     
     def _get_target_options(self):
         """Get dropdown options for targets."""
@@ -268,19 +450,8 @@ class RelationshipManager:
         try:
             session = get_session()
             
-            # Get all targets with their diseases
-            targets = session.query(Target).all()
-            
-            # Prepare data for the table
-            data = []
-            for target in targets:
-                for disease in target.diseases:
-                    data.append({
-                        "target_id": target.id,
-                        "target_name": target.name,
-                        "disease_id": disease.id,
-                        "disease_name": disease.name
-                    })
+            # One joined query for all relations
+            data = get_target_disease_rows(session)
             
             session.close()
             
@@ -292,7 +463,9 @@ class RelationshipManager:
                 data=data,
                 columns=[
                     {"name": "Target", "id": "target_name"},
-                    {"name": "Disease", "id": "disease_name"}
+                    {"name": "Disease", "id": "disease_name"},
+                    {"name": "Relationship", "id": "relationship_type"},
+                    {"name": "Evidence", "id": "evidence_level"}
                 ],
                 style_table={"overflowX": "auto"},
                 style_cell={
@@ -315,24 +488,29 @@ class RelationshipManager:
         try:
             session = get_session()
             
-            # Get all compound activities with related data
-            activities = session.query(CompoundActivity).all()
+            # Compound and target names are joined in, one query for all rows
+            rows = session.query(
+                CompoundActivity.id, Compound.name, Target.name, CompoundActivity.activity_type,
+                CompoundActivity.activity_value, CompoundActivity.activity_unit,
+                CompoundActivity.pactivity, CompoundActivity.notes
+            ).join(Compound, Compound.id == CompoundActivity.compound_id).join(
+                Target, Target.id == CompoundActivity.target_id
+            ).order_by(CompoundActivity.id).all()
             
             # Prepare data for the table
-            data = []
-            for activity in activities:
-                target = session.query(Target).get(activity.target_id)
-                compound = session.query(Compound).get(activity.compound_id)
-                
-                if target and compound:
-                    data.append({
-                        "id": activity.id,
-                        "compound_name": compound.name,
-                        "target_name": target.name,
-                        "activity_type": activity.activity_type or "N/A",
-                        "activity_value": f"{activity.activity_value or 'N/A'} {activity.activity_unit or ''}",
-                        "reference": activity.reference or "N/A"
-                    })
+            data = [
+                {
+                    "id": activity_id,
+                    "compound_name": compound_name,
+                    "target_name": target_name,
+                    "activity_type": activity_type or "N/A",
+                    "activity_value": f"{activity_value or 'N/A'} {activity_unit or ''}",
+                    "pactivity": pactivity,
+                    "notes": notes or "N/A"
+                }
+                for activity_id, compound_name, target_name, activity_type, activity_value,
+                    activity_unit, pactivity, notes in rows
+            ]
             
             session.close()
             
@@ -347,7 +525,8 @@ class RelationshipManager:
                     {"name": "Target", "id": "target_name"},
                     {"name": "Activity Type", "id": "activity_type"},
                     {"name": "Value", "id": "activity_value"},
-                    {"name": "Reference", "id": "reference"}
+                    {"name": "pActivity", "id": "pactivity", "type": "numeric"},
+                    {"name": "Reference", "id": "notes"}
                 ],
                 style_table={"overflowX": "auto"},
                 style_cell={
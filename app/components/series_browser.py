@@ -0,0 +1,231 @@
+# components/series_browser.py
+
+from dash import dcc, html, dash_table
+import dash_bootstrap_components as dbc
+from dash.dependencies import Input, Output, State
+from sqlalchemy import func
+
+from app.models.compounds import Compound
+from app.models.database import get_session
+from app.components.compound_grid import compound_tile
+from app.services.compound_series import run_series_update
+from app.services.jobs import get_job, start_job
+from app.services.molecule_render import molecule_image_url
+
+GROUP_COLUMNS = {
+    "murcko_scaffold": "Murcko scaffold",
+    "generic_scaffold": "Generic framework",
+    "cluster_id": "Butina cluster"
+}
+MAX_GROUPS = 500
+MAX_MEMBERS = 96
+SCAFFOLD_IMAGE_SIZE = 120
+
+class SeriesBrowser:
+    """
+    Component for browsing compounds grouped into chemical series.
+
+    Series are Murcko scaffolds, generic frameworks or Butina clusters,
+    computed by a background job that only processes new compounds unless
+    a full recompute is requested.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.register_callbacks()
+
+    def render(self, id_prefix="compound-series"):
+        """
+        Render the series browser component.
+
+        Args:
+            id_prefix: Prefix for component IDs
+        """
+        return html.Div([
+            dbc.Card([
+                dbc.CardHeader("Compound Series"),
+                dbc.CardBody([
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("Group by"),
+                            dbc.Select(
+                                id=f"{id_prefix}-group-by",
+                                options=[{"label": label, "value": column} for column, label in GROUP_COLUMNS.items()],
+                                value="murcko_scaffold"
+                            )
+                        ], md=4),
+                        dbc.Col([
+                            dbc.Button("Update Series", id=f"{id_prefix}-update-btn", color="primary", className="mt-4 me-3"),
+                            dbc.Checkbox(
+                                id=f"{id_prefix}-full",
+                                label="Recompute all",
+                                value=False,
+                                className="d-inline-block mt-4"
+                            )
+                        ], md=8)
+                    ]),
+                    html.Div(id=f"{id_prefix}-status", className="mt-3"),
+                    dcc.Loading(html.Div(id=f"{id_prefix}-groups", className="mt-3")),
+                    dcc.Loading(html.Div(id=f"{id_prefix}-members", className="mt-3")),
+                    dcc.Store(id=f"{id_prefix}-job-id"),
+                    dcc.Store(id=f"{id_prefix}-version", data=0),
+                    dcc.Interval(id=f"{id_prefix}-poll", interval=1000, disabled=True)
+                ])
+            ])
+        ])
+
+    def register_callbacks(self):
+        """Register Dash callbacks for the component."""
+        @self.app.callback(
+            [Output("compound-series-job-id", "data"),
+             Output("compound-series-poll", "disabled"),
+             Output("compound-series-status", "children")],
+            [Input("compound-series-update-btn", "n_clicks")],
+            [State("compound-series-full", "value")]
+        )
+        def start_update(n_clicks, full):
+            if not n_clicks:
+                return None, True, None
+            try:
+                job_id = start_job('compound_series', run_series_update, full=bool(full))
+                return job_id, False, dbc.Alert("Updating scaffolds and clusters...", color="info")
+            except Exception as e:
+                print(f"Error starting series update: {e}")
+                return None, True, dbc.Alert(f"Error: {str(e)}", color="danger")
+
+        @self.app.callback(
+            [Output("compound-series-status", "children", allow_duplicate=True),
+             Output("compound-series-poll", "disabled", allow_duplicate=True),
+             Output("compound-series-version", "data")],
+            [Input("compound-series-poll", "n_intervals")],
+            [State("compound-series-job-id", "data"),
+             State("compound-series-version", "data")],
+            prevent_initial_call=True
+        )
+        def poll_update(n_intervals, job_id, version):
+            job = get_job(job_id)
+            if job is None:
+                return None, True, version
+            if job['status'] == 'running':
+                return dbc.Alert(
+                    f"Updating scaffolds and clusters ({job['progress']}/{job['total'] or 2} steps)...",
+                    color="info"
+                ), False, version
+            if job['status'] == 'failed':
+                return dbc.Alert(f"Series update failed: {job['error']}", color="danger"), True, version
+
+            summary = job['summary']
+            return dbc.Alert(
+                f"Series updated: scaffolds of {summary['scaffolds_updated']} compounds "
+                f"({summary['scaffolds_failed']} failed), {summary['assigned']} compounds assigned to clusters, "
+                f"{summary['new_clusters']} new clusters",
+                color="success"
+            ), True, (version or 0) + 1
+
+        @self.app.callback(
+            [Output("compound-series-groups", "children"),
+             Output("compound-series-members", "children")],
+            [Input("compound-series-group-by", "value"),
+             Input("compound-series-version", "data")]
+        )
+        def update_groups(group_by, version):
+            if group_by not in GROUP_COLUMNS:
+                return None, None
+            try:
+                session = get_session()
+                groups = self._load_groups(session, group_by)
+                session.close()
+
+                if not groups:
+                    return dbc.Alert(
+                        "No series yet. Click 'Update Series' to compute scaffolds and clusters.",
+                        color="secondary"
+                    ), None
+                return self._render_groups(groups, group_by), None
+
+            except Exception as e:
+                print(f"Error loading compound series: {e}")
+                return dbc.Alert(f"Error loading series: {str(e)}", color="danger"), None
+
+        @self.app.callback(
+            Output("compound-series-members", "children", allow_duplicate=True),
+            [Input("compound-series-table", "selected_rows")],
+            [State("compound-series-table", "data"),
+             State("compound-series-group-by", "value")],
+            prevent_initial_call=True
+        )
+        def show_members(selected_rows, groups, group_by):
+            if not selected_rows or not groups or group_by not in GROUP_COLUMNS:
+                return None
+            group = groups[selected_rows[0]]
+            try:
+                session = get_session()
+                rows = session.query(Compound.name, Compound.smiles).filter(
+                    getattr(Compound, group_by) == group['key']
+                ).order_by(Compound.name, Compound.id).limit(MAX_MEMBERS).all()
+                session.close()
+
+                children = [html.H5(f"{group['label']} ({group['count']} compounds)")]
+                if group['count'] > len(rows):
+                    children.append(html.P(f"Showing the first {len(rows)}", className="text-muted"))
+                children.append(dbc.Row([compound_tile(name, smiles) for name, smiles in rows]))
+                return html.Div(children)
+
+            except Exception as e:
+                print(f"Error loading series members: {e}")
+                return dbc.Alert(f"Error loading compounds: {str(e)}", color="danger")
+
+    def _load_groups(self, session, group_by):
+        """Largest groups of one series column: dicts with key, label, smiles and count."""
+        column = getattr(Compound, group_by)
+        rows = session.query(column, func.count(Compound.id).label("count")).filter(
+            column.isnot(None)
+        ).group_by(column).order_by(func.count(Compound.id).desc(), column).limit(MAX_GROUPS).all()
+
+        if group_by == "cluster_id":
+            centroids = dict(
+                (compound_id, (name, smiles)) for compound_id, name, smiles in
+                session.query(Compound.id, Compound.name, Compound.smiles).filter(
+                    Compound.id.in_([key for key, _ in rows])
+                )
+            )
+            return [
+                {"key": key, "label": f"Cluster of {centroids.get(key, ('#' + str(key), None))[0]}",
+                 "smiles": centroids.get(key, (None, None))[1], "count": count}
+                for key, count in rows
+            ]
+
+        return [
+            {"key": key, "label": key or "Acyclic", "smiles": key or None, "count": count}
+            for key, count in rows
+        ]
+
+    def _render_groups(self, groups, group_by):
+        data = []
+        for group in groups:
+            url = molecule_image_url(group['smiles'], size=SCAFFOLD_IMAGE_SIZE) if group['smiles'] else None
+            data.append(dict(group, image=f"![{group['label']}]({url})" if url else ""))
+
+        return dash_table.DataTable(
+            id="compound-series-table",
+            data=data,
+            columns=[
+                {"name": GROUP_COLUMNS[group_by], "id": "image", "presentation": "markdown"},
+                {"name": "Series", "id": "label"},
+                {"name": "Compounds", "id": "count"}
+            ],
+            style_table={"overflowX": "auto"},
+            style_cell={
+                "textAlign": "left",
+                "padding": "10px",
+                "maxWidth": "400px",
+                "overflow": "hidden",
+                "textOverflow": "ellipsis"
+            },
+            style_header={
+                "backgroundColor": "rgb(230, 230, 230)",
+                "fontWeight": "bold"
+            },
+            row_selectable="single",
+            selected_rows=[],
+            page_size=10
+        )
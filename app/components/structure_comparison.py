@@ -0,0 +1,201 @@
+# components/structure_comparison.py
+
+import dash
+from dash import dcc, html
+import dash_bootstrap_components as dbc
+from dash.dependencies import Input, Output, State, ClientsideFunction
+import plotly.graph_objects as go
+
+from app.models.structures import Structure
+from app.models.database import get_session
+from app.services.structure_parser import load_structure
+from app.services.structure_geometry import geometry_url, write_geometry
+from app.services.superposition import MIN_MATCHED_ATOMS, compare_structures, overlay_structure
+
+class StructureComparison:
+    """
+    Component for comparing all structures of a target.
+
+    Structures are aligned on matched C-alpha atoms; the all-vs-all RMSD
+    matrix is shown as a heatmap and clicking a cell overlays that pair in
+    the structure viewer.
+    """
+    def __init__(self, app, structure_viewer):
+        self.app = app
+        self.structure_viewer = structure_viewer
+        self.register_callbacks()
+
+    def render(self, target_options=None, id_prefix="structure-compare"):
+        """
+        Render the structure comparison component.
+
+        Args:
+            target_options: Dropdown options for targets
+            id_prefix: Prefix for component IDs
+        """
+        return html.Div([
+            dbc.Card([
+                dbc.CardHeader("Compare Target Structures"),
+                dbc.CardBody([
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("Target"),
+                            dcc.Dropdown(
+                                id=f"{id_prefix}-target-dropdown",
+                                options=target_options or [],
+                                placeholder="Select a target..."
+                            )
+                        ], md=8),
+                        dbc.Col([
+                            dbc.Button(
+                                "Compare Structures",
+                                id=f"{id_prefix}-btn",
+                                color="primary",
+                                className="mt-4"
+                            )
+                        ], md=4)
+                    ]),
+                    html.Div(id=f"{id_prefix}-info", className="mt-3"),
+                    dcc.Store(id=f"{id_prefix}-store"),
+                    dcc.Loading(dcc.Graph(id=f"{id_prefix}-heatmap", figure=self._empty_figure())),
+                    html.P(
+                        "Click a cell to overlay that pair of structures.",
+                        className="text-muted"
+                    ),
+                    html.Div(id=f"{id_prefix}-overlay-info"),
+                    html.Div(
+                        self.structure_viewer.create_viewer(viewer_id=f"{id_prefix}-molecule-3d"),
+                        id=f"{id_prefix}-overlay-container",
+                        style={"height": "500px", "width": "100%"}
+                    ),
+                    dcc.Store(id=f"{id_prefix}-geometry-url")
+                ])
+            ])
+        ])
+
+    def register_callbacks(self):
+        """Register Dash callbacks for the component."""
+        @self.app.callback(
+            [Output("structure-compare-heatmap", "figure"),
+             Output("structure-compare-store", "data"),
+             Output("structure-compare-info", "children")],
+            [Input("structure-compare-btn", "n_clicks")],
+            [State("structure-compare-target-dropdown", "value")]
+        )
+        def compare_target_structures(n_clicks, target_id):
+            if not n_clicks or target_id is None:
+                return self._empty_figure(), None, None
+
+            try:
+                session = get_session()
+                structures = session.query(Structure).filter(Structure.target_id == target_id).all()
+                result = compare_structures(structures)
+                session.close()
+
+                skipped = f" Skipped: {', '.join(result['skipped'])}" if result['skipped'] else ""
+                if len(result['labels']) < 2:
+                    return self._empty_figure(), None, dbc.Alert(
+                        "At least two structures with uploaded C-alpha coordinates are needed for a comparison."
+                        + skipped,
+                        color="warning"
+                    )
+
+                # Each pair is superposed on the C-alpha atoms it shares
+                pair_counts = [
+                    count for row, counts in enumerate(result['n_matched'])
+                    for column, count in enumerate(counts) if row != column
+                ]
+                info = [
+                    f"Aligned {len(result['labels'])} structures pairwise on "
+                    f"{min(pair_counts)}-{max(pair_counts)} matched C-alpha atoms."
+                ]
+                if None in sum(result['matrix'], []):
+                    info.append(f" Pairs sharing fewer than {MIN_MATCHED_ATOMS} C-alpha atoms are left blank.")
+                if skipped:
+                    info.append(skipped)
+
+                return self._heatmap_figure(result), result, dbc.Alert(info, color="info")
+
+            except Exception as e:
+                print(f"Error comparing structures: {e}")
+                return self._empty_figure(), None, dbc.Alert(f"Error: {str(e)}", color="danger")
+
+        @self.app.callback(
+            [Output("structure-compare-geometry-url", "data"),
+             Output("structure-compare-overlay-info", "children")],
+            [Input("structure-compare-heatmap", "clickData")],
+            [State("structure-compare-store", "data")]
+        )
+        def show_overlay(click_data, result):
+            if not click_data or not result:
+                return None, None
+
+            try:
+                point = click_data["points"][0]
+                labels = result['labels']
+                # customdata holds the (row, column) structure indices of the cell
+                reference_idx, mobile_idx = point["customdata"][:2]
+                if reference_idx == mobile_idx:
+                    return dash.no_update, dbc.Alert("Select two different structures", color="warning")
+
+                session = get_session()
+                rows = session.query(Structure).filter(
+                    Structure.id.in_([result['structure_ids'][reference_idx], result['structure_ids'][mobile_idx]])
+                ).all()
+                paths = {structure.id: structure.file_path for structure in rows}
+                session.close()
+
+                reference = load_structure(paths[result['structure_ids'][reference_idx]])
+                mobile = load_structure(paths[result['structure_ids'][mobile_idx]])
+                merged, model, rmsd, n_matched = overlay_structure(reference, mobile)
+                digest = write_geometry(merged, model=model, variant="overlay")
+
+                return geometry_url(digest), dbc.Alert(
+                    f"{labels[mobile_idx]} (red) superposed on {labels[reference_idx]} (blue): "
+                    f"RMSD {rmsd:.2f} Å over {n_matched} C-alpha atoms",
+                    color="info"
+                )
+
+            except Exception as e:
+                print(f"Error overlaying structures: {e}")
+                return None, dbc.Alert(f"Error: {str(e)}", color="danger")
+
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="structure_viewer", function_name="load_overlay"),
+            [Output("structure-compare-molecule-3d", "modelData"),
+             Output("structure-compare-molecule-3d", "styles")],
+            [Input("structure-compare-geometry-url", "data")]
+        )
+
+    def _heatmap_figure(self, result):
+        """Build the RMSD heatmap figure."""
+        figure = go.Figure(
+            data=go.Heatmap(
+                z=result['matrix'],
+                customdata=[[[row, column, count] for column, count in enumerate(counts)]
+                            for row, counts in enumerate(result['n_matched'])],
+                x=result['labels'],
+                y=result['labels'],
+                colorscale="Viridis",
+                colorbar={"title": "RMSD (Å)"},
+                hovertemplate="%{y} vs %{x}: %{z:.2f} Å over %{customdata[2]} C-alpha atoms<extra></extra>"
+            )
+        )
+        figure.update_layout(
+            xaxis={"type": "category"},
+            yaxis={"type": "category", "autorange": "reversed"},
+            margin={"l": 60, "r": 20, "t": 20, "b": 60},
+            height=450
+        )
+        return figure
+
+    def _empty_figure(self):
+        """Placeholder figure shown before a comparison is run."""
+        figure = go.Figure()
+        figure.update_layout(
+            xaxis={"visible": False},
+            yaxis={"visible": False},
+            margin={"l": 20, "r": 20, "t": 20, "b": 20},
+            height=200
+        )
+        return figure
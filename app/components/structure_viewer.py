@@ -3,9 +3,22 @@
 import dash
 from dash import dcc, html
 import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output, State, ClientsideFunction
 import dash_bio as dashbio
+from flask import Response, abort, request
+from sqlalchemy import func
+import plotly.graph_objects as go
+import numpy as np
+import gzip
 import os
+import re
+
+from app.models.structures import Structure
+from app.models.database import get_session
+from app.services.structure_parser import load_structure
+from app.services.structure_storage import write_structure_file
+from app.services.structure_features import load_features, atom_secondary_structure, SS_LABELS
+from app.services.structure_geometry import GEOMETRY_URL, geometry_path, geometry_url, write_geometry
 
 class StructureViewer:
     """
@@ -19,6 +32,7 @@ class StructureViewer:
         os.makedirs(upload_folder, exist_ok=True)
         
         self.register_callbacks()
+        self.register_routes()
     
     def render(self, id_prefix="structure-viewer", pdb_path=None, pdb_id=None):
         """
@@ -66,6 +80,17 @@ class StructureViewer:
                                 
                                 html.Div(id=f"{id_prefix}-upload-info"),
                                 
+                                dbc.Label("Color by", className="mt-3"),
+                                dbc.RadioItems(
+                                    id=f"{id_prefix}-color-mode",
+                                    options=[
+                                        {"label": "Secondary structure", "value": "secondary_structure"},
+                                        {"label": "Chain", "value": "chain"},
+                                        {"label": "Element", "value": "element"}
+                                    ],
+                                    value="secondary_structure"
+                                ),
+                                
                                 dbc.Button(
                                     "Visualize Structure",
                                     id=f"{id_prefix}-visualize-btn",
@@ -76,11 +101,14 @@ class StructureViewer:
                         ], md=4),
                         dbc.Col([
                             html.Div(
+                                self.create_viewer(viewer_id=f"{id_prefix}-molecule-3d"),
                                 id=f"{id_prefix}-mol3d-container",
                                 style={"height": "500px", "width": "100%"}
-                            )
+                            ),
+                            dcc.Store(id=f"{id_prefix}-geometry-url")
                         ], md=8)
-                    ])
+                    ]),
+                    html.Div(id=f"{id_prefix}-contact-map", className="mt-3")
                 ])
             ])
         ])
@@ -88,8 +116,9 @@ class StructureViewer:
     def register_callbacks(self):
         """Register Dash callbacks for the component."""
         @self.app.callback(
-            [Output("structure-viewer-mol3d-container", "children"),
-             Output("structure-viewer-upload-info", "children")],
+            [Output("structure-viewer-geometry-url", "data"),
+             Output("structure-viewer-upload-info", "children"),
+             Output("structure-viewer-contact-map", "children")],
             [Input("structure-viewer-visualize-btn", "n_clicks"),
              Input("structure-viewer-upload", "contents")],
             [State("structure-viewer-upload", "filename"),
@@ -100,13 +129,16 @@ class StructureViewer:
             trigger_id = ctx.triggered[0]["prop_id"].split(".")[0]
             
             # Default return values
-            viewer = html.Div("No structure loaded yet")
+            url = None
             upload_info = ""
+            contact_map = None
             
             if not ctx.triggered:
-                return viewer, upload_info
+                return url, upload_info, contact_map
                 
             try:
+                filepath = None
+                
                 if trigger_id == "structure-viewer-upload" and contents:
                     # Handle file upload
                     import base64
@@ -118,118 +150,146 @@ class StructureViewer:
                     # Create a unique filename
                     now = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
                     clean_filename = ''.join(c for c in filename if c.isalnum() or c in ['_', '.', '-'])
-                    filepath = os.path.join(self.upload_folder, f"{now}_{clean_filename}")
                     
-                    # Save file
-                    with open(filepath, 'wb') as f:
-                        f.write(decoded)
+                    # Save file (compressed at rest)
+                    filepath = write_structure_file(
+                        os.path.join(self.upload_folder, f"{now}_{clean_filename}"), decoded
+                    )
                     
                     upload_info = dbc.Alert(f"File uploaded: {filename}", color="success")
                     
-                    # Create viewer
-                    viewer = dashbio.Molecule3dViewer(
-                        id='molecule-3d',
-                        modelData=self._parse_pdb_file(filepath),
-                        styles={
-                            'sphere': {
-                                'sphere': {
-                                    'hidden': True
-                                }
-                            }
-                        },
-                        backgroundColor="#FFFFFF",
-                        height=500
-                    )
-                    
                 elif trigger_id == "structure-viewer-visualize-btn" and pdb_id:
-                    # Use PDB ID from RCSB
-                    viewer = dashbio.Molecule3dViewer(
-                        id='molecule-3d',
-                        pdbId=pdb_id,
-                        styles={
-                            'sphere': {
-                                'sphere': {
-                                    'hidden': True
-                                }
-                            }
-                        },
-                        backgroundColor="#FFFFFF",
-                        height=500
-                    )
+                    # Use the uploaded file of a stored structure with this PDB ID
+                    session = get_session()
+                    structure = session.query(Structure).filter(
+                        func.upper(Structure.pdb_id) == pdb_id.strip().upper(),
+                        Structure.file_path.isnot(None)
+                    ).first()
+                    filepath = structure.file_path if structure else None
+                    session.close()
                     
-                    upload_info = dbc.Alert(f"Loaded PDB: {pdb_id}", color="success")
+                    if filepath is None:
+                        upload_info = dbc.Alert(f"No structure file stored for PDB ID {pdb_id}", color="warning")
+                    else:
+                        upload_info = dbc.Alert(f"Loaded PDB: {pdb_id}", color="success")
+                
+                if filepath:
+                    url, features = self.prepare_geometry(filepath)
+                    contact_map = self.render_contact_map(features)
             
             except Exception as e:
                 print(f"Error in structure viewer: {e}")
-                viewer = html.Div("Error loading structure")
                 upload_info = dbc.Alert(f"Error: {str(e)}", color="danger")
             
-            return viewer, upload_info
+            return url, upload_info, contact_map
+        
+        # Geometry is fetched and decoded in the browser (assets/structure_geometry.js)
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="structure_viewer", function_name="load_geometry"),
+            [Output("structure-viewer-molecule-3d", "modelData"),
+             Output("structure-viewer-molecule-3d", "styles")],
+            [Input("structure-viewer-geometry-url", "data"),
+             Input("structure-viewer-color-mode", "value")]
+        )
     
-    def _parse_pdb_file(self, filepath):
-        """Parse a PDB file for the Molecule3dViewer."""
-        # This is a simplified parser - in a production app,
-        # you might want to use a more robust PDB parser
-        try:
-            with open(filepath, 'r') as f:
-                pdb_string = f.read()
+    def register_routes(self):
+        """Register the Flask route serving binary structure geometry."""
+        @self.app.server.route(GEOMETRY_URL.format(digest="<digest>"))
+        def structure_geometry(digest):
+            if not re.fullmatch(r"[0-9a-f]{40}", digest):
+                abort(404)
             
-            # Parse the PDB data into the format expected by Molecule3dViewer
-            # This is a very simplified version - a real implementation would be more robust
-            atoms = []
-            bonds = []
+            path = geometry_path(digest)
+            if not os.path.exists(path):
+                abort(404)
             
-            atom_index = {}  # Map from PDB atom index to our index
-            idx = 0
+            # URLs are content-addressed, so responses never change
+            headers = {
+                "ETag": f'"{digest}"',
+                "Cache-Control": "public, max-age=31536000, immutable",
+                "Vary": "Accept-Encoding"
+            }
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return Response(status=304, headers=headers)
             
-            for line in pdb_string.split('\n'):
-                if line.startswith('ATOM') or line.startswith('HETATM'):
-                    # Parse atom information
-                    atom_serial = int(line[6:11].strip())
-                    atom_name = line[12:16].strip()
-                    residue_name = line[17:20].strip()
-                    chain_id = line[21:22].strip()
-                    residue_seq = int(line[22:26].strip())
-                    x = float(line[30:38].strip())
-                    y = float(line[38:46].strip())
-                    z = float(line[46:54].strip())
-                    
-                    # Element symbol (columns 77-78)
-                    if len(line) >= 78:
-                        element = line[76:78].strip()
-                    else:
-                        # Extract from atom name
-                        element = atom_name[0]
-                    
-                    # Add atom to the list
-                    atoms.append({
-                        'serial': atom_serial,
-                        'name': atom_name,
-                        'residue_name': residue_name,
-                        'chain_id': chain_id,
-                        'residue_index': residue_seq,
-                        'positions': [x, y, z],
-                        'atom_type': element
-                    })
-                    
-                    atom_index[atom_serial] = idx
-                    idx += 1
-                
-                elif line.startswith('CONECT'):
-                    # Parse bond information
-                    fields = line.split()
-                    if len(fields) > 2:
-                        atom1 = int(fields[1])
-                        for i in range(2, len(fields)):
-                            atom2 = int(fields[i])
-                            if atom1 in atom_index and atom2 in atom_index:
-                                bonds.append([atom_index[atom1], atom_index[atom2]])
+            with open(path, 'rb') as f:
+                data = f.read()
             
-            return {
-                'atoms': atoms,
-                'bonds': bonds
-            }
+            if "gzip" in request.headers.get("Accept-Encoding", ""):
+                headers["Content-Encoding"] = "gzip"
+            else:
+                data = gzip.decompress(data)
             
-        except Exception as e:
-            print(f"Error parsing PDB file: {e}")
-            return {'atoms': [], 'bonds': []}
\ No newline at end of file
+            return Response(data, mimetype="application/octet-stream", headers=headers)
+    
+    def prepare_geometry(self, filepath):
+        """
+        Parse a structure file and store its binary geometry.
+        
+        Returns:
+            (url, features): the geometry URL for the viewer and the cached
+            per-residue features
+        """
+        parsed = load_structure(filepath)
+        features = load_features(parsed)
+        digest = write_geometry(parsed, secondary_structure=atom_secondary_structure(parsed, features))
+        return geometry_url(digest), features
+    
+    def create_viewer(self, viewer_id='molecule-3d'):
+        """
+        Build an empty Molecule3dViewer.
+        
+        Model data and styles are filled in by a clientside callback from the
+        binary geometry URL, see register_callbacks.
+        
+        Args:
+            viewer_id: Component ID for the viewer
+        """
+        return dashbio.Molecule3dViewer(
+            id=viewer_id,
+            modelData={'atoms': [], 'bonds': []},
+            styles=[],
+            backgroundColor="#FFFFFF",
+            height=500
+        )
+    
+    def render_contact_map(self, features):
+        """Render the per-chain residue contact maps as one block-diagonal plot."""
+        if features.n_residues == 0 or len(features.contacts) == 0:
+            return html.Div("No residue contacts found", className="text-muted")
+        
+        i, j = features.contacts[:, 0], features.contacts[:, 1]
+        labels = np.char.add(
+            np.char.add(features.residue_chain_ids, ":"),
+            np.char.add(features.residue_names, features.residue_seqs.astype(str))
+        )
+        
+        figure = go.Figure(
+            data=go.Scattergl(
+                x=np.concatenate([i, j]),
+                y=np.concatenate([j, i]),
+                mode="markers",
+                marker={"size": 3, "color": np.concatenate([features.contact_distances] * 2).astype(float),
+                        "colorscale": "Viridis", "colorbar": {"title": "Å"}},
+                text=np.char.add(np.char.add(labels[np.concatenate([i, j])], " – "),
+                                 labels[np.concatenate([j, i])]),
+                hoverinfo="text"
+            )
+        )
+        figure.update_layout(
+            title="Residue contact map",
+            xaxis={"title": "Residue"},
+            yaxis={"title": "Residue", "autorange": "reversed", "scaleanchor": "x"},
+            margin={"l": 60, "r": 20, "t": 40, "b": 40},
+            height=450
+        )
+        
+        ss_counts = np.bincount(features.secondary_structure, minlength=len(SS_LABELS))
+        summary = ", ".join(
+            f"{SS_LABELS[code]}: {ss_counts[code]}" for code in sorted(SS_LABELS)
+        )
+        
+        return html.Div([
+            html.P(f"{features.n_residues} residues ({summary})", className="text-muted"),
+            dcc.Graph(figure=figure)
+        ])
@@ -0,0 +1,178 @@
+# components/target_browser.py
+
+from dash import ctx, html, dash_table
+import dash_bootstrap_components as dbc
+from dash.dependencies import Input, Output, State
+
+from app.components.target_details import create_target_details
+from app.models.database import get_session
+from app.services.target_dossier import load_target_dossier
+from app.services.target_facets import FACET_COLUMNS, PAGE_SIZE, search_targets
+
+FACET_LABELS = {
+    "category": "Category",
+    "validation_status": "Validation",
+    "priority": "Priority"
+}
+
+
+def facet_options(counts, selected=None):
+    """
+    Filter options labelled with their target counts.
+
+    Selected values stay listed even when no target matches them any more,
+    so they can still be deselected.
+    """
+    counts = dict(counts)
+    for value in selected or []:
+        counts.setdefault(value, 0)
+    return [
+        {"label": f"{value} ({count})", "value": value}
+        for value, count in sorted(counts.items(), key=lambda item: str(item[0]).lower())
+    ]
+
+
+def get_target_page(filters=None, page=0):
+    """
+    One page of targets matching the filters, plus the facet counts.
+
+    Args:
+        filters: Dict of facet name -> selected values
+        page: Zero-based page number
+
+    Returns:
+        (table rows, facet counts as from get_facet_counts())
+    """
+    session = get_session()
+    try:
+        # Activity figures come from the precomputed per-target summary
+        counts, rows = search_targets(session, filters, page)
+    finally:
+        session.close()
+
+    return [
+        {
+            "id": target.id,
+            "name": target.name,
+            "category": target.category,
+            "validation_status": target.validation_status,
+            "priority": target.priority,
+            "compound_count": summary.compound_count if summary else 0,
+            "best_pactivity": summary.best_pactivity if summary else None,
+        }
+        for target, summary in rows
+    ], counts
+
+
+class TargetBrowser:
+    """
+    Faceted, paginated target list.
+
+    The category, validation and priority filters show how many targets
+    each value would match (counted under the other filters), and the
+    table is paged on the server, so only one page of targets is loaded.
+    Selecting a row shows the target's details, loaded in one query.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.register_callbacks()
+
+    def render(self, id_prefix="target-browser"):
+        """
+        Render the target browser component.
+
+        Args:
+            id_prefix: Prefix for component IDs
+        """
+        filters = []
+        for facet, label in FACET_LABELS.items():
+            filters.extend([
+                dbc.Label(f"{label}:", className="fw-bold"),
+                dbc.Checklist(id=f"{id_prefix}-{facet}-filter", options=[], value=[], className="mb-3")
+            ])
+
+        return dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Filters"),
+                    dbc.CardBody(filters)
+                ])
+            ], md=3),
+            dbc.Col([
+                html.Div(id=f"{id_prefix}-total", className="text-muted mb-2"),
+                dash_table.DataTable(
+                    id=f"{id_prefix}-table",
+                    columns=[
+                        {"name": "Name", "id": "name"},
+                        {"name": "Category", "id": "category"},
+                        {"name": "Validation", "id": "validation_status"},
+                        {"name": "Priority", "id": "priority"},
+                        {"name": "Compounds", "id": "compound_count", "type": "numeric"},
+                        {"name": "Best pActivity", "id": "best_pactivity", "type": "numeric"},
+                    ],
+                    data=[],
+                    style_table={"overflowX": "auto"},
+                    style_cell={"textAlign": "left", "padding": "10px"},
+                    style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"},
+                    style_data_conditional=[
+                        {"if": {"row_index": "odd"}, "backgroundColor": "rgb(248, 248, 248)"}
+                    ],
+                    page_action="custom",
+                    page_current=0,
+                    page_size=PAGE_SIZE,
+                    page_count=1,
+                    row_selectable="single",
+                    selected_rows=[]
+                ),
+                html.Div(create_target_details(), id=f"{id_prefix}-details", className="mt-4")
+            ], md=9)
+        ])
+
+    def register_callbacks(self):
+        """Register Dash callbacks for the component."""
+        @self.app.callback(
+            [Output("target-browser-table", "data"),
+             Output("target-browser-table", "page_count"),
+             Output("target-browser-table", "page_current"),
+             Output("target-browser-table", "selected_rows"),
+             Output("target-browser-total", "children")]
+            + [Output(f"target-browser-{facet}-filter", "options") for facet in FACET_COLUMNS],
+            [Input(f"target-browser-{facet}-filter", "value") for facet in FACET_COLUMNS]
+            + [Input("target-browser-table", "page_current")]
+        )
+        def load_targets(*args):
+            *selected, page = args
+            # A new filter state starts again from the first page
+            if ctx.triggered_id != "target-browser-table":
+                page = 0
+            filters = dict(zip(FACET_COLUMNS, selected))
+            try:
+                data, counts = get_target_page(filters, page or 0)
+            except Exception as e:
+                print(f"Error loading targets: {e}")
+                return ([], 1, 0, [], dbc.Alert(f"Error loading targets: {str(e)}", color="danger")) \
+                    + tuple(facet_options({}, values) for values in selected)
+
+            page_count = max(1, -(-counts["total"] // PAGE_SIZE))
+            return (data, page_count, page or 0, [], f"{counts['total']} targets") + tuple(
+                facet_options(counts[facet], values) for facet, values in zip(FACET_COLUMNS, selected)
+            )
+
+        @self.app.callback(
+            Output("target-browser-details", "children"),
+            [Input("target-browser-table", "selected_rows")],
+            [State("target-browser-table", "data")],
+            prevent_initial_call=True
+        )
+        def show_details(selected_rows, data):
+            if not selected_rows or not data or selected_rows[0] >= len(data):
+                return create_target_details()
+            try:
+                session = get_session()
+                # Structures, diseases and activities come back with the target in one query
+                target = load_target_dossier(session, data[selected_rows[0]]["id"])
+                session.close()
+                return create_target_details(target)
+            except Exception as e:
+                print(f"Error loading target details: {e}")
+                return dbc.Alert(f"Error loading target details: {str(e)}", color="danger")
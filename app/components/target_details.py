@@ -71,10 +71,103 @@ def create_target_details(target=None):
             html.P(target.get("notes", "No additional notes"), className="target-notes")
         ], className="mb-3"),
         
+        # Activity aggregates (from the per-target activity summary)
+        html.Div([
+            html.H5("Activity Summary"),
+            create_activity_summary(target.get("activity_summary"))
+        ], className="mb-3"),
+        
         # Associated diseases section
         html.Div([
             html.H5("Associated Diseases"),
-            html.Div(id="disease-list", className="disease-list")
+            html.Div(create_disease_list(target.get("diseases")), id="disease-list", className="disease-list")
+        ], className="mb-3"),
+        
+        # Structures and most potent activities (from the target dossier)
+        html.Div([
+            html.H5("Structures"),
+            create_structure_list(target.get("structures"))
         ], className="mb-3"),
         
-    ], className="target-details-container")
\ No newline at end of file
+        html.Div([
+            html.H5("Top Activities"),
+            create_activity_list(target.get("activities"))
+        ], className="mb-3"),
+        
+    ], className="target-details-container")
+
+def create_activity_summary(summary=None):
+    """Creates the compound/activity figures of a target"""
+    if not summary or not summary["activity_count"]:
+        return html.P("No activity data", className="text-muted")
+    
+    best = summary["best_pactivity"]
+    figures = [
+        ("Compounds", summary["compound_count"]),
+        ("Activities", summary["activity_count"]),
+        ("Assay types", summary["assay_count"]),
+        ("Mechanisms", summary["mechanism_count"]),
+        ("Best pActivity", f"{best:.2f}" if best is not None else "N/A"),
+    ]
+    return dbc.Row([
+        dbc.Col([
+            html.Div(str(value), className="h4 mb-0"),
+            html.Small(label, className="text-muted")
+        ], className="text-center")
+        for label, value in figures
+    ])
+
+
+def create_disease_list(diseases=None):
+    """Creates the list of diseases related to a target, with relationship and evidence"""
+    if not diseases:
+        return html.P("No associated diseases", className="text-muted")
+    
+    return html.Ul([
+        html.Li([
+            html.Span(disease["name"]),
+            html.Span(disease["relationship_type"], className="badge bg-secondary ms-2"),
+            html.Span(f"{disease['evidence_level']} evidence", className="badge bg-light text-dark ms-1")
+        ])
+        for disease in diseases
+    ], className="list-unstyled")
+
+def create_structure_list(structures=None):
+    """Creates the list of structures of a target"""
+    if not structures:
+        return html.P("No structures", className="text-muted")
+    
+    return html.Ul([
+        html.Li([
+            html.Strong(structure["pdb_id"] or f"Structure {structure['id']}"),
+            html.Span(
+                f" ({structure['resolution']:.2f} Å)" if structure["resolution"] is not None else "",
+                className="text-muted"
+            ),
+            html.Span(f" {structure['description']}" if structure["description"] else "")
+        ])
+        for structure in structures
+    ], className="list-unstyled")
+
+def create_activity_list(activities=None, limit=10):
+    """Creates a table of the most potent activities of a target"""
+    if not activities:
+        return html.P("No activity data", className="text-muted")
+    
+    rows = [
+        html.Tr([
+            html.Td(activity["compound_name"]),
+            html.Td(activity["activity_type"]),
+            html.Td(f"{activity['activity_value']} {activity['activity_unit']}"),
+            html.Td(f"{activity['pactivity']:.2f}" if activity["pactivity"] is not None else "N/A")
+        ])
+        for activity in activities[:limit]
+    ]
+    return html.Div([
+        dbc.Table([
+            html.Thead(html.Tr([html.Th("Compound"), html.Th("Type"), html.Th("Value"), html.Th("pActivity")])),
+            html.Tbody(rows)
+        ], size="sm", striped=True),
+        html.Small(f"Showing {len(rows)} of {len(activities)}", className="text-muted")
+        if len(activities) > limit else None
+    ])
\ No newline at end of file
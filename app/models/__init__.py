@@ -1,7 +1,7 @@
 from app.models.database import Base, engine
 from app.models.targets import Target, Structure
 from app.models.diseases import Disease, TargetDiseaseRelation
-from app.models.compounds import Compound, CompoundActivity
+from app.models.compounds import Compound, CompoundActivity, TargetActivitySummary
 
 # Create tables
 def create_tables():
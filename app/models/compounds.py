@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
+import datetime
 
 from app.models.database import Base
 
@@ -10,20 +11,34 @@ class Compound(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     smiles = Column(Text, nullable=False)
+    canonical_smiles = Column(Text, nullable=True)
+    inchikey = Column(String(27), nullable=True, unique=True, index=True)
     molecular_formula = Column(String(100), nullable=True)
     molecular_weight = Column(Float, nullable=True)
     logp = Column(Float, nullable=True)
+    tpsa = Column(Float, nullable=True)
+    hbd = Column(Integer, nullable=True)  # H-bond donors
+    hba = Column(Integer, nullable=True)  # H-bond acceptors
+    rotatable_bonds = Column(Integer, nullable=True)
+    murcko_scaffold = Column(Text, nullable=True, index=True)  # '' for acyclic compounds
+    generic_scaffold = Column(Text, nullable=True, index=True)  # Murcko framework, all atoms C, all bonds single
+    cluster_id = Column(Integer, nullable=True, index=True)  # ID of the Butina cluster centroid compound
     development_stage = Column(String(50), nullable=False)  # hit, lead, clinical, approved
     origin = Column(String(100), nullable=True)  # literature, proprietary, purchased
     patent_status = Column(Text, nullable=True)
     notes = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=True, index=True, default=datetime.datetime.utcnow)  # NULL for rows added before it existed
     
     # Relationships
     targets = relationship("CompoundActivity", back_populates="compound")
 
 class CompoundActivity(Base):
     __tablename__ = "compound_activities"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Potency range queries: "pIC50 >= 7 on target X"
+        Index("ix_compound_activities_target_type_pactivity", "target_id", "activity_type", "pactivity"),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     compound_id = Column(Integer, ForeignKey("compounds.id"))
@@ -31,9 +46,26 @@ class CompoundActivity(Base):
     activity_type = Column(String(50), nullable=False)  # IC50, EC50, Ki, etc.
     activity_value = Column(Float, nullable=False)
     activity_unit = Column(String(20), nullable=False)  # nM, μM, etc.
+    pactivity = Column(Float, nullable=True)  # -log10(molar); NULL if the unit isn't a concentration
     mechanism = Column(String(100), nullable=True)  # inhibitor, activator, etc.
     notes = Column(Text, nullable=True)
     
     # Relationships
     compound = relationship("Compound", back_populates="targets")
-    target = relationship("Target", back_populates="compounds")
\ No newline at end of file
+    target = relationship("Target", back_populates="compounds")
+
+class TargetActivitySummary(Base):
+    """
+    Per-target activity aggregates, kept current by
+    app.services.activity_summary whenever activities change.
+    """
+    __tablename__ = "target_activity_summary"
+    __table_args__ = {'extend_existing': True}
+
+    target_id = Column(Integer, ForeignKey("targets.id", ondelete="CASCADE"), primary_key=True)
+    compound_count = Column(Integer, nullable=False, default=0)
+    activity_count = Column(Integer, nullable=False, default=0)
+    assay_count = Column(Integer, nullable=False, default=0)  # distinct activity types
+    mechanism_count = Column(Integer, nullable=False, default=0)
+    best_pactivity = Column(Float, nullable=True)
+    updated_at = Column(DateTime, nullable=False)
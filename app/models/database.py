@@ -1,5 +1,5 @@
 # app/models/database.py
-from sqlalchemy import create_engine
+from sqlalchemy import and_, create_engine, delete, exists, func, inspect, select, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -29,4 +29,69 @@ def get_session():
 
 def init_db():
     """Initialize the database by creating all tables."""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    upgrade_db()
+
+def upgrade_db():
+    """
+    Add columns and indexes that were introduced after a table was created.
+    
+    create_all() only creates missing tables, so new (nullable) columns and
+    new indexes on existing tables are added here. Rows that would violate
+    a new unique index are removed first (see _dedupe_for_index).
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    if index.unique and not _dedupe_for_index(connection, table, index):
+                        continue
+                    index.create(connection)
+
+def _dedupe_for_index(connection, table, index):
+    """
+    Delete rows that would violate a new unique index, keeping the newest
+    (highest ID) row of each duplicate group.
+
+    Rows of tables that other tables reference are never deleted: the index
+    is skipped with a message instead, so the operator can merge the
+    duplicates and restart.
+
+    Returns:
+        True if the index can be created
+    """
+    key = list(table.primary_key.columns)[0]
+    newer = table.alias("newer")
+    duplicate = exists().where(and_(
+        *[newer.c[column.name] == column for column in index.columns],
+        newer.c[key.name] > key
+    ))
+    n_duplicates = connection.execute(select(func.count()).select_from(table).where(duplicate)).scalar()
+    if not n_duplicates:
+        return True
+
+    referenced = any(
+        foreign_key.column.table is table
+        for other in Base.metadata.tables.values() for foreign_key in other.foreign_keys
+    )
+    columns = ", ".join(column.name for column in index.columns)
+    if referenced:
+        print(f"Not creating unique index {index.name}: {n_duplicates} rows of {table.name} repeat "
+              f"({columns}) of a newer row and are referenced by other tables; merge them and restart")
+        return False
+
+    connection.execute(delete(table).where(duplicate))
+    print(f"Removed {n_duplicates} duplicate rows of {table.name} ({columns}), "
+          f"keeping the newest, before creating unique index {index.name}")
+    return True
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.models.database import Base
@@ -22,7 +22,11 @@ class Disease(Base):
 
 class TargetDiseaseRelation(Base):
     __tablename__ = "target_disease_relations"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # One relation per target-disease pair; also backs the per-target diff
+        Index("ix_target_disease_relations_pair", "target_id", "disease_id", unique=True),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     target_id = Column(Integer, ForeignKey("targets.id"))
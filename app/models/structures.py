@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from app.models.database import Base
 
@@ -8,9 +8,10 @@ class Structure(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     target_id = Column(Integer, ForeignKey("targets.id"), index=True)
-    pdb_id = Column(String, index=True)
-    resolution = Column(Float)
-    file_path = Column(String)
+    pdb_id = Column(String(10), nullable=True, index=True)
+    resolution = Column(Float, nullable=True)
+    file_path = Column(String(255), nullable=True)
+    description = Column(Text, nullable=True)
     
     # Relationship
-    target = relationship("Target", back_populates="structures")
\ No newline at end of file
+    target = relationship("Target", back_populates="structures")
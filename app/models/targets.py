@@ -11,9 +11,9 @@ class Target(Base):
     name = Column(String(255), nullable=False)
     alternative_names = Column(Text, nullable=True)
     organism = Column(String(100), nullable=False)  # human, viral, bacterial, fungal
-    category = Column(String(100), nullable=False)  # cardiovascular, viral, fungal, etc.
-    validation_status = Column(String(50), nullable=False)  # novel, partially validated, established
-    priority = Column(String(20), nullable=False)  # high, medium, low
+    category = Column(String(100), nullable=False, index=True)  # cardiovascular, viral, fungal, etc.
+    validation_status = Column(String(50), nullable=False, index=True)  # novel, partially validated, established
+    priority = Column(String(20), nullable=False, index=True)  # high, medium, low
     description = Column(Text, nullable=False)
     mechanism = Column(Text, nullable=False)
     notes = Column(Text, nullable=True)
@@ -25,16 +25,5 @@ class Target(Base):
     diseases = relationship("TargetDiseaseRelation", back_populates="target")
     compounds = relationship("CompoundActivity", back_populates="target")
 
-class Structure(Base):
-    __tablename__ = "structures"
-    __table_args__ = {'extend_existing': True}
-
-    id = Column(Integer, primary_key=True, index=True)
-    target_id = Column(Integer, ForeignKey("targets.id"))
-    pdb_id = Column(String(10), nullable=True)
-    resolution = Column(Float, nullable=True)
-    file_path = Column(String(255), nullable=True)
-    description = Column(Text, nullable=True)
-    
-    # Relationships
-    target = relationship("Target", back_populates="structures")
\ No newline at end of file
+# Structure lives in app.models.structures; re-exported here for existing imports
+from app.models.structures import Structure  # noqa: E402,F401
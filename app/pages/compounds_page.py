@@ -1,9 +1,11 @@
 import dash_bootstrap_components as dbc
-from dash import html, dcc, dash_table, callback
-from dash.dependencies import Input, Output, State
+from dash import html, dcc, dash_table, callback, clientside_callback
+from dash.dependencies import Input, Output, State, ClientsideFunction
+from sqlalchemy.exc import IntegrityError
 from app.components.compound_form import create_compound_form
 from app.models.compounds import Compound
 from app.models.database import SessionLocal
+from app.services.compound_descriptors import find_compound_by_smiles
 import pandas as pd
 
 def layout():
@@ -24,7 +26,8 @@ def layout():
         # Main content layout
         dbc.Row([
             dbc.Col([
-                html.Div(id="compounds-content")
+                html.Div(id="compounds-content"),
+                html.Div(id="compound-save-output")
             ])
         ]),
         
@@ -66,20 +69,17 @@ def layout():
         create_compound_form(),
     ])
 
-# Callback to open the modal
-@callback(
+# Open/close the modal in the browser (assets/ui_callbacks.js)
+clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggle_modal"),
     Output("compound-modal", "is_open"),
     [Input("btn-add-compound", "n_clicks"), Input("close-compound-modal", "n_clicks")],
     [State("compound-modal", "is_open")],
 )
-def toggle_modal(n1, n2, is_open):
-    if n1 or n2:
-        return not is_open
-    return is_open
 
 # Callback to save the compound
 @callback(
-    Output("compound-table", "data"),
+    [Output("compound-table", "data"), Output("compound-save-output", "children")],
     [Input("save-compound", "n_clicks")],
     [
         State("compound-name", "value"),
@@ -91,22 +91,42 @@ def toggle_modal(n1, n2, is_open):
 )
 def save_compound(n_clicks, name, smiles, formula, stage, current_data):
     if n_clicks and name:
-        # Save to database
         session = SessionLocal()
-        new_compound = Compound(
-            name=name,
-            smiles=smiles,
-            molecular_formula=formula,
-            development_stage=stage
-        )
-        session.add(new_compound)
-        session.commit()
-        session.close()
+        try:
+            # Don't add a second copy of a molecule that is already stored
+            duplicate = find_compound_by_smiles(session, smiles)
+            if duplicate is None:
+                # Formula, MW, logP, InChIKey etc. are computed from the SMILES on insert
+                session.add(Compound(
+                    name=name,
+                    smiles=smiles,
+                    molecular_formula=formula,
+                    development_stage=stage
+                ))
+                try:
+                    session.commit()
+                except IntegrityError:
+                    # Stored by someone else in the meantime (unique InChIKey)
+                    session.rollback()
+                    duplicate = find_compound_by_smiles(session, smiles)
+                    if duplicate is None:
+                        raise
+            if duplicate is not None:
+                message = dbc.Alert(
+                    f"Not added: duplicate of compound {duplicate.name} (ID {duplicate.id})", color="warning"
+                )
+            else:
+                message = dbc.Alert(f"Compound {name} added", color="success")
+        except Exception as e:
+            print(f"Error saving compound: {e}")
+            message = dbc.Alert(f"Error: {str(e)}", color="danger")
+        finally:
+            session.close()
         
         # Update table data
-        return get_compound_data()
+        return get_compound_data(), message
     
-    return current_data or []
+    return current_data or [], None
 
 # Function to load compound data
 def get_compound_data():
@@ -1,6 +1,6 @@
 import dash_bootstrap_components as dbc
-from dash import html, dcc, dash_table, callback
-from dash.dependencies import Input, Output, State
+from dash import html, dcc, dash_table, callback, clientside_callback
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from app.components.disease_form import create_disease_form
 from app.models.diseases import Disease
 from app.models.database import SessionLocal
@@ -66,16 +66,13 @@ def layout():
         create_disease_form(),
     ])
 
-# Callback to open the modal
-@callback(
+# Open/close the modal in the browser (assets/ui_callbacks.js)
+clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggle_modal"),
     Output("disease-modal", "is_open"),
     [Input("btn-add-disease", "n_clicks"), Input("close-disease-modal", "n_clicks")],
     [State("disease-modal", "is_open")],
 )
-def toggle_modal(n1, n2, is_open):
-    if n1 or n2:
-        return not is_open
-    return is_open
 
 # Callback to save the disease
 @callback(
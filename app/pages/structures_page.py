@@ -1,6 +1,6 @@
 import dash_bootstrap_components as dbc
-from dash import html, dcc, dash_table, callback
-from dash.dependencies import Input, Output, State
+from dash import html, dcc, dash_table, callback, clientside_callback
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from app.components.structure_form import create_structure_form
 from app.models.targets import Structure, Target  # Updated this line
 from app.models.database import SessionLocal
@@ -66,16 +66,13 @@ def layout():
         create_structure_form(),
     ])
 
-# Callback to open the modal
-@callback(
+# Open/close the modal in the browser (assets/ui_callbacks.js)
+clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggle_modal"),
     Output("structure-modal", "is_open"),
     [Input("btn-add-structure", "n_clicks"), Input("close-structure-modal", "n_clicks")],
     [State("structure-modal", "is_open")],
 )
-def toggle_modal(n1, n2, is_open):
-    if n1 or n2:
-        return not is_open
-    return is_open
 
 # Callback to save the structure
 @callback(
@@ -111,19 +108,20 @@ def save_structure(n_clicks, target_id, pdb_id, resolution, file_path, current_d
 # Function to load structure data
 def get_structure_data():
     session = SessionLocal()
-    # Join with Target to get target names
-    structures = session.query(
-        Structure, Target.name.label("target_name")
-    ).join(Target).all()
+    # One joined query for just the displayed columns, so no Structure rows
+    # (or their target relationship) are loaded per row
+    rows = session.query(
+        Target.name.label("target_name"), Structure.pdb_id, Structure.resolution
+    ).join(Target, Target.id == Structure.target_id).all()
     session.close()
     
     return [
         {
-            "target_name": structure[1],  # target_name from the join
-            "pdb_id": structure[0].pdb_id,
-            "resolution": structure[0].resolution,
+            "target_name": row.target_name,
+            "pdb_id": row.pdb_id,
+            "resolution": row.resolution,
         }
-        for structure in structures
+        for row in rows
     ]
 
 # Callback to load structure data on page load
@@ -1,9 +1,14 @@
 import dash_bootstrap_components as dbc
-from dash import html, dcc, dash_table, callback
-from dash.dependencies import Input, Output, State
+from dash import html, dcc, dash_table, callback, ctx, clientside_callback
+from dash.dependencies import Input, Output, State, ClientsideFunction
+from dash.exceptions import PreventUpdate
 from app.components.target_form import create_target_form
+from app.components.target_browser import facet_options, get_target_page
+from app.components.target_details import create_target_details
 from app.models.targets import Target
 from app.models.database import SessionLocal
+from app.services.target_dossier import load_target_dossier
+from app.services.target_facets import PAGE_SIZE
 import pandas as pd
 
 def layout():
@@ -39,6 +44,8 @@ def layout():
                             {"name": "Category", "id": "category"},
                             {"name": "Validation", "id": "validation_status"},
                             {"name": "Priority", "id": "priority"},
+                            {"name": "Compounds", "id": "compound_count", "type": "numeric"},
+                            {"name": "Best pActivity", "id": "best_pactivity", "type": "numeric"},
                         ],
                         data=[],
                         style_table={"overflowX": "auto"},
@@ -56,7 +63,10 @@ def layout():
                                 "backgroundColor": "rgb(248, 248, 248)"
                             }
                         ],
-                        page_size=10,
+                        page_action="custom",
+                        page_current=0,
+                        page_size=PAGE_SIZE,
+                        page_count=1,
                         row_selectable="single",
                     )
                 ])
@@ -67,16 +77,13 @@ def layout():
         create_target_form(),
     ])
 
-# Callback to open the modal
-@callback(
+# Open/close the modal in the browser (assets/ui_callbacks.js)
+clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggle_modal"),
     Output("target-modal", "is_open"),
     [Input("btn-add-target", "n_clicks"), Input("close-target-modal", "n_clicks")],
     [State("target-modal", "is_open")],
 )
-def toggle_modal(n1, n2, is_open):
-    if n1 or n2:
-        return not is_open
-    return is_open
 
 # Callback to save the target
 @callback(
@@ -90,9 +97,14 @@ def toggle_modal(n1, n2, is_open):
         State("target-mechanism", "value"),
         State("target-description", "value"),
         State("target-table", "data"),
+        State("category-filter", "value"),
+        State("validation-filter", "value"),
+        State("priority-filter", "value"),
+        State("target-table", "page_current"),
     ],
 )
-def save_target(n_clicks, name, category, validation, priority, mechanism, description, current_data):
+def save_target(n_clicks, name, category, validation, priority, mechanism, description, current_data,
+                category_filter, validation_filter, priority_filter, page):
     if n_clicks and name:
         # Save to database
         session = SessionLocal()
@@ -109,31 +121,70 @@ def save_target(n_clicks, name, category, validation, priority, mechanism, descr
         session.close()
         
         # Update table data
-        return get_target_data()
+        return get_target_page(_filters(category_filter, validation_filter, priority_filter), page or 0)[0]
     
     return current_data or []
 
-# Function to load target data
-def get_target_data():
-    session = SessionLocal()
-    targets = session.query(Target).all()
-    session.close()
-    
-    return [
-        {
-            "name": target.name,
-            "category": target.category,
-            "validation_status": target.validation_status,
-            "priority": target.priority,
-        }
-        for target in targets
-    ]
+def _filters(categories, validation_statuses, priority):
+    """Facet filter state from the navbar filter values ("all" = any priority)."""
+    return {
+        "category": categories or [],
+        "validation_status": validation_statuses or [],
+        "priority": [] if priority in (None, "all") else [priority]
+    }
 
-# Callback to load target data on page load
+# Callback to load the filtered page of targets and the navbar facet counts
 @callback(
-    Output("target-table", "data", allow_duplicate=True),
-    [Input("targets-content", "children")],
+    [
+        Output("target-table", "data", allow_duplicate=True),
+        Output("target-table", "page_count"),
+        Output("target-table", "page_current"),
+        Output("category-filter", "options"),
+        Output("validation-filter", "options"),
+        Output("priority-filter", "options"),
+    ],
+    [
+        Input("targets-content", "children"),
+        Input("category-filter", "value"),
+        Input("validation-filter", "value"),
+        Input("priority-filter", "value"),
+        Input("target-table", "page_current"),
+    ],
+    prevent_initial_call="initial_duplicate",
+)
+def load_target_data(_, categories, validation_statuses, priority, page):
+    # Showing target details replaces targets-content; the table stays as it is
+    if ctx.triggered_id == "targets-content":
+        raise PreventUpdate
+    # A new filter state starts again from the first page
+    if ctx.triggered_id != "target-table":
+        page = 0
+    data, counts = get_target_page(_filters(categories, validation_statuses, priority), page or 0)
+    page_count = max(1, -(-counts["total"] // PAGE_SIZE))
+    priority_options = [{"label": f"All ({sum(counts['priority'].values())})", "value": "all"}]
+    return (
+        data,
+        page_count,
+        page or 0,
+        facet_options(counts["category"], categories),
+        facet_options(counts["validation_status"], validation_statuses),
+        priority_options + facet_options(counts["priority"], [] if priority in (None, "all") else [priority]),
+    )
+
+
+# Callback to show the details of the selected target
+@callback(
+    Output("targets-content", "children"),
+    [Input("target-table", "selected_rows")],
+    [State("target-table", "data")],
     prevent_initial_call=True,
 )
-def load_target_data(_):
-    return get_target_data()
\ No newline at end of file
+def show_target_details(selected_rows, data):
+    if not selected_rows or not data:
+        return create_target_details()
+    
+    session = SessionLocal()
+    # Structures, diseases and activities come back with the target in one query
+    target = load_target_dossier(session, data[selected_rows[0]]["id"])
+    session.close()
+    return create_target_details(target)
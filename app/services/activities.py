@@ -0,0 +1,221 @@
+# services/activities.py
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, update
+
+from app.models.compounds import Compound, CompoundActivity
+from app.models.targets import Target
+# Also registers the listener keeping target summaries current on ORM writes
+from app.services.activity_summary import refresh_target_summaries
+
+BATCH_SIZE = 1000
+
+# Molar factor of each accepted concentration unit, keyed by normalize_unit()
+UNIT_TO_MOLAR = {
+    "m": 1.0,
+    "mm": 1e-3,
+    "um": 1e-6,
+    "nm": 1e-9,
+    "pm": 1e-12,
+    "fm": 1e-15,
+    "mol/l": 1.0,
+    "mmol/l": 1e-3,
+    "umol/l": 1e-6,
+    "nmol/l": 1e-9,
+    "pmol/l": 1e-12,
+}
+# Units of values that already are -log10(molar), e.g. pIC50 7.2
+LOG_UNITS = {"", "-", "log", "-log(m)", "log units", "p"}
+UNIT_LABELS = {"m": "M", "mm": "mM", "um": "μM", "nm": "nM", "pm": "pM", "fm": "fM"}
+
+REQUIRED_COLUMNS = ("activity_type", "activity_value", "activity_unit")
+OPTIONAL_COLUMNS = ("mechanism", "notes")
+
+
+def normalize_unit(unit):
+    """Lookup form of a unit string: trimmed, lower case, micro signs as 'u'."""
+    if unit is None:
+        return ""
+    return str(unit).strip().replace("µ", "u").replace("μ", "u").replace(" ", "").lower()
+
+
+def is_log_type(activity_type):
+    """True for logarithmic activity types such as pIC50 or pKi."""
+    activity_type = str(activity_type or "").strip()
+    return len(activity_type) > 1 and activity_type[0] in "pP" and activity_type[1].isupper()
+
+
+def validate_unit(unit, activity_type=None):
+    """
+    Check a unit against the conversion table.
+
+    Raises:
+        ValueError: If the unit can't be converted to molar
+    """
+    key = normalize_unit(unit)
+    if key in UNIT_TO_MOLAR or (is_log_type(activity_type) and key in LOG_UNITS):
+        return
+    raise ValueError(f"Unknown activity unit '{unit}'; use one of {', '.join(UNIT_LABELS.values())}")
+
+
+def compute_pactivity(values, units, activity_types=None):
+    """
+    Vectorized -log10(molar) of activity values.
+
+    Values of logarithmic activity types (pIC50, ...) are taken as they are.
+
+    Args:
+        values: Activity values
+        units: Unit strings, one per value
+        activity_types: Optional activity types, one per value
+
+    Returns:
+        float array; NaN where the unit is unknown or the value isn't positive
+    """
+    values = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+    keys = pd.Series(units, dtype=object).map(normalize_unit)
+    factors = keys.map(UNIT_TO_MOLAR).to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pactivity = -np.log10(values * factors)
+    pactivity[~(values > 0)] = np.nan
+
+    if activity_types is not None:
+        log_rows = pd.Series(activity_types, dtype=object).map(is_log_type).to_numpy(dtype=bool)
+        log_rows &= keys.isin(LOG_UNITS).to_numpy() | np.isnan(factors)
+        pactivity[log_rows] = values[log_rows]
+    return pactivity
+
+
+def apply_pactivity(activity):
+    """Fill pactivity of a CompoundActivity from its value and unit (before insert)."""
+    value = compute_pactivity([activity.activity_value], [activity.activity_unit], [activity.activity_type])[0]
+    activity.pactivity = None if np.isnan(value) else round(float(value), 3)
+    return activity
+
+
+def pactivity_threshold(value, unit):
+    """pActivity bound for a potency cutoff, e.g. 100 nM -> 7.0."""
+    validate_unit(unit)
+    return float(-np.log10(value * UNIT_TO_MOLAR[normalize_unit(unit)]))
+
+
+def update_pactivity(session, only_missing=True):
+    """
+    Compute pactivity of stored activities and write it back in bulk.
+
+    Args:
+        session: Database session (committed by the caller)
+        only_missing: Skip activities that already have a pactivity
+
+    Returns:
+        (updated, unconvertible) where unconvertible counts rows with an
+        unknown unit or a non-positive value
+    """
+    query = session.query(
+        CompoundActivity.id, CompoundActivity.activity_value,
+        CompoundActivity.activity_unit, CompoundActivity.activity_type,
+        CompoundActivity.target_id
+    )
+    if only_missing:
+        query = query.filter(CompoundActivity.pactivity.is_(None))
+    rows = query.order_by(CompoundActivity.id).all()
+    if not rows:
+        return 0, 0
+
+    ids, values, units, types, target_ids = zip(*rows)
+    pactivity = np.round(compute_pactivity(values, units, types), 3)
+    valid = ~np.isnan(pactivity)
+    updates = [
+        {"id": activity_id, "pactivity": value}
+        for activity_id, value in zip(np.array(ids)[valid].tolist(), pactivity[valid].tolist())
+    ]
+    for i in range(0, len(updates), BATCH_SIZE):
+        session.execute(update(CompoundActivity), updates[i:i + BATCH_SIZE])
+    refresh_target_summaries(session, np.array(target_ids, dtype=object)[valid].tolist())
+    return len(updates), int((~valid).sum())
+
+
+def _resolve_ids(session, df, id_column, name_column, model):
+    """IDs from an ID column, or looked up by name, as a float Series (NaN if unknown)."""
+    if id_column in df.columns:
+        ids = pd.to_numeric(df[id_column], errors="coerce")
+        known = {row[0] for row in session.query(model.id).filter(model.id.in_(ids.dropna().astype(int).unique().tolist()))}
+        return ids.where(ids.isin(known))
+    if name_column in df.columns:
+        names = df[name_column].astype(str).str.strip()
+        lookup = dict(session.query(model.name, model.id).filter(model.name.in_(names.unique().tolist())))
+        return names.map(lookup).astype(float)
+    raise ValueError(f"Missing required column: {id_column} or {name_column}")
+
+
+def import_activities(session, df):
+    """
+    Validate and insert activity rows from a DataFrame.
+
+    Validation is vectorized over the whole frame: compounds and targets are
+    resolved with one lookup each, values must be positive numbers and
+    units must be in the conversion table. Valid rows are written with a
+    single multi-row INSERT, pactivity included, and the summaries of the
+    affected targets are refreshed.
+
+    Args:
+        session: Database session (committed by the caller)
+        df: DataFrame with 'compound_id' or 'compound' (name), 'target_id'
+            or 'target' (name), activity_type, activity_value and
+            activity_unit columns, and optionally mechanism and notes
+
+    Returns:
+        Dict with 'inserted' and 'errors' (list of {'row', 'message'} for
+        rejected rows, row numbers starting at 1)
+    """
+    df = df.rename(columns=lambda column: str(column).strip().lower()).reset_index(drop=True)
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    compound_ids = _resolve_ids(session, df, "compound_id", "compound", Compound)
+    target_ids = _resolve_ids(session, df, "target_id", "target", Target)
+    types = df["activity_type"].where(df["activity_type"].notna(), "").astype(str).str.strip()
+    values = pd.to_numeric(df["activity_value"], errors="coerce")
+    units = df["activity_unit"].where(df["activity_unit"].notna(), "").astype(str).str.strip()
+    pactivity = compute_pactivity(values, units, types)
+
+    checks = [
+        (compound_ids.isna(), "Unknown compound"),
+        (target_ids.isna(), "Unknown target"),
+        (types == "", "Missing activity type"),
+        (~(values > 0), "Activity value must be a positive number"),
+        (pd.Series(np.isnan(pactivity)) & (values > 0), "Unknown activity unit"),
+    ]
+    errors = {}
+    for failed, message in checks:
+        for row in np.flatnonzero(failed.to_numpy()):
+            errors.setdefault(int(row), message)
+
+    valid = np.ones(len(df), dtype=bool)
+    valid[list(errors)] = False
+    rows = []
+    for i in np.flatnonzero(valid):
+        row = {
+            "compound_id": int(compound_ids[i]),
+            "target_id": int(target_ids[i]),
+            "activity_type": types[i],
+            "activity_value": float(values[i]),
+            "activity_unit": UNIT_LABELS.get(normalize_unit(units[i]), units[i]),
+            "pactivity": round(float(pactivity[i]), 3)
+        }
+        for column in OPTIONAL_COLUMNS:
+            value = df[column][i] if column in df.columns else None
+            row[column] = None if pd.isna(value) else str(value)
+        rows.append(row)
+
+    if rows:
+        session.execute(insert(CompoundActivity), rows)
+        refresh_target_summaries(session, {row["target_id"] for row in rows})
+
+    return {
+        "inserted": len(rows),
+        "errors": [{"row": row + 1, "message": message} for row, message in sorted(errors.items())]
+    }
@@ -0,0 +1,176 @@
+# services/activity_summary.py
+
+from itertools import chain
+
+from sqlalchemy import delete, event, exists, func, insert, inspect, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.compounds import CompoundActivity, TargetActivitySummary
+from app.models.targets import Target
+
+BATCH_SIZE = 500
+SUMMARY_COLUMNS = (
+    "target_id", "compound_count", "activity_count", "assay_count",
+    "mechanism_count", "best_pactivity", "updated_at"
+)
+
+
+def _aggregate_query(target_ids=None):
+    """SELECT of summary rows computed from compound_activities, one per target."""
+    query = select(
+        CompoundActivity.target_id,
+        func.count(func.distinct(CompoundActivity.compound_id)),
+        func.count(CompoundActivity.id),
+        func.count(func.distinct(CompoundActivity.activity_type)),
+        func.count(func.distinct(CompoundActivity.mechanism)),
+        func.max(CompoundActivity.pactivity),
+        func.current_timestamp()
+    ).where(CompoundActivity.target_id.isnot(None)).group_by(CompoundActivity.target_id).order_by(
+        # Concurrent upserts lock summary rows in the same order, so they wait rather than deadlock
+        CompoundActivity.target_id
+    )
+    if target_ids is not None:
+        query = query.where(CompoundActivity.target_id.in_(target_ids))
+    return query
+
+
+def _dialect_name(connection):
+    dialect = getattr(connection, "dialect", None) or connection.get_bind().dialect
+    return dialect.name
+
+
+def _lock_summary_rows(connection, target_ids=None):
+    """
+    Make sure the summary rows of the given targets (all targets if None)
+    exist, and lock them in target order.
+
+    Placeholder rows are inserted with ON CONFLICT DO NOTHING (which waits
+    for a concurrent insert of the same row to commit), then the rows are
+    locked with SELECT ... FOR UPDATE. Where FOR UPDATE is not supported
+    (SQLite) the database lock of the first write serializes writers anyway.
+    """
+    dialect_insert = postgresql.insert if _dialect_name(connection) == "postgresql" else sqlite.insert
+    targets = select(
+        Target.id, literal(0), literal(0), literal(0), literal(0), literal(None), func.current_timestamp()
+    ).order_by(Target.id)
+    locked = select(TargetActivitySummary.target_id).order_by(TargetActivitySummary.target_id).with_for_update()
+    if target_ids is not None:
+        targets = targets.where(Target.id.in_(target_ids))
+        locked = locked.where(TargetActivitySummary.target_id.in_(target_ids))
+
+    connection.execute(
+        dialect_insert(TargetActivitySummary).from_select(SUMMARY_COLUMNS, targets).on_conflict_do_nothing(
+            index_elements=["target_id"]
+        )
+    )
+    connection.execute(locked)
+
+
+def _write_summaries(connection, target_ids=None):
+    """
+    Recompute the summary rows of the given targets (all targets if None)
+    and delete those of targets left without activities.
+
+    The summary rows are locked before the activities are aggregated, in a
+    later statement. Under READ COMMITTED each statement reads a fresh
+    snapshot, so a writer that waited for another writer's lock aggregates
+    activities that include the other writer's committed changes; an
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE on its own would write
+    counts read before the wait. Databases without ON CONFLICT get a
+    DELETE + INSERT.
+    """
+    dialect_name = _dialect_name(connection)
+    if dialect_name not in ("postgresql", "sqlite"):
+        stale = delete(TargetActivitySummary)
+        if target_ids is not None:
+            stale = stale.where(TargetActivitySummary.target_id.in_(target_ids))
+        connection.execute(stale)
+        connection.execute(insert(TargetActivitySummary).from_select(SUMMARY_COLUMNS, _aggregate_query(target_ids)))
+        return
+
+    _lock_summary_rows(connection, target_ids)
+
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    upsert = dialect_insert(TargetActivitySummary).from_select(SUMMARY_COLUMNS, _aggregate_query(target_ids))
+    connection.execute(upsert.on_conflict_do_update(
+        index_elements=["target_id"],
+        set_={column: getattr(upsert.excluded, column) for column in SUMMARY_COLUMNS if column != "target_id"}
+    ))
+
+    stale = delete(TargetActivitySummary).where(~exists().where(
+        CompoundActivity.target_id == TargetActivitySummary.target_id
+    ))
+    if target_ids is not None:
+        stale = stale.where(TargetActivitySummary.target_id.in_(target_ids))
+    connection.execute(stale)
+
+
+def refresh_target_summaries(connection, target_ids):
+    """
+    Recompute the summary rows of the given targets.
+
+    Each target is re-aggregated from its own activities only (an index
+    range on target_id), so the cost doesn't grow with the table. Targets
+    left without activities lose their row.
+
+    Args:
+        connection: Session or Connection to execute on
+        target_ids: IDs of targets whose activities changed
+    """
+    target_ids = sorted({target_id for target_id in target_ids if target_id is not None})
+    for i in range(0, len(target_ids), BATCH_SIZE):
+        _write_summaries(connection, target_ids[i:i + BATCH_SIZE])
+
+
+def rebuild_target_summaries(session):
+    """
+    Recompute the whole summary table from compound_activities.
+
+    Returns:
+        Number of summary rows
+    """
+    _write_summaries(session)
+    return session.query(TargetActivitySummary).count()
+
+
+def get_target_summary(session, target_id):
+    """
+    Activity aggregates of one target by primary key lookup.
+
+    Returns:
+        Dict with compound_count, activity_count, assay_count,
+        mechanism_count and best_pactivity (zeros/None without activities)
+    """
+    summary = session.get(TargetActivitySummary, target_id)
+    return {
+        "compound_count": summary.compound_count if summary else 0,
+        "activity_count": summary.activity_count if summary else 0,
+        "assay_count": summary.assay_count if summary else 0,
+        "mechanism_count": summary.mechanism_count if summary else 0,
+        "best_pactivity": summary.best_pactivity if summary else None
+    }
+
+
+@event.listens_for(CompoundActivity.target_id, "set", active_history=True)
+def _load_previous_target(activity, value, previous, initiator):
+    """Load the old target on assignment so a moved activity refreshes it too."""
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_changed_targets(session, flush_context):
+    """
+    Keep summaries current for activities written through the ORM.
+
+    Both the old and the new target of a moved activity are refreshed.
+    Bulk statements bypass the unit of work and call
+    refresh_target_summaries() themselves.
+    """
+    target_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, CompoundActivity):
+            history = inspect(obj).attrs.target_id.history
+            values = list(chain(history.added, history.unchanged, history.deleted))
+            target_ids.update(values or [inspect(obj).dict.get("target_id")])
+    if target_ids:
+        refresh_target_summaries(session.connection(), target_ids)
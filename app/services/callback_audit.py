@@ -0,0 +1,137 @@
+# services/callback_audit.py
+
+import builtins
+import inspect
+import types
+
+# Code from these modules talks to the database or the filesystem, or does
+# work (chemistry, array maths) that has to stay on the server
+SERVER_MODULE_PREFIXES = (
+    "app.models", "app.services", "sqlalchemy", "os", "shutil", "pathlib", "io", "tempfile",
+    "rdkit", "numpy", "pandas", "Bio", "requests", "urllib"
+)
+# Callbacks that build Dash components return layout defined in Python;
+# moving them clientside would mean duplicating that layout in JavaScript
+LAYOUT_MODULE_PREFIXES = ("dash.html", "dash.dcc", "dash.dash_table", "dash_bootstrap_components")
+SERVER_BUILTINS = {"open"}
+MAX_DEPTH = 6
+
+
+def _module_name(obj):
+    if isinstance(obj, types.ModuleType):
+        return obj.__name__
+    return getattr(obj, "__module__", None) or getattr(type(obj), "__module__", None) or ""
+
+
+def _is_server_module(name):
+    return any(
+        name == prefix or name.startswith(prefix + ".")
+        for prefix in SERVER_MODULE_PREFIXES + LAYOUT_MODULE_PREFIXES
+    )
+
+
+def _code_names(code):
+    """Global, attribute and free variable names used by a code object and its nested functions."""
+    names = set(code.co_names) | set(code.co_freevars)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _resolve(func, name):
+    closure = dict(zip(func.__code__.co_freevars, (cell.cell_contents for cell in func.__closure__ or ())))
+    if name in closure:
+        obj = closure[name]
+    elif name in func.__globals__:
+        obj = func.__globals__[name]
+    else:
+        return getattr(builtins, name, None)
+    return _unwrap(obj)
+
+
+def _unwrap(obj):
+    """See through decorators such as functools.lru_cache to the decorated function."""
+    return inspect.unwrap(obj) if callable(obj) and hasattr(obj, "__wrapped__") else obj
+
+
+def _is_app_code(obj, home):
+    """Code of the app packages, or of the module the audited callback is defined in (e.g. app.py)."""
+    name = _module_name(obj)
+    return name.startswith("app") or name == home
+
+
+def _contained_functions(container, depth=0):
+    """Functions held in a dict/list/tuple (e.g. a dispatch table of builders), nested up to MAX_DEPTH."""
+    values = container.values() if isinstance(container, dict) else container
+    for value in values:
+        if isinstance(value, (dict, list, tuple)) and depth < MAX_DEPTH:
+            yield from _contained_functions(value, depth + 1)
+        elif callable(value) and inspect.isfunction(_unwrap(value)):
+            yield _unwrap(value)
+
+
+def _touches_server(func, depth=0, seen=None, home=None):
+    """True if a function, or app code it calls, uses the database, files, server-side libraries or builds layout."""
+    seen = set() if seen is None else seen
+    home = func.__module__ if home is None else home
+    if depth > MAX_DEPTH or id(func) in seen:
+        return False
+    seen.add(id(func))
+
+    names = _code_names(func.__code__)
+    objects = []
+    for name in names:
+        obj = _resolve(func, name)
+        if obj is None:
+            continue
+        if name in SERVER_BUILTINS and obj is getattr(builtins, name):
+            return True
+        if _is_server_module(_module_name(obj)):
+            return True
+        objects.extend(_contained_functions(obj) if isinstance(obj, (dict, list, tuple)) else [obj])
+
+    for obj in objects:
+        if inspect.isfunction(obj) and _is_app_code(obj, home):
+            if _touches_server(obj, depth + 1, seen, home):
+                return True
+        elif not inspect.isclass(obj) and _is_app_code(obj, home):
+            # Component instances such as ``self``: follow the methods this code refers to
+            for name in names:
+                method = inspect.getattr_static(type(obj), name, None)
+                if inspect.isfunction(method) and _touches_server(method, depth + 1, seen, home):
+                    return True
+    return False
+
+
+def find_ui_only_callbacks(callback_map):
+    """
+    Server callbacks that use neither the database nor the filesystem and
+    build no Dash components.
+
+    Such callbacks only move component state around, so they can run in
+    the browser as clientside callbacks. The check follows the names each
+    callback uses into app functions (also through decorators such as
+    lru_cache and through dicts of functions) and component methods, so it
+    is a heuristic: review what it reports.
+
+    Args:
+        callback_map: Dash callback map (``app.callback_map`` and/or the
+            global map of ``dash.callback``)
+
+    Returns:
+        List of dicts with 'output', 'function' and 'module'
+    """
+    flagged = []
+    for output, entry in callback_map.items():
+        callback = entry.get("callback")
+        if callback is None:
+            continue  # Clientside callback
+        func = inspect.unwrap(callback)
+        if not _touches_server(func):
+            flagged.append({
+                "output": output,
+                "function": func.__qualname__,
+                "module": func.__module__
+            })
+    return flagged
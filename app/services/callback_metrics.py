@@ -0,0 +1,234 @@
+# services/callback_metrics.py
+
+import os
+import json
+import time
+import bisect
+import datetime
+import threading
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Dash posts every server callback to this route
+DISPATCH_PATH = "_dash-update-component"
+METRICS_URL = "/metrics"
+# Callbacks slower than this many seconds are written to the slow-callback log
+SLOW_CALLBACK_SECONDS = float(os.getenv("SLOW_CALLBACK_SECONDS", "1.0"))
+SLOW_CALLBACK_LOG = os.getenv("SLOW_CALLBACK_LOG", os.path.join("uploads", "logs", "slow_callbacks.log"))
+# Longest logged input value, in characters (uploads arrive as base64 strings)
+MAX_LOGGED_VALUE = 200
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class CallbackStats:
+    """Running totals for one callback, keyed by its output."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.sql_statements = 0
+        self.sql_seconds = 0.0
+        self.response_bytes = 0
+
+    def add(self, seconds, sql_statements, sql_seconds, response_bytes, error):
+        self.calls += 1
+        self.errors += int(error)
+        self.seconds += seconds
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        if index < len(self.buckets):
+            self.buckets[index] += 1
+        self.sql_statements += sql_statements
+        self.sql_seconds += sql_seconds
+        self.response_bytes += response_bytes
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def _current_callback():
+    """Measurements of the callback request this thread is serving, if any."""
+    if not has_request_context():
+        return None
+    return g.get("callback_metrics")
+
+
+# Start times live on the statement's execution context, so a statement that
+# raises (and never reaches after_cursor_execute) leaves nothing behind
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if _current_callback() is not None and context is not None:
+        context._callback_metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    measured = _current_callback()
+    start = getattr(context, "_callback_metrics_start", None)
+    if measured is None or start is None:
+        return
+    measured["sql_statements"] += 1
+    measured["sql_seconds"] += time.perf_counter() - start
+
+
+@event.listens_for(Engine, "handle_error")
+def _failed_statement(exception_context):
+    """Count statements that raised, with their time up to the error."""
+    measured = _current_callback()
+    start = getattr(exception_context.execution_context, "_callback_metrics_start", None)
+    if measured is None or start is None:
+        return
+    measured["sql_statements"] += 1
+    measured["sql_seconds"] += time.perf_counter() - start
+
+
+def _prop_id(item):
+    """'component-id.property' as in Dash's changedPropIds (dict IDs as sorted JSON)."""
+    component_id = item.get("id")
+    if isinstance(component_id, dict):
+        component_id = json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+    return f"{component_id}.{item.get('property')}"
+
+
+def _input_values(inputs):
+    """Prop ID -> value of a callback request's inputs (ALL inputs arrive as nested lists)."""
+    values = {}
+    for item in inputs:
+        for single in item if isinstance(item, list) else [item]:
+            values[_prop_id(single)] = single.get("value")
+    return values
+
+
+def _short(value):
+    text = json.dumps(value, default=str)
+    if len(text) > MAX_LOGGED_VALUE:
+        return text[:MAX_LOGGED_VALUE] + f"... ({len(text)} chars)"
+    return text
+
+
+def _log_slow_callback(output, body, seconds, measured, response_bytes, status):
+    """Print a slow callback and append it, with the inputs that triggered it, to SLOW_CALLBACK_LOG."""
+    values = _input_values(body.get("inputs", []))
+    triggered = {prop_id: _short(values.get(prop_id)) for prop_id in body.get("changedPropIds", [])}
+    entry = {
+        "time": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "callback": output,
+        "seconds": round(seconds, 4),
+        "sql_statements": measured["sql_statements"],
+        "sql_seconds": round(measured["sql_seconds"], 4),
+        "response_bytes": response_bytes,
+        "status": status,
+        "triggered": triggered
+    }
+    print(f"Slow callback {output}: {seconds:.3f}s, {measured['sql_statements']} SQL statements "
+          f"({measured['sql_seconds']:.3f}s), {response_bytes} bytes, "
+          f"triggered by {', '.join(triggered) or 'initial call'}")
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(SLOW_CALLBACK_LOG) or ".", exist_ok=True)
+            with open(SLOW_CALLBACK_LOG, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"Error writing slow callback log: {e}")
+
+
+def _start_callback():
+    if request.method == "POST" and request.path.endswith(DISPATCH_PATH):
+        g.callback_metrics = {"start": time.perf_counter(), "sql_statements": 0, "sql_seconds": 0.0}
+
+
+def _finish_callback(response):
+    measured = g.pop("callback_metrics", None)
+    if measured is None:
+        return response
+    seconds = time.perf_counter() - measured["start"]
+    body = request.get_json(silent=True) or {}
+    output = body.get("output", "unknown")
+    # Callbacks that update nothing answer 204 without a body
+    response_bytes = response.calculate_content_length() or 0
+    error = response.status_code >= 500
+
+    with _stats_lock:
+        _stats.setdefault(output, CallbackStats()).add(
+            seconds, measured["sql_statements"], measured["sql_seconds"], response_bytes, error
+        )
+    if seconds >= SLOW_CALLBACK_SECONDS:
+        _log_slow_callback(output, body, seconds, measured, response_bytes, response.status_code)
+    return response
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics():
+    """
+    Callback metrics in the Prometheus text exposition format.
+
+    Counts are per worker process, since each keeps its own totals.
+    """
+    with _stats_lock:
+        snapshot = {
+            output: (s.calls, s.errors, s.seconds, list(s.buckets), s.sql_statements, s.sql_seconds, s.response_bytes)
+            for output, s in _stats.items()
+        }
+
+    lines = [
+        "# HELP dash_callback_duration_seconds Wall time of Dash server callbacks.",
+        "# TYPE dash_callback_duration_seconds histogram"
+    ]
+    for output, (calls, _, seconds, buckets, *_) in sorted(snapshot.items()):
+        label = _label(output)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, buckets):
+            cumulative += count
+            lines.append(f'dash_callback_duration_seconds_bucket{{callback="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'dash_callback_duration_seconds_bucket{{callback="{label}",le="+Inf"}} {calls}')
+        lines.append(f'dash_callback_duration_seconds_sum{{callback="{label}"}} {seconds:.6f}')
+        lines.append(f'dash_callback_duration_seconds_count{{callback="{label}"}} {calls}')
+
+    counters = (
+        ("dash_callback_errors_total", "Dash server callbacks that failed with a server error.", 1, "{}"),
+        ("dash_callback_sql_statements_total", "SQL statements executed by Dash server callbacks.", 4, "{}"),
+        ("dash_callback_sql_seconds_total", "Time spent in SQL statements by Dash server callbacks.", 5, "{:.6f}"),
+        ("dash_callback_response_bytes_total", "Response payload bytes of Dash server callbacks.", 6, "{}")
+    )
+    for name, help_text, index, value_format in counters:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for output, values in sorted(snapshot.items()):
+            lines.append(f'{name}{{callback="{_label(output)}"}} {value_format.format(values[index])}')
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    with _stats_lock:
+        _stats.clear()
+
+
+def init_callback_metrics(app):
+    """
+    Measure every server callback of a Dash app and serve the totals at METRICS_URL.
+
+    All server callbacks, including those registered later with
+    ``dash.callback``, go through Dash's dispatch route, so the request
+    hooks time each one, count the SQL statements it runs (and their time)
+    through engine events, and record the size of its response. Callbacks
+    slower than SLOW_CALLBACK_SECONDS are printed and logged with the
+    inputs that triggered them.
+
+    Args:
+        app: Dash app
+    """
+    server = app.server
+    server.before_request(_start_callback)
+    server.after_request(_finish_callback)
+
+    @server.route(METRICS_URL)
+    def callback_metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,181 @@
+# services/compound_descriptors.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from rdkit import Chem, RDLogger
+from rdkit.Chem import Crippen, Descriptors, rdMolDescriptors
+from sqlalchemy import event, inspect, update
+
+from app.models.compounds import Compound
+
+DESCRIPTOR_WORKERS = int(os.getenv("DESCRIPTOR_WORKERS", str(os.cpu_count() or 1)))
+# Below this many compounds a process pool costs more than it saves
+PARALLEL_THRESHOLD = 200
+BATCH_SIZE = 500
+
+IDENTIFIER_COLUMNS = ("canonical_smiles", "inchikey")
+DESCRIPTOR_COLUMNS = IDENTIFIER_COLUMNS + (
+    "molecular_formula", "molecular_weight", "logp", "tpsa", "hbd", "hba", "rotatable_bonds"
+)
+# Columns filled by app.services.compound_series
+SERIES_COLUMNS = ("murcko_scaffold", "generic_scaffold", "cluster_id")
+
+
+def compute_descriptors(smiles):
+    """
+    Compute the stored identifiers and descriptors of a molecule.
+
+    The InChIKey is None for molecules without a standard InChI.
+
+    Returns:
+        Dict keyed by DESCRIPTOR_COLUMNS, or None if the SMILES can't be parsed
+    """
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    if mol is None:
+        return None
+
+    return {
+        "canonical_smiles": Chem.MolToSmiles(mol),
+        "inchikey": Chem.MolToInchiKey(mol) or None,
+        "molecular_formula": rdMolDescriptors.CalcMolFormula(mol),
+        "molecular_weight": round(Descriptors.MolWt(mol), 3),
+        "logp": round(Crippen.MolLogP(mol), 3),
+        "tpsa": round(rdMolDescriptors.CalcTPSA(mol), 2),
+        "hbd": rdMolDescriptors.CalcNumHBD(mol),
+        "hba": rdMolDescriptors.CalcNumHBA(mol),
+        "rotatable_bonds": rdMolDescriptors.CalcNumRotatableBonds(mol)
+    }
+
+
+def _descriptor_batch(rows):
+    """Compute descriptors for (key, smiles) rows (runs in a worker process)."""
+    RDLogger.DisableLog("rdApp.*")
+    return [(key, compute_descriptors(smiles)) for key, smiles in rows]
+
+
+def compute_descriptor_batch(rows, workers=None):
+    """
+    Compute descriptors for many molecules.
+
+    Large inputs are split into batches and spread over a process pool.
+
+    Args:
+        rows: Iterable of (key, smiles) pairs; the key is passed through
+        workers: Optional number of worker processes
+
+    Returns:
+        List of (key, descriptors or None) in input order
+    """
+    rows = list(rows)
+    if len(rows) < PARALLEL_THRESHOLD:
+        return _descriptor_batch(rows)
+
+    batches = [rows[i:i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or DESCRIPTOR_WORKERS) as pool:
+        for batch in pool.map(_descriptor_batch, batches):
+            results.extend(batch)
+    return results
+
+
+def apply_descriptors(compound):
+    """Fill the identifier and descriptor columns of a Compound from its SMILES (before insert)."""
+    descriptors = compute_descriptors(compound.smiles)
+    if descriptors:
+        for column, value in descriptors.items():
+            setattr(compound, column, value)
+    return compound
+
+
+@event.listens_for(Compound, "before_insert")
+def _descriptors_on_insert(mapper, connection, compound):
+    """Give every compound added through the ORM its identifiers and descriptors."""
+    if compound.canonical_smiles is None:
+        apply_descriptors(compound)
+
+
+@event.listens_for(Compound, "before_update")
+def _descriptors_on_update(mapper, connection, compound):
+    """Recompute identifiers and descriptors when the SMILES of a compound changes."""
+    if not inspect(compound).attrs.smiles.history.has_changes():
+        return
+    descriptors = compute_descriptors(compound.smiles)
+    # An unparseable new SMILES must not keep the identifiers of the old molecule
+    for column in DESCRIPTOR_COLUMNS:
+        setattr(compound, column, descriptors[column] if descriptors else None)
+    # Scaffolds and the cluster belong to the old molecule; cleared, they are
+    # recomputed by the next incremental series update
+    for column in SERIES_COLUMNS:
+        setattr(compound, column, None)
+
+
+def existing_inchikeys(session, inchikeys):
+    """Map InChIKeys already stored to their compound IDs (index lookups, in chunks)."""
+    inchikeys = [key for key in set(inchikeys) if key]
+    existing = {}
+    for i in range(0, len(inchikeys), BATCH_SIZE):
+        rows = session.query(Compound.inchikey, Compound.id).filter(
+            Compound.inchikey.in_(inchikeys[i:i + BATCH_SIZE])
+        ).all()
+        existing.update(rows)
+    return existing
+
+
+def find_compound_by_smiles(session, smiles):
+    """Exact-structure lookup: return the stored Compound with the same InChIKey, or None."""
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    inchikey = Chem.MolToInchiKey(mol) if mol is not None else None
+    if not inchikey:
+        return None
+    return session.query(Compound).filter(Compound.inchikey == inchikey).first()
+
+
+def update_compound_descriptors(session, compound_ids=None, only_missing=True, workers=None):
+    """
+    Compute identifiers and descriptors for stored compounds and write them
+    back in bulk.
+
+    InChIKeys are unique: when several compounds are the same molecule only
+    the one with the lowest ID gets the key; the others are reported as
+    duplicates (and keep a NULL InChIKey) for curation.
+
+    Args:
+        session: Database session (committed by the caller)
+        compound_ids: Optional IDs to restrict the update to
+        only_missing: Skip compounds that already have an InChIKey and a
+            molecular weight
+        workers: Optional number of worker processes
+
+    Returns:
+        (updated, failed, duplicates) where duplicates is a list of
+        (compound ID, ID of the compound holding the InChIKey)
+    """
+    query = session.query(Compound.id, Compound.smiles)
+    if compound_ids is not None:
+        query = query.filter(Compound.id.in_(compound_ids))
+    if only_missing:
+        query = query.filter(Compound.inchikey.is_(None) | Compound.molecular_weight.is_(None))
+
+    results = sorted(compute_descriptor_batch(query.order_by(Compound.id).all(), workers=workers))
+    owners = existing_inchikeys(session, [d["inchikey"] for _, d in results if d])
+
+    updates = []
+    duplicates = []
+    failed = 0
+    for compound_id, descriptors in results:
+        if descriptors is None:
+            failed += 1
+            continue
+        inchikey = descriptors["inchikey"]
+        owner = owners.setdefault(inchikey, compound_id) if inchikey else compound_id
+        if owner != compound_id:
+            duplicates.append((compound_id, owner))
+            descriptors = dict(descriptors, inchikey=None)
+        updates.append(dict(descriptors, id=compound_id))
+
+    # Bulk UPDATE by primary key, executed in batches
+    for i in range(0, len(updates), BATCH_SIZE):
+        session.execute(update(Compound), updates[i:i + BATCH_SIZE])
+
+    return len(updates), failed, duplicates
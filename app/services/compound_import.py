@@ -0,0 +1,109 @@
+# services/compound_import.py
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.compounds import Compound
+from app.services.compound_descriptors import compute_descriptor_batch, existing_inchikeys
+from app.services.fingerprint_store import note_compound_changes
+
+REQUIRED_COLUMNS = ("name", "smiles")
+OPTIONAL_COLUMNS = ("molecular_formula", "development_stage", "origin", "patent_status", "notes")
+DEFAULT_STAGE = "Discovery"
+
+
+def _insert_new(session, rows):
+    """
+    Insert compound rows, skipping InChIKeys stored in the meantime.
+
+    On PostgreSQL and SQLite this is INSERT ... ON CONFLICT (inchikey) DO
+    NOTHING, so a concurrent import of the same molecule doesn't fail the
+    whole batch on the unique index.
+
+    Returns:
+        Number of rows inserted
+    """
+    # Give every row the same keys so they go out as one executemany
+    columns = set().union(*rows)
+    rows = [{column: row.get(column) for column in columns} for row in rows]
+
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name not in ("postgresql", "sqlite"):
+        session.execute(insert(Compound), rows)
+        return len(rows)
+
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    # A Core insert on the table: the ORM bulk insert expects a RETURNING row for every input row
+    statement = dialect_insert(Compound.__table__).on_conflict_do_nothing(
+        index_elements=["inchikey"]
+    ).returning(Compound.__table__.c.id)
+    compound_ids = session.execute(statement, rows).scalars().all()
+    # Core inserts bypass the ORM flush, so the fingerprint stores are told directly
+    note_compound_changes(session, compound_ids)
+    return len(compound_ids)
+
+
+def import_compounds(session, df):
+    """
+    Insert compounds from a DataFrame with computed descriptors.
+
+    Descriptors are computed in a process pool for large files. Rows whose
+    SMILES can't be parsed are rejected. Rows whose InChIKey is already
+    stored, or appears earlier in the file, are skipped; the remaining rows
+    are written with a single multi-row INSERT.
+
+    Args:
+        session: Database session (committed by the caller)
+        df: DataFrame with 'name' and 'smiles' columns and optionally
+            molecular_formula, development_stage, origin, patent_status, notes
+
+    Returns:
+        Dict with 'inserted', 'duplicates' and 'invalid' counts, and
+        'rejected', the names of the rows with unparseable SMILES
+    """
+    df = df.rename(columns=lambda column: str(column).strip().lower())
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    df = df[df["name"].notna() & df["smiles"].notna()]
+    df = df.astype(object).where(df.notna(), None)
+
+    rows = []
+    for record in df.to_dict("records"):
+        row = {"name": str(record["name"]).strip(), "smiles": str(record["smiles"]).strip()}
+        for column in OPTIONAL_COLUMNS:
+            if record.get(column) is not None:
+                row[column] = record[column]
+        row.setdefault("development_stage", DEFAULT_STAGE)
+        rows.append(row)
+
+    valid = []
+    rejected = []
+    for index, descriptors in compute_descriptor_batch((i, row["smiles"]) for i, row in enumerate(rows)):
+        if descriptors is None:
+            # Without a canonical SMILES and InChIKey the row would escape deduplication
+            rejected.append(rows[index]["name"])
+        else:
+            rows[index].update(descriptors)
+            valid.append(rows[index])
+
+    # Dedupe against the database (index lookups on inchikey) and within the file
+    seen = set(existing_inchikeys(session, [row.get("inchikey") for row in valid]))
+    new_rows = []
+    for row in valid:
+        inchikey = row.get("inchikey")
+        if inchikey:
+            if inchikey in seen:
+                continue
+            seen.add(inchikey)
+        new_rows.append(row)
+
+    inserted = _insert_new(session, new_rows) if new_rows else 0
+
+    return {
+        "inserted": inserted,
+        "duplicates": len(valid) - inserted,
+        "invalid": len(rejected),
+        "rejected": rejected
+    }
@@ -0,0 +1,289 @@
+# services/compound_series.py
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from rdkit import Chem, RDLogger
+from rdkit.Chem.Scaffolds import MurckoScaffold
+from sqlalchemy import update
+
+from app.models.compounds import Compound
+from app.models.database import get_session
+from app.services.fingerprint_store import get_store
+from app.services.similarity_search import tanimoto
+
+SERIES_WORKERS = int(os.getenv("SERIES_WORKERS", str(os.cpu_count() or 1)))
+# Morgan Tanimoto similarity at which two compounds are Butina neighbours
+# (a distance cutoff of 0.4)
+CLUSTER_SIMILARITY = float(os.getenv("CLUSTER_SIMILARITY", "0.6"))
+# Below this many compounds neighbour lists are built in-process
+PARALLEL_THRESHOLD = 2000
+BATCH_SIZE = 500
+NEIGHBOUR_CHUNKS_PER_WORKER = 8
+
+# One series update at a time per process; the job functions write to the
+# same columns
+_update_lock = threading.Lock()
+
+
+def compute_scaffolds(smiles):
+    """
+    Bemis-Murcko scaffold and generic framework of a molecule.
+
+    Acyclic molecules have an empty scaffold.
+
+    Returns:
+        (murcko SMILES, generic SMILES), or None if the SMILES can't be parsed
+    """
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    if mol is None:
+        return None
+    try:
+        scaffold = MurckoScaffold.GetScaffoldForMol(mol)
+        if scaffold.GetNumAtoms() == 0:
+            return "", ""
+        generic = MurckoScaffold.MakeScaffoldGeneric(scaffold)
+        return Chem.MolToSmiles(scaffold), Chem.MolToSmiles(generic)
+    except Exception:
+        return None
+
+
+def _scaffold_batch(rows):
+    """Compute scaffolds for (id, smiles) rows (runs in a worker process)."""
+    RDLogger.DisableLog("rdApp.*")
+    return [(compound_id, compute_scaffolds(smiles)) for compound_id, smiles in rows]
+
+
+def update_compound_scaffolds(session, only_missing=True, workers=None):
+    """
+    Compute Murcko and generic scaffolds of stored compounds and write them
+    back in bulk.
+
+    Args:
+        session: Database session (committed by the caller)
+        only_missing: Skip compounds that already have a scaffold
+        workers: Optional number of worker processes
+
+    Returns:
+        (updated, failed)
+    """
+    query = session.query(Compound.id, Compound.smiles)
+    if only_missing:
+        query = query.filter(Compound.murcko_scaffold.is_(None))
+    rows = query.order_by(Compound.id).all()
+
+    if len(rows) < PARALLEL_THRESHOLD:
+        results = _scaffold_batch(rows)
+    else:
+        batches = [rows[i:i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers or SERIES_WORKERS) as pool:
+            results = [result for batch in pool.map(_scaffold_batch, batches) for result in batch]
+
+    updates = [
+        {"id": compound_id, "murcko_scaffold": scaffolds[0], "generic_scaffold": scaffolds[1]}
+        for compound_id, scaffolds in results if scaffolds is not None
+    ]
+    for i in range(0, len(updates), BATCH_SIZE):
+        session.execute(update(Compound), updates[i:i + BATCH_SIZE])
+    return len(updates), len(results) - len(updates)
+
+
+# Fingerprints of the current neighbour search; set in each worker by
+# _init_neighbour_worker, so it works with both fork and spawn workers
+_neighbour_data = None
+
+
+def _init_neighbour_worker(fps, counts, similarity):
+    global _neighbour_data
+    _neighbour_data = (fps, counts, similarity)
+
+
+def _neighbour_chunk(start, stop):
+    """
+    Neighbour pairs (i, j), i < j, of rows start..stop (runs in a worker).
+
+    Rows are sorted by bit count, so by the bound
+    Tanimoto <= count_i / count_j the candidates of row i are the
+    contiguous rows i + 1 .. hi.
+    """
+    fps, counts, similarity = _neighbour_data
+    limits = np.searchsorted(counts, counts / similarity, side="right")
+    rows = []
+    cols = []
+    for i in range(start, stop):
+        hi = limits[i]
+        if hi <= i + 1:
+            continue
+        scores = tanimoto(fps[i + 1:hi], counts[i + 1:hi], fps[i], int(counts[i]))
+        neighbours = np.flatnonzero(scores >= similarity) + i + 1
+        rows.append(np.full(len(neighbours), i, dtype=np.int32))
+        cols.append(neighbours.astype(np.int32))
+    if not rows:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def neighbour_pairs(fps, counts, similarity=CLUSTER_SIMILARITY, workers=None):
+    """
+    Sparse neighbour list: all pairs of rows with Tanimoto >= similarity.
+
+    Only the pairs are kept, never an N x N matrix. ``fps`` and ``counts``
+    must be sorted by bit count.
+
+    Returns:
+        (i, j) int32 arrays with i < j
+    """
+    global _neighbour_data
+    _neighbour_data = (fps, counts, similarity)
+    workers = workers or SERIES_WORKERS
+    try:
+        if len(fps) < PARALLEL_THRESHOLD or workers < 2:
+            return _neighbour_chunk(0, len(fps))
+
+        # Early rows have more candidates, so use many small chunks
+        bounds = np.linspace(0, len(fps), workers * NEIGHBOUR_CHUNKS_PER_WORKER + 1).astype(int)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_neighbour_worker,
+            initargs=(fps, counts, similarity)
+        ) as pool:
+            results = list(pool.map(_neighbour_chunk, bounds[:-1], bounds[1:]))
+        return np.concatenate([i for i, _ in results]), np.concatenate([j for _, j in results])
+    finally:
+        _neighbour_data = None
+
+
+def butina(n, rows, cols):
+    """
+    Butina clustering from a sparse neighbour list.
+
+    Compounds with the most neighbours become centroids first; each
+    centroid takes all its still unassigned neighbours.
+
+    Returns:
+        Array giving the centroid row of each of the n rows
+    """
+    heads = np.concatenate([rows, cols])
+    tails = np.concatenate([cols, rows])
+    order = np.argsort(heads, kind="stable")
+    tails = tails[order]
+    degree = np.bincount(heads, minlength=n)
+    indptr = np.concatenate([[0], np.cumsum(degree)])
+
+    centroid = np.full(n, -1, dtype=np.int64)
+    for i in np.lexsort((np.arange(n), -degree)):
+        if centroid[i] >= 0:
+            continue
+        centroid[i] = i
+        members = tails[indptr[i]:indptr[i + 1]]
+        members = members[centroid[members] < 0]
+        centroid[members] = i
+    return centroid
+
+
+def _live_fingerprints(session):
+    """(ids, fps, counts) of all compounds with a Morgan fingerprint."""
+    segments = get_store("morgan", session).snapshot()
+    ids, fps, counts = [], [], []
+    for segment, alive in segments:
+        positions = slice(None) if alive is None else np.flatnonzero(alive)
+        ids.append(segment.ids[positions])
+        fps.append(segment.fps[positions])
+        counts.append(segment.counts[positions])
+    if not ids:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.uint64), np.zeros(0, dtype=np.int32)
+    return np.concatenate(ids), np.vstack(fps), np.concatenate(counts)
+
+
+def update_compound_clusters(session, full=False, similarity=CLUSTER_SIMILARITY, workers=None):
+    """
+    Assign compounds to Butina clusters of Morgan fingerprints.
+
+    Incrementally, compounds without a cluster (or whose centroid was
+    deleted) join the most similar existing centroid within the cutoff;
+    the rest are Butina-clustered among themselves into new clusters. With
+    ``full`` everything is reclustered from scratch.
+
+    Args:
+        session: Database session (committed by the caller)
+        full: Recluster all compounds
+        similarity: Tanimoto similarity cutoff
+
+    Returns:
+        (number of compounds assigned, number of new clusters)
+    """
+    ids, fps, counts = _live_fingerprints(session)
+    current = dict(session.query(Compound.id, Compound.cluster_id).all())
+    cluster_ids = np.array([current.get(compound_id) or 0 for compound_id in ids.tolist()], dtype=np.int64)
+
+    if full:
+        pending = np.arange(len(ids))
+    else:
+        is_centroid = cluster_ids == ids
+        pending = np.flatnonzero(~np.isin(cluster_ids, ids[is_centroid]))
+        centroids = np.flatnonzero(is_centroid)
+        if len(centroids) and len(pending):
+            still_pending = []
+            for position in pending:
+                scores = tanimoto(fps[centroids], counts[centroids], fps[position], int(counts[position]))
+                best = int(np.argmax(scores))
+                if scores[best] >= similarity:
+                    cluster_ids[position] = ids[centroids[best]]
+                else:
+                    still_pending.append(position)
+            pending = np.array(still_pending, dtype=np.int64)
+
+    new_clusters = 0
+    if len(pending):
+        # Sorting by bit count lets each row scan only a contiguous window
+        order = pending[np.argsort(counts[pending], kind="stable")]
+        rows, cols = neighbour_pairs(fps[order], counts[order], similarity, workers)
+        centroid = butina(len(order), rows, cols)
+        cluster_ids[order] = ids[order[centroid]]
+        new_clusters = int((centroid == np.arange(len(order))).sum())
+
+    updates = [
+        {"id": compound_id, "cluster_id": cluster_id}
+        for compound_id, cluster_id in zip(ids.tolist(), cluster_ids.tolist())
+        if current.get(compound_id) != cluster_id
+    ]
+    for i in range(0, len(updates), BATCH_SIZE):
+        session.execute(update(Compound), updates[i:i + BATCH_SIZE])
+    return len(updates), new_clusters
+
+
+def run_series_update(reporter, full=False):
+    """
+    Background job: update scaffolds and clusters.
+
+    Args:
+        reporter: JobReporter from app.services.jobs
+        full: Recompute all scaffolds and recluster everything
+    """
+    if not _update_lock.acquire(blocking=False):
+        raise RuntimeError("A series update is already running")
+    session = get_session()
+    try:
+        reporter.set_total(2)
+        scaffolds_updated, scaffolds_failed = update_compound_scaffolds(session, only_missing=not full)
+        session.commit()
+        reporter.set_progress(1)
+
+        assigned, new_clusters = update_compound_clusters(session, full=full)
+        session.commit()
+        reporter.set_progress(2)
+
+        reporter.set_summary({
+            "scaffolds_updated": scaffolds_updated,
+            "scaffolds_failed": scaffolds_failed,
+            "assigned": assigned,
+            "new_clusters": new_clusters
+        })
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+        _update_lock.release()
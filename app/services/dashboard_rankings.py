@@ -0,0 +1,235 @@
+# services/dashboard_rankings.py
+
+import os
+import json
+import math
+import time
+import threading
+
+from app.models.compounds import Compound, TargetActivitySummary
+from app.models.database import get_session
+from app.models.diseases import TargetDiseaseRelation
+from app.models.structures import Structure
+from app.models.targets import Target
+from app.services.structure_features import SS_HELIX, SS_STRAND, load_features
+from app.services.structure_parser import load_structure
+
+# Rankings are shared by all worker processes through this file
+DASHBOARD_CACHE_PATH = os.getenv("DASHBOARD_CACHE_PATH", os.path.join("uploads", "cache", "dashboard.json"))
+# Seconds before cached rankings are recomputed (in the background)
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "300"))
+TOP_TARGETS = 10
+RECENT_COMPOUNDS = 8
+
+PRIORITY_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+VALIDATION_WEIGHTS = {
+    "validated": 3, "established": 3,
+    "emerging": 2, "partially validated": 2, "partially_validated": 2,
+    "putative": 1, "novel": 1
+}
+EVIDENCE_WEIGHTS = {"strong": 3, "moderate": 2, "hypothetical": 1}
+RELATIONSHIP_WEIGHTS = {"primary": 1.0, "secondary": 0.6, "exploratory": 0.3}
+
+
+def _weight(weights, value, default=0):
+    return weights.get(str(value or "").strip().lower(), default)
+
+
+def rank_targets(session, limit=TOP_TARGETS):
+    """
+    Score targets by priority, validation status, activity data and disease
+    evidence.
+
+    score = 3 * priority + 2 * validation + log2(1 + activities)
+            + sum over diseases of evidence * relationship weight
+
+    Uses three aggregate queries: targets, their activity summaries and
+    their disease relations.
+    """
+    targets = session.query(
+        Target.id, Target.name, Target.category, Target.priority, Target.validation_status
+    ).all()
+    summaries = dict(session.query(
+        TargetActivitySummary.target_id, TargetActivitySummary.activity_count
+    ).all())
+    relations = session.query(
+        TargetDiseaseRelation.target_id, TargetDiseaseRelation.relationship_type,
+        TargetDiseaseRelation.evidence_level
+    ).all()
+
+    evidence = {}
+    disease_counts = {}
+    for target_id, relationship_type, evidence_level in relations:
+        score = _weight(EVIDENCE_WEIGHTS, evidence_level, 1) * _weight(RELATIONSHIP_WEIGHTS, relationship_type, 0.3)
+        evidence[target_id] = evidence.get(target_id, 0) + score
+        disease_counts[target_id] = disease_counts.get(target_id, 0) + 1
+
+    ranked = []
+    for target_id, name, category, priority, validation_status in targets:
+        activities = summaries.get(target_id, 0)
+        score = (
+            3 * _weight(PRIORITY_WEIGHTS, priority)
+            + 2 * _weight(VALIDATION_WEIGHTS, validation_status)
+            + math.log2(1 + activities)
+            + evidence.get(target_id, 0)
+        )
+        ranked.append({
+            "id": target_id,
+            "name": name,
+            "category": category,
+            "priority": priority,
+            "validation_status": validation_status,
+            "activity_count": activities,
+            "disease_count": disease_counts.get(target_id, 0),
+            "score": round(score, 2)
+        })
+
+    ranked.sort(key=lambda target: (-target["score"], target["name"]))
+    return ranked[:limit]
+
+
+def recent_compounds(session, limit=RECENT_COMPOUNDS):
+    """Most recently added compounds, read from the created_at index."""
+    rows = session.query(
+        Compound.id, Compound.name, Compound.smiles, Compound.development_stage, Compound.created_at
+    ).order_by(Compound.created_at.desc().nullslast(), Compound.id.desc()).limit(limit).all()
+    return [
+        {
+            "id": compound_id,
+            "name": name,
+            "smiles": smiles,
+            "development_stage": stage,
+            "created_at": created_at.isoformat(timespec="seconds") if created_at else None
+        }
+        for compound_id, name, smiles, stage, created_at in rows
+    ]
+
+
+def featured_structure(session, target_ids=()):
+    """
+    Best-resolution structure with a file, preferring the top-ranked targets.
+
+    Atom, chain and secondary-structure figures come from the parsed
+    structure and feature caches, so they are only computed once per file.
+    """
+    query = session.query(
+        Structure.id, Structure.pdb_id, Structure.resolution, Structure.file_path, Structure.description,
+        Target.name
+    ).join(Target, Target.id == Structure.target_id).filter(Structure.file_path.isnot(None))
+
+    candidates = []
+    if target_ids:
+        candidates = query.filter(Structure.target_id.in_(list(target_ids))).order_by(
+            Structure.resolution.asc().nullslast(), Structure.id
+        ).limit(10).all()
+    candidates += query.order_by(Structure.resolution.asc().nullslast(), Structure.id).limit(10).all()
+
+    for structure_id, pdb_id, resolution, file_path, description, target_name in candidates:
+        if not os.path.exists(file_path):
+            continue
+        try:
+            parsed = load_structure(file_path)
+            features = load_features(parsed)
+        except Exception as e:
+            print(f"Error loading featured structure {file_path}: {e}")
+            continue
+
+        n_residues = max(features.n_residues, 1)
+        return {
+            "id": structure_id,
+            "pdb_id": pdb_id,
+            "target_name": target_name,
+            "resolution": resolution,
+            "description": description,
+            "n_atoms": parsed.n_atoms,
+            "n_residues": features.n_residues,
+            "chains": features.chains(),
+            "helix_fraction": round(float((features.secondary_structure == SS_HELIX).sum()) / n_residues, 3),
+            "strand_fraction": round(float((features.secondary_structure == SS_STRAND).sum()) / n_residues, 3)
+        }
+    return None
+
+
+def compute_rankings(session):
+    """Compute the complete dashboard payload."""
+    top_targets = rank_targets(session)
+    return {
+        "top_targets": top_targets,
+        "recent_compounds": recent_compounds(session),
+        "featured_structure": featured_structure(session, [target["id"] for target in top_targets]),
+        "computed_at": time.time()
+    }
+
+
+_rankings = None
+_rankings_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+def _read_cache_file():
+    try:
+        with open(DASHBOARD_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def refresh_rankings():
+    """Recompute the rankings and publish them to memory and the shared cache file."""
+    session = get_session()
+    try:
+        rankings = compute_rankings(session)
+    finally:
+        session.close()
+
+    os.makedirs(os.path.dirname(DASHBOARD_CACHE_PATH), exist_ok=True)
+    tmp_path = f"{DASHBOARD_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(rankings, f)
+    os.replace(tmp_path, DASHBOARD_CACHE_PATH)
+
+    global _rankings
+    with _rankings_lock:
+        _rankings = rankings
+    return rankings
+
+
+def _refresh_in_background():
+    if not _refresh_lock.acquire(blocking=False):
+        return  # Already refreshing
+
+    def run():
+        try:
+            refresh_rankings()
+        except Exception as e:
+            print(f"Error refreshing dashboard rankings: {e}")
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=run, name="dashboard-rankings", daemon=True).start()
+
+
+def get_rankings():
+    """
+    Return the dashboard rankings without touching the database when cached.
+
+    Fresh rankings come from memory or the shared cache file. Stale ones are
+    returned as they are while a background thread recomputes them; only
+    the very first call computes them synchronously.
+    """
+    global _rankings
+    with _rankings_lock:
+        rankings = _rankings
+    if rankings is None or time.time() - rankings["computed_at"] > DASHBOARD_CACHE_TTL:
+        cached = _read_cache_file()
+        if cached is not None and (rankings is None or cached["computed_at"] > rankings["computed_at"]):
+            rankings = cached
+            with _rankings_lock:
+                _rankings = rankings
+
+    if rankings is None:
+        return refresh_rankings()
+    if time.time() - rankings["computed_at"] > DASHBOARD_CACHE_TTL:
+        _refresh_in_background()
+    return rankings
+
@@ -0,0 +1,422 @@
+# services/fingerprint_store.py
+
+import os
+import json
+import uuid
+import fcntl
+import time
+import struct
+import threading
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app.models.compounds import Compound
+from app.services.fingerprints import FINGERPRINT_KINDS, compound_rows, compute_fingerprints, popcount_rows
+
+FINGERPRINT_STORE_DIR = os.getenv("FINGERPRINT_STORE_DIR", os.path.join("uploads", "cache", "fingerprints"))
+STORE_VERSION = 1
+# Delta segments are merged into one once there are more than this many,
+# or once this fraction of the stored rows are dead
+MAX_SEGMENTS = 8
+MAX_DEAD_FRACTION = 0.25
+# Seconds between checks of the compounds table for changes made outside the
+# app's sessions (committed ORM changes update the store at once)
+FINGERPRINT_SYNC_INTERVAL = float(os.getenv("FINGERPRINT_SYNC_INTERVAL", "5"))
+
+SEGMENT_MAGIC = b"DTDFPSEG"
+# magic, version, reserved, words per fingerprint, rows, SMILES bytes
+SEGMENT_HEADER = struct.Struct("<8sHHIQQ")
+HEADER_BYTES = 64
+
+
+def _align(offset):
+    return (offset + 7) // 8 * 8
+
+
+def _segment_layout(n_rows, n_words):
+    """Byte offsets of the arrays in a segment file (all 8-byte aligned)."""
+    ids = HEADER_BYTES
+    counts = ids + 8 * n_rows
+    fps = _align(counts + 4 * n_rows)
+    offsets = fps + 8 * n_words * n_rows
+    smiles = offsets + 8 * (n_rows + 1)
+    return ids, counts, fps, offsets, smiles
+
+
+def write_segment(path, ids, smiles, fps):
+    """
+    Write a segment file atomically.
+
+    Layout: a 64-byte versioned header, then compound IDs (int64), set-bit
+    counts (int32), the packed fingerprint matrix (uint64), SMILES offsets
+    (int64) and the UTF-8 SMILES blob.
+    """
+    encoded = [s.encode() for s in smiles]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    offsets[1:] = np.cumsum([len(s) for s in encoded])
+    n_rows, n_words = fps.shape
+    layout = _segment_layout(n_rows, n_words)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, STORE_VERSION, 0, n_words, n_rows, int(offsets[-1])).ljust(HEADER_BYTES, b"\0"))
+        for offset, array in zip(layout, (
+                ids.astype("<i8"), popcount_rows(fps).astype("<i4"), fps.astype("<u8"), offsets)):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(array.tobytes())
+        f.write(b"".join(encoded))
+    os.replace(tmp_path, path)
+
+
+class SmilesColumn:
+    """SMILES of a segment, decoded from the mapped blob on access."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def take(self, positions):
+        offsets = self.offsets
+        return [bytes(self.blob[offsets[i]:offsets[i + 1]]).decode() for i in positions]
+
+
+class FingerprintSegment:
+    """
+    A read-only memory-mapped segment file.
+
+    All arrays are views of one shared mapping, so every process mapping the
+    same file shares its pages through the OS page cache.
+    """
+
+    def __init__(self, path, n_words):
+        self.path = path
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, version, _, file_words, n_rows, smiles_bytes = SEGMENT_HEADER.unpack(
+            bytes(buffer[:SEGMENT_HEADER.size])
+        )
+        if magic != SEGMENT_MAGIC or version != STORE_VERSION or file_words != n_words:
+            raise ValueError(f"Incompatible fingerprint segment: {path}")
+
+        ids, counts, fps, offsets, smiles = _segment_layout(n_rows, n_words)
+        self.ids = buffer[ids:counts].view("<i8")
+        self.counts = buffer[counts:counts + 4 * n_rows].view("<i4")
+        self.fps = buffer[fps:offsets].view("<u8").reshape(n_rows, n_words)
+        self.smiles = SmilesColumn(buffer[offsets:smiles].view("<i8"), buffer[smiles:smiles + smiles_bytes])
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class FingerprintStore:
+    """
+    On-disk fingerprint store of all compounds, shared by every worker process.
+
+    The store is a manifest naming append-only segment files plus a file of
+    dead row positions. Writers hold an exclusive file lock, write new files
+    and then atomically replace the manifest; readers notice the new manifest
+    on their next ``sync()`` and map only the segments they don't have yet.
+    New compounds are appended as delta segments, deleted or edited
+    compounds are marked dead, and segments are merged when they pile up.
+    """
+
+    def __init__(self, kind, directory=None):
+        self.kind = kind
+        self.n_words = FINGERPRINT_KINDS[kind][1] // 64
+        self.directory = directory or FINGERPRINT_STORE_DIR
+        self.manifest_path = os.path.join(self.directory, f"{kind}.manifest.json")
+        self.lock_path = os.path.join(self.directory, f"{kind}.lock")
+        self.manifest = self._empty_manifest()
+        self._manifest_stat = None
+        self._segments = {}
+        self._view = []
+        self._lock = threading.RLock()
+        self._checked = None
+
+    def _empty_manifest(self):
+        return {
+            "version": STORE_VERSION, "kind": self.kind, "n_words": self.n_words,
+            "generation": 0, "max_id": 0, "n_compounds": 0, "segments": [], "dead": None
+        }
+
+    def __len__(self):
+        return sum(len(segment) - (0 if alive is None else int((~alive).sum())) for segment, alive in self._view)
+
+    def snapshot(self):
+        """List of (segment, alive mask or None) to search."""
+        with self._lock:
+            return self._view
+
+    def reload(self):
+        """Map the current manifest if it changed since the last load."""
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return
+        stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stat == self._manifest_stat:
+                return
+            try:
+                with open(self.manifest_path) as f:
+                    manifest = json.load(f)
+                if manifest.get("version") != STORE_VERSION or manifest.get("n_words") != self.n_words:
+                    raise ValueError("incompatible fingerprint store version")
+                segments = {
+                    name: self._segments[name] if name in self._segments
+                    else FingerprintSegment(os.path.join(self.directory, name), self.n_words)
+                    for name in manifest["segments"]
+                }
+            except (OSError, ValueError) as e:
+                # Rebuilt from the database on the next sync
+                print(f"Error loading fingerprint store {self.manifest_path}: {e}")
+                manifest, segments = self._empty_manifest(), {}
+
+            dead = self._load_dead(manifest["dead"])
+            view = []
+            start = 0
+            for name in manifest["segments"]:
+                segment = segments[name]
+                alive = None
+                segment_dead = dead[(dead >= start) & (dead < start + len(segment))] - start
+                if len(segment_dead):
+                    alive = np.ones(len(segment), dtype=bool)
+                    alive[segment_dead] = False
+                view.append((segment, alive))
+                start += len(segment)
+
+            self.manifest = manifest
+            self._manifest_stat = stat
+            self._segments = segments
+            self._view = view
+
+    def _load_dead(self, name):
+        if not name:
+            return np.zeros(0, dtype=np.int64)
+        try:
+            return np.load(os.path.join(self.directory, name))
+        except OSError:
+            return np.zeros(0, dtype=np.int64)
+
+    def sync(self, session):
+        """
+        Bring the store up to date with the compounds table.
+
+        Picks up a new manifest with a stat(); the compounds table itself is
+        checked (one aggregate query) at most every FINGERPRINT_SYNC_INTERVAL
+        seconds, since compounds added, edited or deleted through a Session
+        update the store when they are committed.
+        """
+        self.reload()
+        if self._checked is not None and time.monotonic() - self._checked < FINGERPRINT_SYNC_INTERVAL:
+            return
+        if not self._is_current(session):
+            with self._write_lock():
+                self.reload()
+                if not self._is_current(session):
+                    self._apply_changes(session)
+        self._checked = time.monotonic()
+
+    def update(self, session, compound_ids):
+        """Re-fingerprint compounds whose SMILES changed (and add new ones, drop deleted ones)."""
+        with self._write_lock():
+            self.reload()
+            self._apply_changes(session, compound_ids)
+
+    def _is_current(self, session):
+        max_id, count = session.query(func.max(Compound.id), func.count(Compound.id)).one()
+        return (max_id or 0) <= self.manifest["max_id"] and count == self.manifest["n_compounds"]
+
+    def _write_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        return _FileLock(self.lock_path)
+
+    def _live_positions(self, compound_ids):
+        """Global row positions of live rows holding the given compound IDs."""
+        positions = []
+        start = 0
+        for segment, alive in self._view:
+            mask = np.isin(segment.ids, compound_ids)
+            if alive is not None:
+                mask &= alive
+            positions.append(np.flatnonzero(mask) + start)
+            start += len(segment)
+        return np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+
+    def _apply_changes(self, session, refresh_ids=None):
+        """Append new and refreshed compounds, mark removed ones dead and write a new manifest."""
+        manifest = dict(self.manifest)
+        max_id, count = session.query(func.max(Compound.id), func.count(Compound.id)).one()
+        dead = [self._load_dead(manifest["dead"])]
+
+        rows = []
+        if (max_id or 0) > manifest["max_id"]:
+            rows = compound_rows(session.query(Compound).filter(Compound.id > manifest["max_id"]))
+        if refresh_ids is not None:
+            refresh_ids = np.asarray(list(refresh_ids), dtype=np.int64)
+            dead.append(self._live_positions(refresh_ids))
+            rows += compound_rows(session.query(Compound).filter(
+                Compound.id.in_(refresh_ids.tolist()), Compound.id <= manifest["max_id"]
+            ))
+
+        stored_count = manifest["n_compounds"] + sum(1 for row in rows if row[0] > manifest["max_id"])
+        if count != stored_count:
+            current = np.array([row[0] for row in session.query(Compound.id).all()], dtype=np.int64)
+            stored = np.concatenate([segment.ids for segment, _ in self._view] or [np.zeros(0, dtype=np.int64)])
+            dead.append(self._live_positions(np.setdiff1d(stored, current)))
+
+        generation = manifest["generation"] + 1
+        segments = list(manifest["segments"])
+        if rows:
+            ids, smiles, fps = compute_fingerprints(rows, self.kind)
+            if len(ids):
+                name = self._new_name(generation, "seg")
+                write_segment(os.path.join(self.directory, name), ids, smiles, fps)
+                segments.append(name)
+
+        dead = np.unique(np.concatenate(dead)).astype(np.int64)
+        manifest.update(generation=generation, max_id=max(max_id or 0, manifest["max_id"]),
+                        n_compounds=count, segments=segments, dead=None)
+        if len(dead):
+            manifest["dead"] = self._new_name(generation, "dead.npy")
+            self._write_array(manifest["dead"], dead)
+
+        self._write_manifest(manifest)
+        self.reload()
+
+        n_rows = sum(len(segment) for segment, _ in self._view)
+        if len(segments) > MAX_SEGMENTS or (n_rows and len(dead) > MAX_DEAD_FRACTION * n_rows):
+            self._write_manifest(self._compact(manifest))
+            self.reload()
+        self._remove_unused()
+
+    def _compact(self, manifest):
+        """Merge the live rows of all segments into a single segment."""
+        ids, smiles, fps = [], [], []
+        for segment, alive in self._view:
+            positions = np.arange(len(segment)) if alive is None else np.flatnonzero(alive)
+            ids.append(segment.ids[positions])
+            smiles.extend(segment.smiles.take(positions))
+            fps.append(segment.fps[positions])
+
+        manifest = dict(manifest, generation=manifest["generation"] + 1, segments=[], dead=None)
+        ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+        if len(ids):
+            order = np.argsort(ids, kind="stable")
+            name = self._new_name(manifest["generation"], "seg")
+            write_segment(os.path.join(self.directory, name), ids[order],
+                          [smiles[i] for i in order], np.vstack(fps)[order])
+            manifest["segments"] = [name]
+        return manifest
+
+    def _new_name(self, generation, suffix):
+        return f"{self.kind}-{generation:06d}-{uuid.uuid4().hex[:8]}.{suffix}"
+
+    def _write_array(self, name, array):
+        path = os.path.join(self.directory, name)
+        with open(f"{path}.tmp", 'wb') as f:
+            np.save(f, array)
+        os.replace(f"{path}.tmp", path)
+
+    def _write_manifest(self, manifest):
+        with open(f"{self.manifest_path}.tmp", 'w') as f:
+            json.dump(manifest, f)
+        os.replace(f"{self.manifest_path}.tmp", self.manifest_path)
+
+    def _remove_unused(self):
+        """Delete files of this kind no longer named by the manifest (mapped copies stay valid)."""
+        used = set(self.manifest["segments"]) | {self.manifest["dead"]}
+        for name in os.listdir(self.directory):
+            if name.startswith(f"{self.kind}-") and name not in used:
+                os.remove(os.path.join(self.directory, name))
+
+
+class _FileLock:
+    """Exclusive advisory lock on a file, held across processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'a')
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(kind, session):
+    """Return the synced process-wide fingerprint store for a fingerprint kind."""
+    with _stores_lock:
+        store = _stores.get(kind)
+        if store is None:
+            store = _stores[kind] = FingerprintStore(kind)
+    store.sync(session)
+    return store
+
+
+def refresh_fingerprints(session, compound_ids):
+    """
+    Update the existing fingerprint stores for added, edited or deleted compounds.
+
+    Stores that were never built are left for the first search to build.
+    """
+    compound_ids = sorted({compound_id for compound_id in compound_ids if compound_id is not None})
+    if not compound_ids:
+        return
+    for kind in FINGERPRINT_KINDS:
+        with _stores_lock:
+            store = _stores.get(kind) or FingerprintStore(kind)
+        if os.path.exists(store.manifest_path):
+            store.update(session, compound_ids)
+
+
+def note_compound_changes(session, compound_ids):
+    """Refresh the fingerprints of these compounds when the session commits (for Core writes)."""
+    session.info.setdefault("fingerprint_changes", set()).update(compound_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_fingerprint_changes(session, flush_context):
+    """Remember compounds added, deleted or given a new SMILES in this transaction."""
+    changed = [
+        inspect(obj).dict.get("id") for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, Compound)
+        and (obj not in session.dirty or inspect(obj).attrs.smiles.history.has_changes())
+    ]
+    if changed:
+        note_compound_changes(session, changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh_on_compound_change(session):
+    """Bring the fingerprint stores up to date once compound changes are committed."""
+    compound_ids = session.info.pop("fingerprint_changes", None)
+    if not compound_ids:
+        return
+    # The committed session can't run queries inside this event
+    reader = Session(bind=session.get_bind())
+    try:
+        refresh_fingerprints(reader, compound_ids)
+    except Exception as e:
+        # The next sync after FINGERPRINT_SYNC_INTERVAL catches additions and deletions
+        print(f"Error updating fingerprint stores: {e}")
+    finally:
+        reader.close()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_fingerprint_changes(session):
+    session.info.pop("fingerprint_changes", None)
@@ -0,0 +1,107 @@
+# services/fingerprints.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from rdkit import Chem, DataStructs, RDLogger
+from rdkit.Chem import rdMolDescriptors
+from sqlalchemy import func
+
+from app.models.compounds import Compound
+
+FINGERPRINT_WORKERS = int(os.getenv("FINGERPRINT_WORKERS", str(os.cpu_count() or 1)))
+# Below this many molecules a process pool costs more than it saves
+PARALLEL_THRESHOLD = 2000
+BATCH_SIZE = 2000
+
+PATTERN_FP_BITS = 2048
+MORGAN_FP_BITS = 1024
+MORGAN_RADIUS = 2
+
+# Set bits of every 16-bit value, for popcounts without np.bitwise_count (NumPy < 2.0)
+_POPCOUNT_16 = np.unpackbits(np.arange(65536, dtype=np.uint16).view(np.uint8)).reshape(-1, 16).sum(axis=1).astype(np.uint8)
+
+
+def pack_fingerprint(fp):
+    """Pack an RDKit ExplicitBitVect into a uint64 array (bit i -> word i // 64)."""
+    bits = np.zeros(fp.GetNumBits(), dtype=np.uint8)
+    DataStructs.ConvertToNumpyArray(fp, bits)
+    return np.packbits(bits, bitorder="little").view(np.uint64)
+
+
+def pattern_fingerprint(mol):
+    """RDKit pattern fingerprint used to screen substructure candidates."""
+    return pack_fingerprint(Chem.PatternFingerprint(mol, fpSize=PATTERN_FP_BITS))
+
+
+def morgan_fingerprint(mol):
+    """Morgan (ECFP4-like) fingerprint used for similarity searches."""
+    return pack_fingerprint(
+        rdMolDescriptors.GetMorganFingerprintAsBitVect(mol, MORGAN_RADIUS, nBits=MORGAN_FP_BITS)
+    )
+
+
+FINGERPRINT_KINDS = {
+    "pattern": (pattern_fingerprint, PATTERN_FP_BITS),
+    "morgan": (morgan_fingerprint, MORGAN_FP_BITS),
+}
+
+
+def popcount_rows(fps):
+    """Number of set bits in each row of a packed uint64 fingerprint matrix."""
+    fps = np.ascontiguousarray(fps)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(fps).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT_16[fps.view(np.uint16)].sum(axis=1, dtype=np.int32)
+
+
+def _fingerprint_batch(rows, kind):
+    """Fingerprint (id, smiles) rows (runs in a worker process)."""
+    RDLogger.DisableLog("rdApp.*")
+    function, n_bits = FINGERPRINT_KINDS[kind]
+    ids = []
+    smiles_list = []
+    fps = []
+    for compound_id, smiles in rows:
+        mol = Chem.MolFromSmiles(smiles) if smiles else None
+        if mol is None:
+            continue
+        ids.append(compound_id)
+        smiles_list.append(smiles)
+        fps.append(function(mol))
+    fps = np.vstack(fps) if fps else np.zeros((0, n_bits // 64), dtype=np.uint64)
+    return np.array(ids, dtype=np.int64), smiles_list, fps
+
+
+def compute_fingerprints(rows, kind, workers=None):
+    """
+    Fingerprint many molecules, in a process pool for large inputs.
+
+    Molecules whose SMILES doesn't parse are left out.
+
+    Args:
+        rows: List of (compound ID, smiles)
+        kind: Key of FINGERPRINT_KINDS
+
+    Returns:
+        (ids int64 array, smiles list, packed uint64 fingerprint matrix)
+    """
+    if len(rows) < PARALLEL_THRESHOLD:
+        return _fingerprint_batch(rows, kind)
+
+    batches = [rows[i:i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers or FINGERPRINT_WORKERS) as pool:
+        results = list(pool.map(_fingerprint_batch, batches, [kind] * len(batches)))
+    return (
+        np.concatenate([ids for ids, _, _ in results]),
+        [smiles for _, batch, _ in results for smiles in batch],
+        np.vstack([fps for _, _, fps in results])
+    )
+
+
+def compound_rows(query):
+    """(id, smiles) rows to fingerprint for a Compound query, canonical SMILES preferred."""
+    return query.with_entities(
+        Compound.id, func.coalesce(Compound.canonical_smiles, Compound.smiles)
+    ).order_by(Compound.id).all()
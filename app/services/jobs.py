@@ -0,0 +1,123 @@
+# services/jobs.py
+
+import os
+import json
+import uuid
+import datetime
+import threading
+import traceback
+
+# Job state is kept in small JSON files so that any worker process can
+# report on a job started by another one
+JOBS_FOLDER = os.getenv("JOBS_FOLDER", os.path.join("uploads", "jobs"))
+
+
+def _job_path(job_id):
+    return os.path.join(JOBS_FOLDER, f"{job_id}.json")
+
+
+def _write_job(job):
+    os.makedirs(JOBS_FOLDER, exist_ok=True)
+    path = _job_path(job['id'])
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(job, f)
+    os.replace(tmp_path, path)
+
+
+def get_job(job_id):
+    """
+    Return the current state of a job, or None if it doesn't exist.
+
+    The state is a dict with ``id``, ``kind``, ``status`` ('running',
+    'finished' or 'failed'), ``progress``, ``total``, ``items``, ``error``
+    and timestamps.
+    """
+    if not job_id or not all(c.isalnum() for c in job_id):
+        return None
+    try:
+        with open(_job_path(job_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class JobReporter:
+    """Handle passed to a job function for publishing progress."""
+
+    def __init__(self, job):
+        self.job = job
+        self._lock = threading.Lock()
+
+    def set_total(self, total):
+        with self._lock:
+            self.job['total'] = total
+            _write_job(self.job)
+
+    def set_progress(self, progress):
+        with self._lock:
+            self.job['progress'] = progress
+            _write_job(self.job)
+
+    def add_items(self, items):
+        """Append per-item results (dicts) and advance the progress counter."""
+        with self._lock:
+            self.job['items'].extend(items)
+            self.job['progress'] += len(items)
+            _write_job(self.job)
+
+    def set_items(self, items):
+        """Replace the per-item results (e.g. with their final status) without advancing progress."""
+        with self._lock:
+            self.job['items'] = list(items)
+            _write_job(self.job)
+
+    def set_summary(self, summary):
+        with self._lock:
+            self.job['summary'] = summary
+            _write_job(self.job)
+
+
+def start_job(kind, func, *args, **kwargs):
+    """
+    Run ``func(reporter, *args, **kwargs)`` in a background thread.
+
+    Args:
+        kind: Short label for the job type (e.g. 'structure_ingest')
+        func: Callable doing the work; receives a JobReporter first
+
+    Returns:
+        The job ID
+    """
+    job = {
+        'id': uuid.uuid4().hex,
+        'kind': kind,
+        'status': 'running',
+        'progress': 0,
+        'total': None,
+        'items': [],
+        'summary': None,
+        'error': None,
+        'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'finished_at': None
+    }
+    _write_job(job)
+    reporter = JobReporter(job)
+
+    def run():
+        try:
+            func(reporter, *args, **kwargs)
+            status, error = 'finished', None
+        except Exception as e:
+            print(f"Error in {kind} job {job['id']}: {e}")
+            traceback.print_exc()
+            status, error = 'failed', str(e)
+
+        with reporter._lock:
+            job['status'] = status
+            job['error'] = error
+            job['finished_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+            _write_job(job)
+
+    threading.Thread(target=run, name=f"job-{kind}-{job['id'][:8]}", daemon=True).start()
+    return job['id']
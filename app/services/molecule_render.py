@@ -0,0 +1,356 @@
+# services/molecule_render.py
+
+import os
+import re
+import hashlib
+import threading
+from io import BytesIO
+from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from urllib.parse import quote
+
+from rdkit import Chem
+from rdkit.Chem import Draw
+from rdkit.Chem import AllChem
+from rdkit.Chem.Draw import rdMolDraw2D
+
+# Rendered molecule images are cached in memory (LRU by count) in front of a
+# size-bounded on-disk cache shared by all workers
+MOLECULE_CACHE_DIR = os.getenv("MOLECULE_CACHE_DIR", os.path.join("uploads", "cache", "molecules"))
+MOLECULE_MEMORY_CACHE_SIZE = int(os.getenv("MOLECULE_MEMORY_CACHE_SIZE", "1024"))
+MOLECULE_DISK_CACHE_BYTES = int(os.getenv("MOLECULE_DISK_CACHE_BYTES", str(256 * 1024 * 1024)))
+# InChIKey -> canonical SMILES records backing the image URLs (never evicted)
+MOLECULE_KEY_DIR = os.getenv("MOLECULE_KEY_DIR", os.path.join("uploads", "cache", "molecule_keys"))
+MOLECULE_RENDER_WORKERS = int(os.getenv("MOLECULE_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Bump when rendering changes so stale images are not served
+RENDER_VERSION = 1
+
+DEFAULT_SIZE = 300
+MIN_SIZE = 50
+MAX_SIZE = 1000
+
+MOLECULE_URL = "/mol/{key}.svg"
+INCHIKEY_RE = re.compile(r"[A-Z]{14}-[A-Z]{10}-[A-Z]")
+
+
+def canonical_smiles(smiles):
+    """Return RDKit's canonical SMILES, or None if the SMILES doesn't parse."""
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    return Chem.MolToSmiles(mol) if mol is not None else None
+
+
+def draw_molecule(smiles, size=DEFAULT_SIZE, image_format="png"):
+    """
+    Render a molecule without any caching.
+
+    Returns:
+        Image bytes, or None if the SMILES can't be parsed
+    """
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        return None
+
+    # Add hydrogen atoms and generate 2D coordinates
+    mol = Chem.AddHs(mol)
+    AllChem.Compute2DCoords(mol)
+
+    if image_format == "svg":
+        drawer = rdMolDraw2D.MolDraw2DSVG(size, size)
+        drawer.DrawMolecule(mol)
+        drawer.FinishDrawing()
+        return drawer.GetDrawingText().encode("utf-8")
+
+    img = Draw.MolToImage(mol, size=(size, size))
+    buffered = BytesIO()
+    img.save(buffered, format=image_format.upper())
+    return buffered.getvalue()
+
+
+class RenderCache:
+    """
+    Two-tier cache of rendered molecule images.
+
+    The memory tier is keyed by the SMILES exactly as requested plus the
+    render options, so a repeat render is a single dict lookup. On a miss the
+    SMILES is canonicalised and the disk tier is consulted under the
+    canonical key, so different spellings of one molecule share an image.
+    """
+
+    def __init__(self, cache_dir=None, memory_size=None, disk_bytes=None):
+        self.cache_dir = cache_dir or MOLECULE_CACHE_DIR
+        self.memory_size = memory_size or MOLECULE_MEMORY_CACHE_SIZE
+        self.disk_bytes = disk_bytes or MOLECULE_DISK_CACHE_BYTES
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_usage = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, smiles, size=DEFAULT_SIZE, image_format="png"):
+        """
+        Return the rendered image for a SMILES, rendering it on a miss.
+
+        Returns:
+            Image bytes, or None if the SMILES can't be parsed
+        """
+        key = (smiles, size, image_format)
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return image
+
+        canonical = canonical_smiles(smiles)
+        if canonical is None:
+            return None
+
+        path = self._disk_path(canonical, size, image_format)
+        image = self._read_disk(path)
+        if image is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            image = draw_molecule(canonical, size=size, image_format=image_format)
+            with self._lock:
+                self.misses += 1
+            self._write_disk(path, image)
+
+        with self._lock:
+            self._memory[key] = image
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+        return image
+
+    def contains(self, smiles, size=DEFAULT_SIZE, image_format="png"):
+        """Whether an image is already cached in either tier (without counting a hit)."""
+        with self._lock:
+            if (smiles, size, image_format) in self._memory:
+                return True
+        canonical = canonical_smiles(smiles)
+        return canonical is None or os.path.exists(self._disk_path(canonical, size, image_format))
+
+    def stats(self):
+        """Hit counters and hit rates of both tiers."""
+        with self._lock:
+            requests = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "requests": requests,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / requests if requests else 0.0,
+                "memory_hit_rate": self.memory_hits / requests if requests else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_usage or 0
+            }
+
+    def clear(self):
+        """Empty the memory tier and reset the counters (the disk tier is kept)."""
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def _disk_path(self, canonical, size, image_format):
+        digest = hashlib.sha1(f"{canonical}|{size}|v{RENDER_VERSION}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.{image_format}")
+
+    def _read_disk(self, path):
+        try:
+            with open(path, 'rb') as f:
+                image = f.read()
+            # Touch the file so disk eviction is least-recently-used
+            os.utime(path)
+            return image
+        except OSError:
+            return None
+
+    def _write_disk(self, path, image):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(image)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing molecule image cache {path}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_usage is None:
+                self._disk_usage = sum(size for _, size, _ in self._scan_disk())
+            else:
+                self._disk_usage += len(image)
+            over_budget = self._disk_usage > self.disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _scan_disk(self):
+        """Yield (path, size, mtime) for every cached image."""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _evict_disk(self):
+        """Delete least recently used images until the disk tier is at 90% of its budget."""
+        entries = sorted(self._scan_disk(), key=lambda entry: entry[2])
+        usage = sum(size for _, size, _ in entries)
+        target = self.disk_bytes * 0.9
+        for path, size, _ in entries:
+            if usage <= target:
+                break
+            try:
+                os.remove(path)
+                usage -= size
+            except OSError:
+                continue
+        with self._lock:
+            self._disk_usage = usage
+
+
+render_cache = RenderCache()
+
+
+def render_molecule_image(smiles, size=DEFAULT_SIZE, image_format="png"):
+    """Render a molecule image through the shared two-tier cache."""
+    return render_cache.get(smiles, size=size, image_format=image_format)
+
+
+_worker_cache = None
+
+
+def _init_render_worker():
+    # A fresh cache, so no lock copied from a busy parent thread is inherited
+    global _worker_cache
+    _worker_cache = RenderCache(memory_size=1)
+
+
+def _render_batch(smiles_list, size, image_format):
+    """Render a batch of molecules into the disk cache (runs in a worker process)."""
+    for smiles in smiles_list:
+        try:
+            _worker_cache.get(smiles, size=size, image_format=image_format)
+        except Exception as e:
+            print(f"Error rendering molecule {smiles}: {e}")
+
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=MOLECULE_RENDER_WORKERS, initializer=_init_render_worker
+            )
+        return _render_pool
+
+
+def prerender_molecules(smiles_list, size=DEFAULT_SIZE, image_format="svg", timeout=None, batch_size=8):
+    """
+    Render uncached molecule images in parallel in a process pool.
+
+    Images land in the on-disk tier, from where the image route serves them.
+
+    Args:
+        smiles_list: SMILES strings to render
+        size: Image size in pixels
+        image_format: 'svg' or 'png'
+        timeout: Seconds to wait for the renders; None waits until done and
+            0 returns immediately (e.g. to prefetch the next page)
+        batch_size: Molecules per worker task
+
+    Returns:
+        Number of molecules submitted for rendering
+    """
+    pending = [smiles for smiles in dict.fromkeys(smiles_list)
+               if smiles and not render_cache.contains(smiles, size, image_format)]
+    if not pending:
+        return 0
+
+    pool = _get_render_pool()
+    futures = [
+        pool.submit(_render_batch, pending[i:i + batch_size], size, image_format)
+        for i in range(0, len(pending), batch_size)
+    ]
+    if timeout != 0:
+        wait(futures, timeout=timeout)
+    return len(pending)
+
+
+def _key_path(key):
+    return os.path.join(MOLECULE_KEY_DIR, key[:2], f"{key}.smi")
+
+
+@lru_cache(maxsize=MOLECULE_MEMORY_CACHE_SIZE)
+def molecule_key(smiles):
+    """
+    Return the InChIKey identifying a molecule in image URLs.
+
+    The canonical SMILES is recorded under the key on disk, so any worker
+    can serve the image. Returns None for SMILES that can't be parsed or
+    have no InChI.
+    """
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    if mol is None:
+        return None
+    key = Chem.MolToInchiKey(mol)
+    if not key:
+        return None
+
+    path = _key_path(key)
+    if not os.path.exists(path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(Chem.MolToSmiles(mol))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error registering molecule {key}: {e}")
+    return key
+
+
+def smiles_for_key(key):
+    """Look up the canonical SMILES recorded for an InChIKey, or None."""
+    if not INCHIKEY_RE.fullmatch(key or ""):
+        return None
+    try:
+        with open(_key_path(key)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def clamp_size(size):
+    """Parse a requested image size, limited to MIN_SIZE..MAX_SIZE."""
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        return DEFAULT_SIZE
+    return max(MIN_SIZE, min(MAX_SIZE, size))
+
+
+def molecule_image_url(smiles, size=DEFAULT_SIZE):
+    """URL of the SVG image of a molecule, or None if it can't be drawn."""
+    key = molecule_key(smiles)
+    if key is None:
+        return None
+    return f"{MOLECULE_URL.format(key=quote(key))}?size={clamp_size(size)}"
+
+
+def image_etag(key, size):
+    """Strong ETag for a molecule image; changes with RENDER_VERSION."""
+    return '"' + hashlib.sha1(f"{key}|{size}|v{RENDER_VERSION}".encode()).hexdigest() + '"'
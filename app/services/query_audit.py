@@ -0,0 +1,174 @@
+# services/query_audit.py
+
+import os
+import re
+import sysconfig
+import warnings
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import pytest
+except ImportError:  # pytest is only needed for the fixture
+    pytest = None
+
+# 'off', 'warn' or 'raise': what the app does when a request repeats a statement
+N_PLUS_ONE_MODE = os.getenv("N_PLUS_ONE_MODE", "off").lower()
+# Runs of the same normalized statement allowed per request before it is reported
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+MODES = ("off", "warn", "raise")
+STACK_DEPTH = 8
+
+# Frames from these paths (SQLAlchemy, Dash, Flask, pytest, the standard library) are left out of reports
+_LIBRARY_PATHS = tuple({sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"]})
+_SQL_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),                   # string literals
+    (re.compile(r"%\(\w+\)s|\$\d+|%s"), "?"),               # pyformat / numeric / format parameters
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),                # numeric literals (LIMIT, OFFSET, ...)
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),   # expanded IN lists of any length
+    (re.compile(r"\s+"), " ")
+)
+
+
+class NPlusOneError(RuntimeError):
+    """A statement ran more often in one request or block than the threshold allows."""
+
+
+class NPlusOneWarning(UserWarning):
+    """Warning counterpart of NPlusOneError, for N_PLUS_ONE_MODE=warn."""
+
+
+def normalize_sql(statement):
+    """Statement text with literals and parameters replaced, so each loop iteration looks the same."""
+    for pattern, replacement in _SQL_PATTERNS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def _app_stack():
+    """The application frames (outside libraries and this module) of the current call stack."""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if not frame.filename.startswith(_LIBRARY_PATHS + ("<",))
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+    return frames[-STACK_DEPTH:]
+
+
+class QueryAudit:
+    """Statements run during one request or block, grouped by normalized SQL."""
+
+    def __init__(self, threshold=N_PLUS_ONE_THRESHOLD, mode="raise", label=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown N+1 detection mode '{mode}'")
+        self.threshold = threshold
+        self.mode = mode
+        self.label = label
+        self.counts = Counter()
+        self.stacks = {}
+
+    def record(self, statement):
+        key = normalize_sql(statement)
+        self.counts[key] += 1
+        if self.counts[key] <= self.threshold or key in self.stacks:
+            return
+        # Report each statement once, with the stack of the loop running it
+        self.stacks[key] = _app_stack()
+        message = self.describe(key)
+        if self.mode == "raise":
+            raise NPlusOneError(message)
+        if self.mode == "warn":
+            warnings.warn(message, NPlusOneWarning, stacklevel=2)
+
+    def describe(self, key):
+        where = f" in {self.label}" if self.label else ""
+        return (
+            f"Statement ran more than {self.threshold} times{where} (possible N+1 query):\n"
+            f"    {key}\n"
+            "Called from:\n" + "".join(traceback.format_list(self.stacks.get(key, [])))
+        )
+
+    def repeated(self):
+        """Normalized statement -> run count, for statements over the threshold."""
+        return {key: count for key, count in self.counts.items() if count > self.threshold}
+
+
+_current_audit = ContextVar("query_audit", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    audit = _current_audit.get()
+    if audit is not None:
+        audit.record(statement)
+
+
+@contextmanager
+def detect_n_plus_one(threshold=N_PLUS_ONE_THRESHOLD, mode="raise", label=None):
+    """
+    Report statements repeated more than ``threshold`` times inside the block.
+
+    Statements are grouped by their normalized SQL, so a query run once per
+    row of a loop (a lazy-loaded relationship, a lookup by ID) is caught no
+    matter which IDs it used. In 'raise' mode the statement that crosses the
+    threshold raises NPlusOneError; in 'warn' mode it issues an
+    NPlusOneWarning. Both include the application stack of the loop.
+
+    Yields:
+        QueryAudit with the statement counts of the block
+    """
+    audit = QueryAudit(threshold, mode, label)
+    token = _current_audit.set(audit)
+    try:
+        yield audit
+    finally:
+        _current_audit.reset(token)
+
+
+def init_query_audit(app, mode=N_PLUS_ONE_MODE):
+    """
+    Check every request of a Dash app for repeated statements (development use).
+
+    Does nothing unless ``mode`` (N_PLUS_ONE_MODE) is 'warn' or 'raise'.
+    In 'raise' mode a callback with an N+1 query fails with NPlusOneError.
+
+    Args:
+        app: Dash app
+        mode: 'off', 'warn' or 'raise'
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown N+1 detection mode '{mode}'")
+    if mode == "off":
+        return
+
+    @app.server.before_request
+    def start_query_audit():
+        label = request.path
+        body = request.get_json(silent=True) if request.is_json else None
+        if isinstance(body, dict) and body.get("output"):
+            label += f" ({body['output']})"  # The Dash callback being served
+        _current_audit.set(QueryAudit(N_PLUS_ONE_THRESHOLD, mode, label=label))
+
+    @app.server.teardown_request
+    def end_query_audit(exc=None):
+        _current_audit.set(None)
+
+
+if pytest is not None:
+    @pytest.fixture
+    def no_n_plus_one():
+        """
+        Fail the test if it runs any statement more than N_PLUS_ONE_THRESHOLD times.
+
+        Enable with ``pytest_plugins = ["app.services.query_audit"]`` in
+        conftest.py (or ``pytest -p app.services.query_audit``).
+        """
+        with detect_n_plus_one(mode="raise", label="test") as audit:
+            yield audit
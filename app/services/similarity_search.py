@@ -0,0 +1,126 @@
+# services/similarity_search.py
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from rdkit import Chem
+
+from app.services.fingerprint_store import get_store
+from app.services.fingerprints import morgan_fingerprint, popcount_rows
+
+# NumPy releases the GIL in bitwise ufuncs, so blocks are scored on threads
+SIMILARITY_THREADS = int(os.getenv("SIMILARITY_THREADS", str(os.cpu_count() or 1)))
+SCORE_BLOCK_ROWS = 65536
+DEFAULT_K = 20
+DEFAULT_THRESHOLD = 0.0
+
+_score_pool = ThreadPoolExecutor(max_workers=SIMILARITY_THREADS) if SIMILARITY_THREADS > 1 else None
+
+
+def tanimoto(fps, counts, query_fp, query_count):
+    """
+    Tanimoto similarity of every row of a packed fingerprint matrix to a query.
+
+    Args:
+        fps: Packed uint64 fingerprint matrix
+        counts: Set bits of each row of fps
+        query_fp: Packed query fingerprint
+        query_count: Set bits of the query
+
+    Returns:
+        float32 array of similarities
+    """
+    scores = np.zeros(len(fps), dtype=np.float32)
+
+    def score_block(start):
+        block = slice(start, start + SCORE_BLOCK_ROWS)
+        common = popcount_rows(fps[block] & query_fp)
+        union = counts[block] + query_count - common
+        np.divide(common, union, out=scores[block], where=union > 0)
+
+    starts = range(0, len(fps), SCORE_BLOCK_ROWS)
+    if _score_pool is None or len(starts) < 2:
+        for start in starts:
+            score_block(start)
+    else:
+        list(_score_pool.map(score_block, starts))
+    return scores
+
+
+def top_k(scores, k, threshold=DEFAULT_THRESHOLD):
+    """Positions of the k highest scores at or above threshold, best first."""
+    positions = np.flatnonzero(scores >= threshold) if threshold > 0 else np.arange(len(scores))
+    if len(positions) > k:
+        positions = positions[np.argpartition(-scores[positions], k - 1)[:k]]
+    return positions[np.argsort(-scores[positions], kind="stable")]
+
+
+def similarity_search(session, smiles, k=DEFAULT_K, threshold=DEFAULT_THRESHOLD):
+    """
+    Find the compounds most similar to a molecule by Morgan fingerprint Tanimoto.
+
+    Each segment of the fingerprint store is scored separately and the
+    per-segment top-k are merged. With a threshold, rows whose bit count
+    rules the threshold out (Tanimoto <= min(a, b) / max(a, b)) are
+    skipped before scoring.
+
+    Args:
+        session: Database session
+        smiles: Query SMILES
+        k: Maximum number of hits
+        threshold: Minimum Tanimoto similarity (0-1)
+
+    Returns:
+        Dict with 'ids' and 'scores' (best first), 'n_searched' and
+        'elapsed' seconds
+
+    Raises:
+        ValueError: If the SMILES can't be parsed
+    """
+    start = time.perf_counter()
+    mol = Chem.MolFromSmiles(smiles.strip()) if smiles else None
+    if mol is None:
+        raise ValueError(f"Invalid SMILES: {smiles}")
+
+    segments = get_store("morgan", session).snapshot()
+
+    query_fp = morgan_fingerprint(mol)
+    query_count = int(popcount_rows(query_fp[np.newaxis])[0])
+    k = max(int(k), 1)
+    threshold = min(max(float(threshold or 0), 0.0), 1.0)
+
+    hit_ids = []
+    hit_scores = []
+    n_searched = 0
+    for segment, alive in segments:
+        counts = segment.counts
+        if threshold > 0:
+            candidate = (counts >= threshold * query_count) & (counts * threshold <= query_count)
+            if alive is not None:
+                candidate &= alive
+            candidates = np.flatnonzero(candidate)
+            scores = tanimoto(segment.fps[candidates], counts[candidates], query_fp, query_count)
+        elif alive is not None:
+            candidates = np.flatnonzero(alive)
+            scores = tanimoto(segment.fps[candidates], counts[candidates], query_fp, query_count)
+        else:
+            candidates = None
+            scores = tanimoto(segment.fps, counts, query_fp, query_count)
+
+        hits = top_k(scores, k, threshold)
+        positions = hits if candidates is None else candidates[hits]
+        hit_ids.append(segment.ids[positions])
+        hit_scores.append(scores[hits])
+        n_searched += len(segment) if alive is None else int(alive.sum())
+
+    ids = np.concatenate(hit_ids) if hit_ids else np.zeros(0, dtype=np.int64)
+    scores = np.concatenate(hit_scores) if hit_scores else np.zeros(0, dtype=np.float32)
+    best = top_k(scores, k)
+    return {
+        "ids": ids[best].tolist(),
+        "scores": [round(float(score), 4) for score in scores[best]],
+        "n_searched": n_searched,
+        "elapsed": time.perf_counter() - start
+    }
@@ -0,0 +1,379 @@
+# services/structure_features.py
+
+import os
+
+import numpy as np
+
+from app.services.structure_parser import (
+    STRUCTURE_MEMORY_CACHE_SIZE, cache_path, residue_indices, _StructureCache
+)
+
+# Heavy-atom distance below which two residues are in contact (Å)
+CONTACT_CUTOFF = float(os.getenv("CONTACT_CUTOFF", "4.5"))
+# Residues closer than this in sequence are not reported as contacts
+CONTACT_MIN_SEPARATION = 3
+
+# Bump when the feature arrays below change so stale cache files are ignored
+FEATURES_VERSION = 1
+
+# Secondary-structure codes stored per residue
+SS_COIL = 0
+SS_HELIX = 1
+SS_310_HELIX = 2
+SS_STRAND = 3
+SS_LABELS = {SS_COIL: "Coil", SS_HELIX: "α-helix", SS_310_HELIX: "3₁₀-helix", SS_STRAND: "β-strand"}
+
+# DSSP electrostatic H-bond model
+HBOND_ENERGY_CUTOFF = -0.5  # kcal/mol
+HBOND_FACTOR = 0.084 * 332.0
+HBOND_SEARCH_RADIUS = 5.2  # N···O distance considered when scoring H-bonds
+
+FEATURE_FIELDS = (
+    "residue_chain_ids", "residue_seqs", "residue_names", "secondary_structure",
+    "contacts", "contact_distances"
+)
+
+
+class StructureFeatures:
+    """Per-residue annotations derived from a :class:`ParsedStructure`."""
+
+    def __init__(self, residue_chain_ids, residue_seqs, residue_names, secondary_structure,
+                 contacts, contact_distances):
+        self.residue_chain_ids = residue_chain_ids
+        self.residue_seqs = residue_seqs
+        self.residue_names = residue_names
+        # uint8 SS_* code per residue
+        self.secondary_structure = secondary_structure
+        # (n_contacts, 2) residue index pairs, i < j, both in the same chain
+        self.contacts = contacts
+        # float16 minimum heavy-atom distance for each contact
+        self.contact_distances = contact_distances
+
+    @property
+    def n_residues(self):
+        return len(self.residue_seqs)
+
+    def arrays(self):
+        return {field: getattr(self, field) for field in FEATURE_FIELDS}
+
+    def chains(self):
+        """Chain identifiers in file order."""
+        _, first = np.unique(self.residue_chain_ids, return_index=True)
+        return self.residue_chain_ids[np.sort(first)].tolist()
+
+    def contact_map(self, chain_id):
+        """Dense boolean contact map for one chain."""
+        residues = np.flatnonzero(self.residue_chain_ids == chain_id)
+        contact_map = np.zeros((len(residues), len(residues)), dtype=bool)
+        if len(residues) == 0:
+            return contact_map
+
+        in_chain = np.isin(self.contacts[:, 0], residues)
+        pairs = self.contacts[in_chain] - residues[0]
+        contact_map[pairs[:, 0], pairs[:, 1]] = True
+        contact_map[pairs[:, 1], pairs[:, 0]] = True
+        return contact_map
+
+
+def neighbor_pairs(coords, cutoff):
+    """
+    Find all point pairs closer than ``cutoff`` using a uniform spatial grid.
+
+    Points are binned into cubic cells of edge ``cutoff``; only points in the
+    same or adjacent cells are compared, so the cost grows with the number of
+    neighbours rather than the square of the number of points.
+
+    Returns:
+        (pairs, distances) with ``pairs`` of shape (n_pairs, 2), i < j
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    n_points = len(coords)
+    if n_points < 2:
+        return np.zeros((0, 2), dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+    cells = np.floor((coords - coords.min(axis=0)) / cutoff).astype(np.int64)
+    dims = cells.max(axis=0) + 3
+    # Shift by one so neighbour offsets never wrap around
+    cells += 1
+    cell_ids = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+    order = np.argsort(cell_ids, kind='stable')
+    sorted_ids = cell_ids[order]
+
+    # Half of the 27 neighbour offsets (plus the cell itself) covers every pair once
+    offsets = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+    offsets = [o for o in offsets if o > (0, 0, 0)] + [(0, 0, 0)]
+
+    cutoff_sq = cutoff * cutoff
+    all_i, all_j, all_d = [], [], []
+    for dx, dy, dz in offsets:
+        neighbor_ids = cell_ids + (dx * dims[1] + dy) * dims[2] + dz
+        start = np.searchsorted(sorted_ids, neighbor_ids, side='left')
+        end = np.searchsorted(sorted_ids, neighbor_ids, side='right')
+        counts = end - start
+        if not counts.any():
+            continue
+
+        i = np.repeat(np.arange(n_points), counts)
+        # Position of each candidate within its neighbour cell
+        run_starts = np.repeat(start - np.cumsum(counts) + counts, counts)
+        j = order[run_starts + np.arange(counts.sum())]
+
+        if (dx, dy, dz) == (0, 0, 0):
+            keep = i < j
+            i, j = i[keep], j[keep]
+
+        d_sq = ((coords[i] - coords[j]) ** 2).sum(axis=1)
+        close = d_sq < cutoff_sq
+        all_i.append(i[close])
+        all_j.append(j[close])
+        all_d.append(np.sqrt(d_sq[close]))
+
+    if not all_i:
+        return np.zeros((0, 2), dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+    i = np.concatenate(all_i)
+    j = np.concatenate(all_j)
+    pairs = np.stack([np.minimum(i, j), np.maximum(i, j)], axis=1)
+    return pairs, np.concatenate(all_d)
+
+
+def _backbone_indices(parsed, atom_residue, n_residues, atom_name):
+    """Atom index of a backbone atom for every residue (-1 where missing)."""
+    indices = np.full(n_residues, -1, dtype=np.int64)
+    atoms = np.flatnonzero((parsed.atom_names == atom_name) & ~parsed.hetatm)
+    # Assign in reverse so the first alternate location wins
+    indices[atom_residue[atoms[::-1]]] = atoms[::-1]
+    return indices
+
+
+def residue_contacts(parsed, atom_residue, cutoff=CONTACT_CUTOFF):
+    """
+    Intra-chain residue contacts from heavy-atom distances.
+
+    Returns:
+        (contacts, distances): residue index pairs (i < j) and their minimum
+        heavy-atom distance
+    """
+    heavy = np.flatnonzero((parsed.elements != 'H') & ~parsed.hetatm)
+    pairs, distances = neighbor_pairs(parsed.coords[heavy], cutoff)
+    if len(pairs) == 0:
+        return np.zeros((0, 2), dtype=np.int32), np.zeros(0, dtype=np.float16)
+
+    atoms = heavy[pairs]
+    residues = atom_residue[atoms]
+    same_chain = parsed.chain_ids[atoms[:, 0]] == parsed.chain_ids[atoms[:, 1]]
+    separated = np.abs(residues[:, 1] - residues[:, 0]) >= CONTACT_MIN_SEPARATION
+    keep = same_chain & separated
+    residues = np.sort(residues[keep], axis=1)
+    distances = distances[keep]
+
+    # Reduce atom pairs to residue pairs, keeping the closest approach
+    order = np.lexsort((distances, residues[:, 1], residues[:, 0]))
+    residues = residues[order]
+    distances = distances[order]
+    first = np.ones(len(residues), dtype=bool)
+    first[1:] = (residues[1:] != residues[:-1]).any(axis=1)
+    return residues[first].astype(np.int32), distances[first].astype(np.float16)
+
+
+def _hbond_keys(N, H, C, O, has_donor, has_acceptor, n_residues):
+    """
+    Backbone H-bonds as ``acceptor * n_residues + donor`` keys.
+
+    Uses the DSSP electrostatic energy between the C=O of the acceptor
+    residue and the N-H of the donor residue.
+    """
+    donors = np.flatnonzero(has_donor)
+    acceptors = np.flatnonzero(has_acceptor)
+    if len(donors) == 0 or len(acceptors) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    points = np.concatenate([N[donors], O[acceptors]])
+    pairs, _ = neighbor_pairs(points, HBOND_SEARCH_RADIUS)
+    # Keep only donor (N) / acceptor (O) combinations
+    n_donors = len(donors)
+    cross = (pairs[:, 0] < n_donors) & (pairs[:, 1] >= n_donors)
+    donor = donors[pairs[cross, 0]]
+    acceptor = acceptors[pairs[cross, 1] - n_donors]
+    # A residue can't H-bond with itself or its direct neighbour
+    keep = np.abs(donor - acceptor) >= 2
+    donor, acceptor = donor[keep], acceptor[keep]
+
+    r_on = np.linalg.norm(O[acceptor] - N[donor], axis=1)
+    r_ch = np.linalg.norm(C[acceptor] - H[donor], axis=1)
+    r_oh = np.linalg.norm(O[acceptor] - H[donor], axis=1)
+    r_cn = np.linalg.norm(C[acceptor] - N[donor], axis=1)
+    energy = HBOND_FACTOR * (1.0 / r_on + 1.0 / r_ch - 1.0 / r_oh - 1.0 / r_cn)
+
+    bonded = energy < HBOND_ENERGY_CUTOFF
+    return np.unique(acceptor[bonded] * n_residues + donor[bonded])
+
+
+def assign_secondary_structure(parsed, atom_residue, n_residues):
+    """
+    Simplified DSSP assignment (α-helix, 3₁₀-helix, β-strand) from backbone atoms.
+
+    Returns:
+        uint8 array with one SS_* code per residue
+    """
+    ss = np.full(n_residues, SS_COIL, dtype=np.uint8)
+
+    n_idx = _backbone_indices(parsed, atom_residue, n_residues, 'N')
+    ca_idx = _backbone_indices(parsed, atom_residue, n_residues, 'CA')
+    c_idx = _backbone_indices(parsed, atom_residue, n_residues, 'C')
+    o_idx = _backbone_indices(parsed, atom_residue, n_residues, 'O')
+    complete = (n_idx >= 0) & (ca_idx >= 0) & (c_idx >= 0) & (o_idx >= 0)
+    if complete.sum() < 3:
+        return ss
+
+    coords = parsed.coords.astype(np.float64)
+    N = coords[np.where(complete, n_idx, 0)]
+    C = coords[np.where(complete, c_idx, 0)]
+    O = coords[np.where(complete, o_idx, 0)]
+
+    # Residue i is peptide-bonded to i + 1 when C(i)-N(i+1) is short
+    linked = np.zeros(n_residues, dtype=bool)
+    linked[:-1] = (
+        complete[:-1] & complete[1:]
+        & (np.linalg.norm(C[:-1] - N[1:], axis=1) < 2.5)
+    )
+
+    # Amide hydrogen placed opposite the previous carbonyl, as in DSSP
+    H = N.copy()
+    prev_linked = np.zeros(n_residues, dtype=bool)
+    prev_linked[1:] = linked[:-1]
+    co = C[:-1] - O[:-1]
+    co /= np.linalg.norm(co, axis=1, keepdims=True) + 1e-12
+    H[1:][prev_linked[1:]] += co[prev_linked[1:]]
+
+    is_proline = np.isin(
+        parsed.residue_names[np.where(complete, ca_idx, 0)], ['PRO']
+    )
+    has_donor = complete & prev_linked & ~is_proline
+    keys = _hbond_keys(N, H, C, O, has_donor, complete, n_residues)
+
+    def hbond(acceptor, donor):
+        valid = (acceptor >= 0) & (acceptor < n_residues) & (donor >= 0) & (donor < n_residues)
+        result = np.zeros(len(acceptor), dtype=bool)
+        result[valid] = np.isin(acceptor[valid] * n_residues + donor[valid], keys)
+        return result
+
+    # Residues i..i+n must form one unbroken backbone segment
+    segment_id = np.concatenate([[0], np.cumsum(~linked)[:-1]])
+
+    def contiguous(i, n):
+        j = i + n
+        valid = j < n_residues
+        result = np.zeros(len(i), dtype=bool)
+        result[valid] = segment_id[i[valid]] == segment_id[j[valid]]
+        return result
+
+    residues = np.arange(n_residues)
+
+    # n-turns: H-bond from C=O(i) to N-H(i+n); helices need two consecutive turns
+    for n, code in ((3, SS_310_HELIX), (4, SS_HELIX)):
+        turn = hbond(residues, residues + n) & contiguous(residues, n)
+        starts = np.flatnonzero(turn[:-1] & turn[1:])
+        for k in range(1, n + 1):
+            positions = starts + k
+            positions = positions[positions < n_residues]
+            if code == SS_310_HELIX:
+                # α-helix takes precedence over 3₁₀
+                positions = positions[ss[positions] == SS_COIL]
+            ss[positions] = code
+
+    # β-bridges between residue i and j, checked over the H-bond list only
+    acceptor_of = keys // n_residues
+    donor_of = keys % n_residues
+    candidates = np.unique(np.concatenate([
+        np.stack([acceptor_of + 1, donor_of], axis=1),   # parallel: Hbond(i-1, j)
+        np.stack([donor_of, acceptor_of], axis=1),       # antiparallel: Hbond(j, i)
+        np.stack([acceptor_of + 1, donor_of - 1], axis=1)  # antiparallel: Hbond(i-1, j+1)
+    ]), axis=0)
+    i, j = candidates[:, 0], candidates[:, 1]
+    valid = (i > 0) & (j > 0) & (i < n_residues - 1) & (j < n_residues - 1) & (np.abs(i - j) > 2)
+    i, j = i[valid], j[valid]
+
+    parallel = (hbond(i - 1, j) & hbond(j, i + 1)) | (hbond(j - 1, i) & hbond(i, j + 1))
+    antiparallel = (hbond(i, j) & hbond(j, i)) | (hbond(i - 1, j + 1) & hbond(j - 1, i + 1))
+    bridged = parallel | antiparallel
+    strand = np.unique(np.concatenate([i[bridged], j[bridged]]))
+    strand = strand[ss[strand] == SS_COIL]
+    ss[strand] = SS_STRAND
+
+    return ss
+
+
+def compute_features(parsed):
+    """Compute contact map and secondary structure for a parsed structure."""
+    atom_residue = residue_indices(parsed)
+    n_residues = int(atom_residue.max()) + 1 if parsed.n_atoms else 0
+
+    # First atom of each residue carries its identifiers
+    first_atom = np.zeros(n_residues, dtype=np.int64)
+    if n_residues:
+        first_atom[atom_residue[::-1]] = np.arange(parsed.n_atoms)[::-1]
+
+    contacts, distances = residue_contacts(parsed, atom_residue)
+
+    return StructureFeatures(
+        residue_chain_ids=parsed.chain_ids[first_atom],
+        residue_seqs=parsed.residue_seqs[first_atom],
+        residue_names=parsed.residue_names[first_atom],
+        secondary_structure=assign_secondary_structure(parsed, atom_residue, n_residues),
+        contacts=contacts,
+        contact_distances=distances
+    )
+
+
+_memory_cache = _StructureCache(STRUCTURE_MEMORY_CACHE_SIZE)
+
+
+def _features_path(digest, cache_dir=None):
+    return cache_path(digest, suffix=f"features.v{FEATURES_VERSION}.npz", cache_dir=cache_dir)
+
+
+def load_features(parsed, cache_dir=None):
+    """
+    Return contact map and secondary structure for a parsed structure.
+
+    Results are stored as compact arrays next to the parsed-structure cache
+    file, so they are only computed once per file content.
+    """
+    digest = parsed.content_hash
+    if digest is None:
+        return compute_features(parsed)
+
+    features = _memory_cache.get(digest)
+    if features is not None:
+        return features
+
+    path = _features_path(digest, cache_dir=cache_dir)
+    if os.path.exists(path):
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                features = StructureFeatures(**{field: arrays[field] for field in FEATURE_FIELDS})
+        except Exception as e:
+            print(f"Error reading structure features {path}: {e}")
+
+    if features is None:
+        features = compute_features(parsed)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **features.arrays())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing structure features {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    _memory_cache.put(digest, features)
+    return features
+
+
+def atom_secondary_structure(parsed, features):
+    """Broadcast the per-residue SS codes to every atom."""
+    return features.secondary_structure[residue_indices(parsed)]
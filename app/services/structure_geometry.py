@@ -0,0 +1,135 @@
+# services/structure_geometry.py
+
+import os
+import gzip
+import json
+import struct
+import hashlib
+
+import numpy as np
+
+from app.services.structure_parser import cache_path, residue_indices
+
+# Binary layout (little-endian):
+#   b"DTG1" | uint32 header length | JSON header | padding to 4 bytes | buffers
+# Every buffer starts on a 4-byte boundary so the browser can view it as a
+# typed array without copying.
+GEOMETRY_MAGIC = b"DTG1"
+GEOMETRY_VERSION = 1
+GEOMETRY_URL = "/structures/geometry/{digest}.bin"
+
+
+def _pad(length, alignment=4):
+    return (alignment - length % alignment) % alignment
+
+
+def _table(values, dtype):
+    """Turn a string array into (lookup table, index array)."""
+    table, indices = np.unique(values, return_inverse=True)
+    return table.tolist(), indices.astype(dtype)
+
+
+def encode_geometry(parsed, secondary_structure=None, model=None):
+    """
+    Encode a parsed structure as compact typed-array buffers.
+
+    Args:
+        parsed: ParsedStructure to encode
+        secondary_structure: Optional per-atom uint8 SS codes
+        model: Optional per-atom uint8 model index (e.g. for overlays)
+
+    Returns:
+        Uncompressed geometry bytes
+    """
+    n_atoms = parsed.n_atoms
+    atom_name_table, atom_names = _table(parsed.atom_names, np.uint16)
+    element_table, elements = _table(parsed.elements, np.uint8)
+    residue_name_table, residue_names = _table(parsed.residue_names, np.uint16)
+    chain_table, chains = _table(parsed.chain_ids, np.uint16)
+
+    buffers = [
+        ("positions", parsed.coords.astype('<f4').ravel()),
+        ("atom_names", atom_names.astype('<u2')),
+        ("elements", elements.astype('u1')),
+        ("residue_index", residue_indices(parsed).astype('<u4')),
+        ("residue_seqs", parsed.residue_seqs.astype('<i4')),
+        ("residue_names", residue_names.astype('<u2')),
+        ("chains", chains.astype('<u2')),
+        ("hetatm", parsed.hetatm.astype('u1')),
+        ("secondary_structure", (
+            np.zeros(n_atoms, dtype='u1') if secondary_structure is None
+            else np.asarray(secondary_structure, dtype='u1')
+        )),
+        ("model", np.zeros(n_atoms, dtype='u1') if model is None else np.asarray(model, dtype='u1')),
+        ("bonds", parsed.bonds.astype('<u4').ravel()),
+    ]
+
+    layout = []
+    offset = 0
+    for name, array in buffers:
+        layout.append({
+            "name": name,
+            "dtype": array.dtype.name,
+            "offset": offset,
+            "length": int(array.size)
+        })
+        offset += array.nbytes + _pad(array.nbytes)
+
+    header = json.dumps({
+        "version": GEOMETRY_VERSION,
+        "n_atoms": n_atoms,
+        "n_bonds": int(len(parsed.bonds)),
+        "buffers": layout,
+        "tables": {
+            "atom_names": atom_name_table,
+            "elements": element_table,
+            "residue_names": residue_name_table,
+            "chains": chain_table
+        }
+    }, separators=(",", ":")).encode("utf-8")
+    header += b" " * _pad(len(header))
+
+    parts = [GEOMETRY_MAGIC, struct.pack("<I", len(header)), header]
+    for _, array in buffers:
+        data = array.tobytes()
+        parts.append(data)
+        parts.append(b"\0" * _pad(len(data)))
+    return b"".join(parts)
+
+
+def geometry_digest(parsed, variant=""):
+    """Content hash identifying the encoded geometry of a structure."""
+    return hashlib.sha1(
+        f"{parsed.content_hash}:{variant}:{GEOMETRY_VERSION}".encode()
+    ).hexdigest()
+
+
+def geometry_path(digest, cache_dir=None):
+    """On-disk location of the gzip-compressed geometry for a digest."""
+    return cache_path(digest, suffix="geometry.bin.gz", cache_dir=cache_dir)
+
+
+def write_geometry(parsed, secondary_structure=None, model=None, variant="", cache_dir=None):
+    """
+    Encode, gzip and store the geometry of a structure unless already cached.
+
+    Returns:
+        The geometry digest, to be used in GEOMETRY_URL
+    """
+    digest = geometry_digest(parsed, variant)
+    path = geometry_path(digest, cache_dir=cache_dir)
+    if os.path.exists(path):
+        return digest
+
+    data = gzip.compress(encode_geometry(parsed, secondary_structure, model), compresslevel=6)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return digest
+
+
+def geometry_url(digest):
+    return GEOMETRY_URL.format(digest=digest)
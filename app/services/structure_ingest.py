@@ -0,0 +1,346 @@
+# services/structure_ingest.py
+
+import os
+import re
+import io
+import tarfile
+import zipfile
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from sqlalchemy import func, insert, update
+
+from app.models.database import get_session
+from app.models.targets import Target
+from app.models.structures import Structure
+from app.services.structure_parser import load_structure, read_structure_bytes
+from app.services.structure_storage import decompress_bytes, original_filename, write_structure_file
+
+STRUCTURE_EXTENSIONS = ('.pdb', '.ent', '.pdb.gz', '.ent.gz')
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 2)))
+# Members larger than this are skipped rather than extracted
+MAX_MEMBER_BYTES = int(os.getenv("INGEST_MAX_MEMBER_BYTES", str(200 * 1024 * 1024)))
+
+_RESOLUTION_RE = re.compile(rb"^REMARK   2 RESOLUTION\.\s+([0-9.]+)\s+ANGSTROM", re.MULTILINE)
+# A whole four-character token starting with 1-9, e.g. the '1abc' of 1abc_chainA.pdb
+_PDB_ID_RE = re.compile(r"(?<![A-Za-z0-9])([1-9][A-Za-z0-9]{3})(?![A-Za-z0-9])")
+ITEM_KEYS = ('file', 'pdb_id', 'target_id', 'resolution', 'status', 'message')
+
+
+def clean_filename(filename):
+    """Strip directories and unsafe characters from an archive member name."""
+    return ''.join(c for c in os.path.basename(filename) if c.isalnum() or c in ['_', '.', '-'])
+
+
+def iter_archive_members(archive_path):
+    """
+    Yield (member name, bytes) for every structure file in a ZIP or tar archive.
+
+    Members that are too large are yielded with ``None`` instead of their
+    contents so they can be reported.
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(STRUCTURE_EXTENSIONS):
+                    continue
+                if info.file_size > MAX_MEMBER_BYTES:
+                    yield info.filename, None
+                    continue
+                yield info.filename, archive.read(info)
+
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path) as archive:
+            for member in archive:
+                if not member.isfile() or not member.name.lower().endswith(STRUCTURE_EXTENSIONS):
+                    continue
+                if member.size > MAX_MEMBER_BYTES:
+                    yield member.name, None
+                    continue
+                yield member.name, archive.extractfile(member).read()
+
+    else:
+        raise ValueError("Unsupported archive format; please upload a .zip or .tar(.gz) file")
+
+
+def extract_metadata(data, filename):
+    """
+    Read PDB ID, resolution and title from the header records of a PDB file.
+
+    The PDB ID falls back to the first four-character token of the filename
+    that contains a letter (so dates and model numbers aren't taken for one).
+    """
+    header_end = data.find(b"\nATOM  ")
+    header = data if header_end < 0 else data[:header_end]
+
+    pdb_id = None
+    title_parts = []
+    for line in header.splitlines():
+        if line.startswith(b"HEADER") and len(line) >= 66:
+            pdb_id = line[62:66].decode('ascii', errors='ignore').strip() or None
+        elif line.startswith(b"TITLE "):
+            title_parts.append(line[10:80].decode('ascii', errors='ignore').strip())
+
+    if not pdb_id:
+        stem = os.path.basename(filename).split('.')[0]
+        stem = stem[3:] if stem.lower().startswith('pdb') else stem
+        pdb_id = next(
+            (token for token in _PDB_ID_RE.findall(stem) if any(c.isalpha() for c in token)), None
+        )
+
+    match = _RESOLUTION_RE.search(header)
+    resolution = float(match.group(1)) if match else None
+
+    return {
+        'pdb_id': pdb_id.upper() if pdb_id else None,
+        'resolution': resolution,
+        'description': ' '.join(title_parts) or None
+    }
+
+
+def parse_structure_file(filepath, member_name):
+    """
+    Parse one extracted structure file (runs in a worker process).
+
+    Parsing through load_structure also fills the on-disk parse cache, so the
+    viewer never has to parse these files again.
+    """
+    try:
+        data = read_structure_bytes(filepath)
+        metadata = extract_metadata(data, member_name)
+        parsed = load_structure(filepath)
+        if parsed.n_atoms == 0:
+            raise ValueError("no ATOM/HETATM records")
+
+        return dict(
+            metadata,
+            file=member_name,
+            file_path=filepath,
+            n_atoms=int(parsed.n_atoms),
+            status='parsed',
+            message=None
+        )
+    except Exception as e:
+        return {'file': member_name, 'file_path': filepath, 'status': 'error', 'message': f"Parse error: {e}"}
+
+
+def read_mapping(contents):
+    """
+    Read a mapping CSV of structure files to targets.
+
+    The CSV needs a ``file`` or ``pdb_id`` column and a ``target_id`` or
+    ``target`` (name) column.
+
+    Returns:
+        (by_file, by_pdb_id) dicts mapping to a target ID or target name
+    """
+    df = pd.read_csv(io.BytesIO(contents) if isinstance(contents, bytes) else io.StringIO(contents))
+    df.columns = [column.strip().lower() for column in df.columns]
+
+    target_column = 'target_id' if 'target_id' in df.columns else 'target' if 'target' in df.columns else None
+    if target_column is None or not ({'file', 'pdb_id'} & set(df.columns)):
+        raise ValueError("Mapping CSV needs a 'file' or 'pdb_id' column and a 'target_id' or 'target' column")
+
+    by_file = {}
+    by_pdb_id = {}
+    for row in df.to_dict('records'):
+        target = row[target_column]
+        if pd.isna(target):
+            continue
+        target = int(target) if target_column == 'target_id' else str(target).strip()
+        if 'file' in row and not pd.isna(row['file']):
+            by_file[os.path.basename(str(row['file']).strip())] = target
+        if 'pdb_id' in row and not pd.isna(row['pdb_id']):
+            by_pdb_id[str(row['pdb_id']).strip().upper()] = target
+
+    return by_file, by_pdb_id
+
+
+def _resolve_targets(session, results, by_file, by_pdb_id):
+    """Attach a target_id to every parsed result, using one query per lookup kind."""
+    names = {
+        target for target in list(by_file.values()) + list(by_pdb_id.values())
+        if isinstance(target, str)
+    }
+    target_ids_by_name = {}
+    if names:
+        rows = session.query(Target.id, func.lower(Target.name)).filter(
+            func.lower(Target.name).in_([name.lower() for name in names])
+        ).all()
+        target_ids_by_name = {name: target_id for target_id, name in rows}
+
+    # Fall back to the target of an existing structure with the same PDB ID
+    pdb_ids = {result['pdb_id'] for result in results if result.get('pdb_id')}
+    existing_targets = {}
+    if pdb_ids:
+        rows = session.query(func.upper(Structure.pdb_id), Structure.target_id).filter(
+            func.upper(Structure.pdb_id).in_(pdb_ids),
+            Structure.target_id.isnot(None)
+        ).all()
+        existing_targets = {pdb_id: target_id for pdb_id, target_id in rows}
+
+    known_ids = {target_id for (target_id,) in session.query(Target.id).all()}
+
+    for result in results:
+        target = by_file.get(os.path.basename(result['file']))
+        if target is None and result.get('pdb_id'):
+            target = by_pdb_id.get(result['pdb_id'])
+        if isinstance(target, str):
+            target = target_ids_by_name.get(target.lower())
+        if target is None and result.get('pdb_id'):
+            target = existing_targets.get(result['pdb_id'])
+        result['target_id'] = target if target in known_ids else None
+
+
+def _item(result):
+    """Per-file status reported to the job."""
+    return {key: result.get(key) for key in ITEM_KEYS}
+
+
+def ingest_structure_archive(reporter, archive_path, mapping=None, upload_folder="uploads/structures"):
+    """
+    Extract, parse and register every structure file in an archive.
+
+    Files are parsed in a process pool and reported as they finish, then
+    matched to targets through the mapping CSV or their PDB ID. The
+    Structure rows are written with one bulk INSERT (new structures) and
+    one bulk UPDATE (existing rows that had no file yet); a (target, PDB
+    ID) pair that occurs more than once is only registered once.
+
+    Args:
+        reporter: JobReporter receiving per-file status dicts
+        archive_path: Path to the uploaded .zip/.tar(.gz) archive
+        mapping: Optional mapping CSV contents (see read_mapping)
+        upload_folder: Folder the extracted structure files are stored in
+    """
+    by_file, by_pdb_id = read_mapping(mapping) if mapping else ({}, {})
+    os.makedirs(upload_folder, exist_ok=True)
+
+    # Extract members to the structure folder; workers parse from disk
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    extracted = []
+    skipped = []
+    seen = set()
+    for name, data in iter_archive_members(archive_path):
+        if data is None:
+            skipped.append({'file': name, 'status': 'error', 'message': 'File too large'})
+            continue
+        # Members may already be compressed (e.g. pdb1abc.ent.gz from the PDB archive);
+        # their decompressed size is capped as well, so a gzip bomb is rejected
+        try:
+            data = decompress_bytes(data, max_size=MAX_MEMBER_BYTES)
+        except ValueError:
+            skipped.append({'file': name, 'status': 'error', 'message': 'File too large when decompressed'})
+            continue
+        except Exception as e:
+            skipped.append({'file': name, 'status': 'error', 'message': f"Decompression error: {e}"})
+            continue
+        filename = clean_filename(original_filename(name))
+        while filename in seen:
+            filename = f"_{filename}"
+        seen.add(filename)
+        filepath = write_structure_file(os.path.join(upload_folder, f"{timestamp}_{filename}"), data)
+        extracted.append((filepath, name))
+
+    reporter.set_total(len(extracted) + len(skipped))
+    if skipped:
+        reporter.add_items(skipped)
+    if not extracted:
+        reporter.set_summary({'inserted': 0, 'updated': 0, 'failed': len(skipped)})
+        return
+
+    # Parse in parallel, reporting each file as it is parsed; the results
+    # are written to the DB in bulk afterwards
+    results = []
+    with ProcessPoolExecutor(max_workers=INGEST_WORKERS) as pool:
+        futures = [pool.submit(parse_structure_file, filepath, name) for filepath, name in extracted]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            reporter.add_items([_item(result)])
+
+    parsed = [result for result in results if result['status'] == 'parsed']
+
+    session = get_session()
+    try:
+        _resolve_targets(session, parsed, by_file, by_pdb_id)
+
+        matched = [result for result in parsed if result['target_id'] is not None]
+        for result in parsed:
+            if result['target_id'] is None:
+                result['status'] = 'unmatched'
+                result['message'] = 'No target found for this file'
+
+        # Existing rows for the same (target, PDB ID) get the file instead of a duplicate
+        existing = {}
+        if matched:
+            rows = session.query(
+                Structure.id, Structure.target_id, func.upper(Structure.pdb_id),
+                Structure.file_path, Structure.resolution
+            ).filter(
+                Structure.target_id.in_({result['target_id'] for result in matched}),
+                func.upper(Structure.pdb_id).in_({result['pdb_id'] for result in matched if result['pdb_id']})
+            ).all()
+            existing = {(target_id, pdb_id): (structure_id, file_path, resolution)
+                        for structure_id, target_id, pdb_id, file_path, resolution in rows}
+
+        inserts = []
+        updates = []
+        claimed = set()
+        for result in matched:
+            key = (result['target_id'], result['pdb_id'])
+            structure_id, file_path, resolution = existing.get(key, (None, None, None))
+            if result['pdb_id'] and key in claimed:
+                # Another file of this archive already provides this structure
+                result['status'] = 'duplicate'
+                result['message'] = f"Structure {result['pdb_id']} appears more than once in the archive for this target"
+                continue
+            claimed.add(key)
+            if structure_id is None:
+                inserts.append(result)
+                result['status'] = 'inserted'
+            elif not file_path:
+                updates.append({
+                    'id': structure_id,
+                    'file_path': result['file_path'],
+                    'resolution': resolution if resolution is not None else result['resolution']
+                })
+                result['status'] = 'updated'
+            else:
+                result['status'] = 'duplicate'
+                result['message'] = f"Structure {result['pdb_id']} already has a file for this target"
+
+        if inserts:
+            session.execute(insert(Structure), [
+                {
+                    'target_id': result['target_id'],
+                    'pdb_id': result['pdb_id'],
+                    'resolution': result['resolution'],
+                    'file_path': result['file_path'],
+                    'description': result['description']
+                }
+                for result in inserts
+            ])
+        if updates:
+            session.execute(update(Structure), updates)
+        session.commit()
+
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    # Files that were not registered don't need to be kept
+    for result in results:
+        if result['status'] in ('error', 'unmatched', 'duplicate') and os.path.exists(result['file_path']):
+            os.remove(result['file_path'])
+
+    # Replace the 'parsed' statuses with the outcome of the DB write
+    reporter.set_items(skipped + [_item(result) for result in results])
+    reporter.set_summary({
+        'inserted': len(inserts),
+        'updated': len(updates),
+        'failed': sum(1 for result in results if result['status'] in ('error', 'unmatched', 'duplicate')) + len(skipped)
+    })
@@ -0,0 +1,309 @@
+# services/structure_parser.py
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.services.structure_storage import read_structure_file
+
+# Parsed structures are cached on disk by content hash so that every worker
+# (and every restart) can skip re-parsing files it has already seen
+STRUCTURE_CACHE_DIR = os.getenv("STRUCTURE_CACHE_DIR", os.path.join("uploads", "cache", "structures"))
+STRUCTURE_MEMORY_CACHE_SIZE = int(os.getenv("STRUCTURE_MEMORY_CACHE_SIZE", "32"))
+
+# Bump when the array layout below changes so stale cache files are ignored
+PARSER_VERSION = 1
+
+ARRAY_FIELDS = (
+    "serials", "atom_names", "residue_names", "chain_ids", "residue_seqs",
+    "insertion_codes", "elements", "coords", "hetatm", "bonds"
+)
+
+
+class ParsedStructure:
+    """
+    Column-oriented representation of a PDB file.
+
+    Every per-atom field is a NumPy array of length ``n_atoms`` so that
+    downstream analyses (superposition, contact maps, ...) can work on whole
+    structures at once instead of looping over atom dicts.
+    """
+    def __init__(self, serials, atom_names, residue_names, chain_ids, residue_seqs,
+                 insertion_codes, elements, coords, hetatm, bonds, content_hash=None):
+        self.serials = serials
+        self.atom_names = atom_names
+        self.residue_names = residue_names
+        self.chain_ids = chain_ids
+        self.residue_seqs = residue_seqs
+        self.insertion_codes = insertion_codes
+        self.elements = elements
+        self.coords = coords
+        self.hetatm = hetatm
+        self.bonds = bonds
+        self.content_hash = content_hash
+
+    @property
+    def n_atoms(self):
+        return len(self.serials)
+
+    def arrays(self):
+        """Return the per-structure arrays as a dict (used for .npz storage)."""
+        return {field: getattr(self, field) for field in ARRAY_FIELDS}
+
+
+def content_hash(data):
+    """Return the SHA-1 hex digest of raw file contents."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def read_structure_bytes(filepath):
+    """
+    Read the raw bytes of a structure file.
+
+    Compressed files (gzip/zstd) are decompressed transparently, so the
+    content hash - and with it every cache entry - is the same as for the
+    uncompressed file.
+    """
+    return read_structure_file(filepath)
+
+
+def _column(records, start, end):
+    """Slice a fixed-width PDB column out of every record at once."""
+    return records.view("S1").reshape(len(records), -1)[:, start:end].copy().view(f"S{end - start}").ravel()
+
+
+def parse_pdb_text(data, content_hash=None):
+    """
+    Parse PDB-formatted text into a :class:`ParsedStructure`.
+
+    Only the first model of multi-model files is read. Fixed-width columns
+    are sliced and converted for all ATOM/HETATM records in one pass.
+
+    Args:
+        data: PDB file contents as bytes or str
+        content_hash: Optional content hash to attach to the result
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8', errors='replace')
+
+    atom_lines = []
+    conect_lines = []
+    for line in data.splitlines():
+        record = line[:6]
+        if record == b'ATOM  ' or record == b'HETATM':
+            atom_lines.append(line)
+        elif record == b'CONECT':
+            conect_lines.append(line)
+        elif record == b'ENDMDL':
+            break
+
+    if not atom_lines:
+        return ParsedStructure(
+            serials=np.zeros(0, dtype=np.int32),
+            atom_names=np.zeros(0, dtype='U4'),
+            residue_names=np.zeros(0, dtype='U3'),
+            chain_ids=np.zeros(0, dtype='U1'),
+            residue_seqs=np.zeros(0, dtype=np.int32),
+            insertion_codes=np.zeros(0, dtype='U1'),
+            elements=np.zeros(0, dtype='U2'),
+            coords=np.zeros((0, 3), dtype=np.float32),
+            hetatm=np.zeros(0, dtype=bool),
+            bonds=np.zeros((0, 2), dtype=np.int32),
+            content_hash=content_hash
+        )
+
+    # Fixed-width byte records, padded to the full 80 columns
+    records = np.array([line.ljust(80)[:80] for line in atom_lines], dtype='S80')
+
+    try:
+        serials = _column(records, 6, 11).astype(np.int32)
+    except ValueError:
+        # Very large files overflow the 5-digit serial field
+        serials = np.arange(1, len(records) + 1, dtype=np.int32)
+
+    atom_names = np.char.strip(_column(records, 12, 16)).astype('U4')
+    residue_names = np.char.strip(_column(records, 17, 20)).astype('U3')
+    chain_ids = np.char.strip(_column(records, 21, 22)).astype('U1')
+    residue_seqs = _column(records, 22, 26).astype(np.int32)
+    insertion_codes = np.char.strip(_column(records, 26, 27)).astype('U1')
+
+    coords = np.empty((len(records), 3), dtype=np.float32)
+    coords[:, 0] = _column(records, 30, 38).astype(np.float32)
+    coords[:, 1] = _column(records, 38, 46).astype(np.float32)
+    coords[:, 2] = _column(records, 46, 54).astype(np.float32)
+
+    # Element symbol (columns 77-78), falling back to the first letter of the atom name
+    elements = np.char.strip(_column(records, 76, 78)).astype('U2')
+    missing = elements == ''
+    if missing.any():
+        elements[missing] = np.char.lstrip(atom_names[missing], '0123456789').astype('U1')
+
+    hetatm = _column(records, 0, 6) == b'HETATM'
+
+    bonds = _parse_conect(conect_lines, serials)
+
+    return ParsedStructure(
+        serials=serials,
+        atom_names=atom_names,
+        residue_names=residue_names,
+        chain_ids=chain_ids,
+        residue_seqs=residue_seqs,
+        insertion_codes=insertion_codes,
+        elements=elements,
+        coords=coords,
+        hetatm=hetatm,
+        bonds=bonds,
+        content_hash=content_hash
+    )
+
+
+def _parse_conect(conect_lines, serials):
+    """Convert CONECT records into an (n_bonds, 2) array of atom indices."""
+    pairs = []
+    for line in conect_lines:
+        fields = line.split()
+        if len(fields) > 2:
+            try:
+                atom1 = int(fields[1])
+                for field in fields[2:]:
+                    atom2 = int(field)
+                    if atom1 < atom2:
+                        pairs.append((atom1, atom2))
+            except ValueError:
+                continue
+
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int32)
+
+    pairs = np.array(pairs, dtype=np.int32)
+    order = np.argsort(serials, kind='stable')
+    positions = np.searchsorted(serials, pairs, sorter=order)
+    positions = np.clip(positions, 0, len(serials) - 1)
+    indices = order[positions]
+    valid = (serials[indices] == pairs).all(axis=1)
+    return np.unique(indices[valid].astype(np.int32), axis=0)
+
+
+class _StructureCache:
+    """Small thread-safe LRU of parsed structures keyed by content hash."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_memory_cache = _StructureCache(STRUCTURE_MEMORY_CACHE_SIZE)
+# (path, mtime, size) -> content hash, so cache hits skip reading and
+# decompressing the file altogether
+_path_hashes = _StructureCache(1024)
+
+
+def cache_path(digest, suffix="npz", cache_dir=None):
+    """Return the on-disk cache location for a content hash."""
+    cache_dir = cache_dir or STRUCTURE_CACHE_DIR
+    return os.path.join(cache_dir, digest[:2], f"{digest}.v{PARSER_VERSION}.{suffix}")
+
+
+def _load_cached(digest, cache_dir=None):
+    path = cache_path(digest, cache_dir=cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as arrays:
+            return ParsedStructure(content_hash=digest, **{field: arrays[field] for field in ARRAY_FIELDS})
+    except Exception as e:
+        print(f"Error reading structure cache {path}: {e}")
+        return None
+
+
+def _store_cached(parsed, cache_dir=None):
+    path = cache_path(parsed.content_hash, cache_dir=cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **parsed.arrays())
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing structure cache {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_structure(filepath, cache_dir=None):
+    """
+    Load a structure file, using the in-memory and on-disk parse caches.
+
+    Args:
+        filepath: Path to a PDB file (optionally gzip/zstd compressed)
+        cache_dir: Optional override of the on-disk cache directory
+
+    Returns:
+        A :class:`ParsedStructure` with ``content_hash`` set
+    """
+    stat = os.stat(filepath)
+    path_key = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+    digest = _path_hashes.get(path_key)
+    if digest is not None:
+        parsed = _memory_cache.get(digest)
+        if parsed is None:
+            parsed = _load_cached(digest, cache_dir=cache_dir)
+        if parsed is not None:
+            _memory_cache.put(digest, parsed)
+            return parsed
+
+    parsed = load_structure_bytes(read_structure_bytes(filepath), cache_dir=cache_dir)
+    _path_hashes.put(path_key, parsed.content_hash)
+    return parsed
+
+
+def load_structure_bytes(data, cache_dir=None):
+    """Parse raw structure bytes through the same caches as :func:`load_structure`."""
+    digest = content_hash(data)
+
+    parsed = _memory_cache.get(digest)
+    if parsed is not None:
+        return parsed
+
+    parsed = _load_cached(digest, cache_dir=cache_dir)
+    if parsed is None:
+        parsed = parse_pdb_text(data, content_hash=digest)
+        _store_cached(parsed, cache_dir=cache_dir)
+
+    _memory_cache.put(digest, parsed)
+    return parsed
+
+
+def residue_indices(parsed):
+    """Return a 0-based running residue index for every atom."""
+    if parsed.n_atoms == 0:
+        return np.zeros(0, dtype=np.int32)
+    changed = np.ones(parsed.n_atoms, dtype=bool)
+    changed[1:] = (
+        (parsed.residue_seqs[1:] != parsed.residue_seqs[:-1])
+        | (parsed.chain_ids[1:] != parsed.chain_ids[:-1])
+        | (parsed.insertion_codes[1:] != parsed.insertion_codes[:-1])
+    )
+    return (np.cumsum(changed) - 1).astype(np.int32)
@@ -0,0 +1,131 @@
+# services/structure_storage.py
+
+import io
+import os
+import gzip
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+# Codec used for newly stored structure files: 'zstd', 'gzip' or 'none'.
+# 'zstd' falls back to gzip when the zstandard package is not installed.
+STRUCTURE_COMPRESSION = os.getenv("STRUCTURE_COMPRESSION", "gzip").lower()
+STRUCTURE_COMPRESSION_LEVEL = os.getenv("STRUCTURE_COMPRESSION_LEVEL")
+
+CODEC_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}
+# Default levels favour decompression speed; both decode far faster than parsing
+DEFAULT_LEVELS = {'gzip': 6, 'zstd': 10}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def available_codec(codec=None):
+    """Resolve the configured codec to one usable in this environment."""
+    codec = (codec or STRUCTURE_COMPRESSION).lower()
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"Unknown structure compression codec: {codec}")
+    if codec == 'zstd' and zstandard is None:
+        return 'gzip'
+    return codec
+
+
+def detect_codec(data):
+    """Identify the compression of stored bytes from their magic number."""
+    if data[:2] == _GZIP_MAGIC:
+        return 'gzip'
+    if data[:4] == _ZSTD_MAGIC:
+        return 'zstd'
+    return 'none'
+
+
+def compress_bytes(data, codec=None, level=None):
+    """Compress raw structure bytes with the given (or configured) codec."""
+    codec = available_codec(codec)
+    if level is None:
+        level = int(STRUCTURE_COMPRESSION_LEVEL) if STRUCTURE_COMPRESSION_LEVEL else DEFAULT_LEVELS.get(codec)
+
+    if codec == 'gzip':
+        # mtime=0 keeps the output deterministic for identical input
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return data
+
+
+def decompress_bytes(data, max_size=None):
+    """
+    Return the raw contents of stored structure bytes, whatever their codec.
+
+    Args:
+        data: Stored (possibly compressed) bytes
+        max_size: Optional limit on the decompressed size in bytes; at most
+            one byte more than this is ever decompressed
+
+    Raises:
+        ValueError: If the contents are larger than max_size
+    """
+    codec = detect_codec(data)
+    if codec == 'zstd' and zstandard is None:
+        raise RuntimeError("This structure file is zstd-compressed; install the 'zstandard' package")
+
+    if max_size is None:
+        if codec == 'gzip':
+            return gzip.decompress(data)
+        if codec == 'zstd':
+            return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        return data
+
+    if codec == 'gzip':
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+            data = f.read(max_size + 1)
+    elif codec == 'zstd':
+        with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as f:
+            data = f.read(max_size + 1)
+    if len(data) > max_size:
+        raise ValueError(f"Contents exceed {max_size} bytes")
+    return data
+
+
+def stored_path(filepath, codec=None):
+    """Path a structure file is stored under for a codec (adds .gz/.zst)."""
+    return filepath + CODEC_SUFFIXES[available_codec(codec)]
+
+
+def original_filename(filepath):
+    """Filename of a stored structure without its compression suffix."""
+    filename = os.path.basename(filepath)
+    for suffix in CODEC_SUFFIXES.values():
+        if suffix and filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+
+def write_structure_file(filepath, data, codec=None):
+    """
+    Store raw structure bytes, compressed with the configured codec.
+
+    Args:
+        filepath: Uncompressed target path (e.g. uploads/structures/x.pdb)
+        data: Raw structure file contents
+        codec: Optional codec override
+
+    Returns:
+        The path actually written (with the codec suffix), to be saved in
+        ``Structure.file_path``
+    """
+    codec = available_codec(codec)
+    path = stored_path(filepath, codec)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(compress_bytes(data, codec))
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_structure_file(filepath):
+    """Read a stored structure file and return its raw (decompressed) contents."""
+    with open(filepath, 'rb') as f:
+        return decompress_bytes(f.read())
@@ -0,0 +1,160 @@
+# services/substructure_search.py
+
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from rdkit import Chem, RDLogger
+
+from app.services.fingerprint_store import get_store
+from app.services.fingerprints import pattern_fingerprint
+
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", str(os.cpu_count() or 1)))
+# Candidates verified in-process below this count; above it across the pool
+PARALLEL_VERIFY_THRESHOLD = 2000
+# Candidates are verified in rounds of this size until max_results matches are found
+VERIFY_ROUND_SIZE = 20000
+SCREEN_BLOCK_ROWS = 65536
+DEFAULT_MAX_RESULTS = 200
+
+# Tokens that only make sense in SMARTS; such queries are not tried as SMILES
+_SMARTS_TOKENS = ("[#", "~", ";", ",", "&", "!", "$", "*")
+
+
+def parse_query(query):
+    """
+    Parse a substructure query given as SMILES or SMARTS.
+
+    Plain SMILES are parsed as SMILES so that Kekulé input is aromatised;
+    queries using SMARTS-only syntax are parsed as SMARTS.
+
+    Returns:
+        (query mol, is_smarts) or (None, None) if neither parses
+    """
+    query = (query or "").strip()
+    if not query:
+        return None, None
+    if not any(token in query for token in _SMARTS_TOKENS):
+        mol = Chem.MolFromSmiles(query)
+        if mol is not None:
+            return mol, False
+    mol = Chem.MolFromSmarts(query)
+    if mol is not None:
+        return mol, True
+    return None, None
+
+
+def screen(fps, query_fp):
+    """
+    Rows whose fingerprint contains every bit of the query fingerprint.
+
+    Runs blockwise so the temporaries stay small for large matrices.
+    """
+    hits = []
+    for start in range(0, len(fps), SCREEN_BLOCK_ROWS):
+        block = fps[start:start + SCREEN_BLOCK_ROWS]
+        mask = ((block & query_fp) == query_fp).all(axis=1)
+        hits.append(np.flatnonzero(mask) + start)
+    return np.concatenate(hits) if hits else np.zeros(0, dtype=np.int64)
+
+
+def _verify_batch(query, is_smarts, candidates):
+    """Return the IDs of (compound ID, smiles) candidates matching the query (runs in a worker)."""
+    RDLogger.DisableLog("rdApp.*")
+    pattern = Chem.MolFromSmarts(query) if is_smarts else Chem.MolFromSmiles(query)
+    matches = []
+    for compound_id, smiles in candidates:
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is not None and mol.HasSubstructMatch(pattern):
+            matches.append(compound_id)
+    return matches
+
+
+_verify_pool = None
+_verify_pool_lock = threading.Lock()
+
+
+def _get_verify_pool():
+    global _verify_pool
+    with _verify_pool_lock:
+        if _verify_pool is None:
+            _verify_pool = ProcessPoolExecutor(max_workers=SEARCH_WORKERS)
+        return _verify_pool
+
+
+def verify(query, is_smarts, candidates):
+    """Run full substructure matching on screened candidates, in parallel for many."""
+    if len(candidates) < PARALLEL_VERIFY_THRESHOLD or SEARCH_WORKERS < 2:
+        return _verify_batch(query, is_smarts, candidates)
+
+    chunk = -(-len(candidates) // (SEARCH_WORKERS * 4))
+    batches = [candidates[i:i + chunk] for i in range(0, len(candidates), chunk)]
+    pool = _get_verify_pool()
+    matches = []
+    for batch_matches in pool.map(_verify_batch, [query] * len(batches), [is_smarts] * len(batches), batches):
+        matches.extend(batch_matches)
+    return matches
+
+
+def substructure_search(session, query, max_results=DEFAULT_MAX_RESULTS, count_all=False):
+    """
+    Find compounds containing a SMILES/SMARTS substructure.
+
+    Pattern fingerprints screen out compounds that cannot match with a
+    vectorized bitwise AND; only the survivors are verified with
+    HasSubstructMatch. Verification stops once ``max_results`` matches are
+    found unless ``count_all`` is set.
+
+    Args:
+        session: Database session
+        query: SMILES or SMARTS pattern
+        max_results: Maximum number of compound IDs returned
+        count_all: Verify every candidate to get the exact match count
+
+    Returns:
+        Dict with 'ids' (matching compound IDs in ID order, at most
+        max_results), 'n_matches', 'complete' (False if verification stopped
+        early, making n_matches a lower bound), 'n_candidates', 'n_searched'
+        and 'elapsed' seconds
+
+    Raises:
+        ValueError: If the query is neither valid SMILES nor SMARTS
+    """
+    start = time.perf_counter()
+    query_mol, is_smarts = parse_query(query)
+    if query_mol is None:
+        raise ValueError(f"Invalid SMILES/SMARTS query: {query}")
+
+    segments = get_store("pattern", session).snapshot()
+    query_fp = pattern_fingerprint(query_mol)
+
+    candidates = []
+    for segment, alive in segments:
+        positions = screen(segment.fps, query_fp)
+        if alive is not None:
+            positions = positions[alive[positions]]
+        candidates.append((segment, positions))
+    n_candidates = sum(len(positions) for _, positions in candidates)
+
+    matches = []
+    verified = 0
+    for segment, positions in candidates:
+        for round_start in range(0, len(positions), VERIFY_ROUND_SIZE):
+            if not count_all and len(matches) >= max_results:
+                break
+            batch = positions[round_start:round_start + VERIFY_ROUND_SIZE]
+            rows = list(zip(segment.ids[batch].tolist(), segment.smiles.take(batch)))
+            matches.extend(verify(query.strip(), is_smarts, rows))
+            verified += len(batch)
+
+    matches = sorted(matches)
+    return {
+        "ids": matches[:max_results],
+        "n_matches": len(matches),
+        "complete": verified == n_candidates,
+        "n_candidates": n_candidates,
+        "n_searched": sum(len(segment) if alive is None else int(alive.sum()) for segment, alive in segments),
+        "elapsed": time.perf_counter() - start
+    }
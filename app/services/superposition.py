@@ -0,0 +1,348 @@
+# services/superposition.py
+
+import os
+import hashlib
+
+import numpy as np
+
+from app.services.structure_parser import STRUCTURE_CACHE_DIR, ParsedStructure, _StructureCache, load_structure
+
+# Minimum number of matched C-alpha atoms for a meaningful superposition
+MIN_MATCHED_ATOMS = 3
+# Structure pairs superposed per batch in rmsd_matrix (bounds the gathered coordinate copies)
+RMSD_PAIR_CHUNK = 2048
+# RMSD matrices kept in memory per worker (the disk cache holds the rest)
+RMSD_MEMORY_CACHE_SIZE = int(os.getenv("RMSD_MEMORY_CACHE_SIZE", "16"))
+# Bumped when the cached arrays change
+RMSD_CACHE_VERSION = 2
+
+
+def ca_residue_keys(parsed):
+    """
+    Return the C-alpha atom indices of a structure and their residue keys.
+
+    Residues are identified by ``(chain, residue number, insertion code)``.
+    Only the first C-alpha of each residue is used, so alternate locations
+    don't produce duplicate keys.
+    """
+    mask = (parsed.atom_names == 'CA') & ~parsed.hetatm
+    indices = np.flatnonzero(mask)
+    keys = np.char.add(
+        np.char.add(parsed.chain_ids[indices], ':'),
+        np.char.add(parsed.residue_seqs[indices].astype('U6'), parsed.insertion_codes[indices])
+    )
+    keys, first = np.unique(keys, return_index=True)
+    return indices[first], keys
+
+
+def match_ca_coords(structures):
+    """
+    Collect the C-alpha coordinates shared by every structure.
+
+    Args:
+        structures: List of :class:`ParsedStructure`
+
+    Returns:
+        (coords, keys) where ``coords`` has shape (n_structures, n_matched, 3)
+        and ``keys`` lists the matched residue keys
+    """
+    per_structure = [ca_residue_keys(parsed) for parsed in structures]
+
+    common = per_structure[0][1]
+    for _, keys in per_structure[1:]:
+        common = np.intersect1d(common, keys, assume_unique=True)
+
+    coords = np.empty((len(structures), len(common), 3), dtype=np.float64)
+    for i, (parsed, (indices, keys)) in enumerate(zip(structures, per_structure)):
+        # keys are sorted by np.unique, so the common keys can be located directly
+        positions = np.searchsorted(keys, common)
+        coords[i] = parsed.coords[indices[positions]]
+
+    return coords, common
+
+
+def union_ca_coords(structures):
+    """
+    Collect the C-alpha coordinates of every structure on the union of their residues.
+
+    Args:
+        structures: List of :class:`ParsedStructure`
+
+    Returns:
+        (coords, mask, keys) where ``coords`` has shape (n_structures, n_keys, 3)
+        (zeros for missing residues), ``mask`` (n_structures, n_keys) marks
+        the residues each structure has and ``keys`` lists the residue keys
+    """
+    per_structure = [ca_residue_keys(parsed) for parsed in structures]
+    keys = np.unique(np.concatenate([keys for _, keys in per_structure]))
+
+    coords = np.zeros((len(structures), len(keys), 3), dtype=np.float64)
+    mask = np.zeros((len(structures), len(keys)), dtype=bool)
+    for i, (parsed, (indices, structure_keys)) in enumerate(zip(structures, per_structure)):
+        positions = np.searchsorted(keys, structure_keys)
+        coords[i, positions] = parsed.coords[indices]
+        mask[i, positions] = True
+    return coords, mask, keys
+
+
+def kabsch_batch(mobile, reference, weights=None):
+    """
+    Optimal rigid-body superposition for a batch of coordinate pairs.
+
+    Args:
+        mobile: Array of shape (batch, n_atoms, 3)
+        reference: Array of shape (batch, n_atoms, 3)
+        weights: Optional 0/1 array of shape (batch, n_atoms) selecting the
+            atoms each pair is superposed on
+
+    Returns:
+        (rotations, translations, rmsd) with shapes (batch, 3, 3), (batch, 3)
+        and (batch,). ``mobile @ R + t`` is superposed onto ``reference``.
+    """
+    mobile = np.asarray(mobile, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    if weights is None:
+        n_atoms = np.full(len(mobile), mobile.shape[1], dtype=np.float64)
+        w = 1.0
+    else:
+        weights = np.asarray(weights, dtype=np.float64)
+        n_atoms = np.maximum(weights.sum(axis=1), 1.0)
+        w = weights[:, :, None]
+
+    mobile_center = (mobile * w).sum(axis=1, keepdims=True) / n_atoms[:, None, None]
+    reference_center = (reference * w).sum(axis=1, keepdims=True) / n_atoms[:, None, None]
+    P = (mobile - mobile_center) * w
+    Q = (reference - reference_center) * w
+
+    # Covariance matrices for the whole batch, then one batched SVD
+    H = np.einsum('bni,bnj->bij', P, Q)
+    U, S, Vt = np.linalg.svd(H)
+
+    # Correct improper rotations (reflections)
+    d = np.sign(np.linalg.det(U @ Vt))
+    d[d == 0] = 1.0
+    U[:, :, 2] *= d[:, None]
+    S[:, 2] *= d
+
+    rotations = U @ Vt
+    translations = reference_center[:, 0, :] - np.einsum('bi,bij->bj', mobile_center[:, 0, :], rotations)
+
+    # RMSD from the singular values avoids applying the rotation explicitly
+    msd = (np.einsum('bni,bni->b', P, P) + np.einsum('bni,bni->b', Q, Q) - 2.0 * S.sum(axis=1)) / n_atoms
+    rmsd = np.sqrt(np.clip(msd, 0.0, None))
+
+    return rotations, translations, rmsd
+
+
+def rmsd_matrix(coords, mask=None):
+    """
+    All-vs-all C-alpha RMSD after optimal superposition.
+
+    Each pair is superposed on the residues both structures have, so a
+    fragment or construct only shortens its own pairs.
+
+    Args:
+        coords: Array of shape (n_structures, n_atoms, 3)
+        mask: Optional (n_structures, n_atoms) bool array of the atoms each
+            structure has (all atoms if None)
+
+    Returns:
+        (matrix, n_matched): the symmetric (n_structures, n_structures)
+        RMSD matrix, NaN for pairs sharing fewer than MIN_MATCHED_ATOMS
+        atoms, and the number of atoms each pair was superposed on
+    """
+    n_structures = len(coords)
+    if mask is None:
+        mask = np.ones(coords.shape[:2], dtype=bool)
+    matrix = np.zeros((n_structures, n_structures), dtype=np.float64)
+    n_matched = np.diag(mask.sum(axis=1)).astype(np.int64)
+    if n_structures < 2:
+        return matrix, n_matched
+
+    # Pairs are superposed in fixed-size chunks so memory doesn't grow with n_structures^2
+    i, j = np.triu_indices(n_structures, k=1)
+    for start in range(0, len(i), RMSD_PAIR_CHUNK):
+        chunk_i, chunk_j = i[start:start + RMSD_PAIR_CHUNK], j[start:start + RMSD_PAIR_CHUNK]
+        shared = mask[chunk_i] & mask[chunk_j]
+        counts = shared.sum(axis=1)
+        _, _, rmsd = kabsch_batch(coords[chunk_i], coords[chunk_j], shared)
+        rmsd[counts < MIN_MATCHED_ATOMS] = np.nan
+        matrix[chunk_i, chunk_j] = matrix[chunk_j, chunk_i] = rmsd
+        n_matched[chunk_i, chunk_j] = n_matched[chunk_j, chunk_i] = counts
+    return matrix, n_matched
+
+
+def superpose_structure(mobile, reference):
+    """
+    Superpose every atom of ``mobile`` onto ``reference`` using matched C-alphas.
+
+    Returns:
+        (coords, rmsd, n_matched) where ``coords`` are the transformed
+        coordinates of all atoms in ``mobile``
+    """
+    matched, keys = match_ca_coords([mobile, reference])
+    if len(keys) < MIN_MATCHED_ATOMS:
+        raise ValueError(f"Only {len(keys)} matching C-alpha atoms; cannot superpose")
+
+    rotations, translations, rmsd = kabsch_batch(matched[:1], matched[1:])
+    coords = mobile.coords.astype(np.float64) @ rotations[0] + translations[0]
+    return coords.astype(np.float32), float(rmsd[0]), len(keys)
+
+
+def overlay_structure(reference, mobile):
+    """
+    Superpose ``mobile`` onto ``reference`` and merge both into one structure.
+
+    Mobile chains are suffixed with ``'`` so the two copies are drawn as
+    separate cartoons.
+
+    Returns:
+        (merged, model, rmsd, n_matched) where ``merged`` is a
+        ParsedStructure and ``model`` is 0 for reference atoms and 1 for
+        mobile atoms
+    """
+    coords, rmsd, n_matched = superpose_structure(mobile, reference)
+
+    merged = ParsedStructure(
+        serials=np.concatenate([reference.serials, mobile.serials]),
+        atom_names=np.concatenate([reference.atom_names, mobile.atom_names]),
+        residue_names=np.concatenate([reference.residue_names, mobile.residue_names]),
+        chain_ids=np.concatenate([reference.chain_ids.astype('U2'), np.char.add(mobile.chain_ids, "'")]),
+        residue_seqs=np.concatenate([reference.residue_seqs, mobile.residue_seqs]),
+        insertion_codes=np.concatenate([reference.insertion_codes, mobile.insertion_codes]),
+        elements=np.concatenate([reference.elements, mobile.elements]),
+        coords=np.concatenate([reference.coords, coords]),
+        hetatm=np.concatenate([reference.hetatm, mobile.hetatm]),
+        bonds=np.concatenate([reference.bonds, mobile.bonds + reference.n_atoms]),
+        content_hash=hashlib.sha1(f"{reference.content_hash}:{mobile.content_hash}".encode()).hexdigest()
+    )
+    model = np.concatenate([
+        np.zeros(reference.n_atoms, dtype=np.uint8),
+        np.ones(mobile.n_atoms, dtype=np.uint8)
+    ])
+    return merged, model, rmsd, n_matched
+
+
+class RMSDCache:
+    """
+    Memory and disk cache of RMSD matrices.
+
+    Entries are keyed by the content hashes of the compared structures, so a
+    matrix is reused until one of the underlying files changes. The memory
+    cache is an LRU of RMSD_MEMORY_CACHE_SIZE matrices.
+    """
+    def __init__(self, cache_dir=None, maxsize=None):
+        self.cache_dir = cache_dir or os.path.join(STRUCTURE_CACHE_DIR, "rmsd")
+        self._items = _StructureCache(maxsize or RMSD_MEMORY_CACHE_SIZE)
+
+    @staticmethod
+    def key(content_hashes):
+        return hashlib.sha1("|".join([f"v{RMSD_CACHE_VERSION}"] + list(content_hashes)).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is not None:
+            return item
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                result = (data["matrix"], data["n_matched"])
+        except Exception as e:
+            print(f"Error reading RMSD cache {path}: {e}")
+            return None
+
+        self._items.put(key, result)
+        return result
+
+    def put(self, key, matrix, n_matched):
+        self._items.put(key, (matrix, n_matched))
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, matrix=matrix, n_matched=n_matched)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            print(f"Error writing RMSD cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+rmsd_cache = RMSDCache()
+
+
+def compare_structures(structure_rows):
+    """
+    Compute (or fetch from cache) the RMSD matrix for a set of Structure rows.
+
+    Each pair is superposed on the C-alpha atoms the two structures share.
+    Structures without a file or with fewer than MIN_MATCHED_ATOMS C-alpha
+    atoms are left out and listed in ``skipped``.
+
+    Args:
+        structure_rows: Iterable of Structure model instances with a file_path
+
+    Returns:
+        Dict with ``structure_ids``, ``labels`` (unique), ``matrix`` (nested lists,
+        None for pairs sharing too few C-alpha atoms), ``n_matched`` (matched
+        C-alpha atoms per pair) and ``skipped`` (labels with the reason)
+    """
+    rows = []
+    parsed = []
+    skipped = []
+    for structure in sorted(structure_rows, key=lambda s: s.id):
+        label = structure.pdb_id or f"#{structure.id}"
+        if not structure.file_path or not os.path.exists(structure.file_path):
+            skipped.append(f"{label} (no file)")
+            continue
+        structure_parsed = load_structure(structure.file_path)
+        if len(ca_residue_keys(structure_parsed)[1]) < MIN_MATCHED_ATOMS:
+            skipped.append(f"{label} (too few C-alpha atoms)")
+            continue
+        rows.append(structure)
+        parsed.append(structure_parsed)
+
+    # Labels are heatmap categories, so repeated PDB IDs get the structure ID to keep them apart
+    pdb_id_counts = {}
+    for structure in rows:
+        pdb_id_counts[structure.pdb_id] = pdb_id_counts.get(structure.pdb_id, 0) + 1
+    labels = [
+        structure.pdb_id if structure.pdb_id and pdb_id_counts[structure.pdb_id] == 1
+        else f"{structure.pdb_id or ''} #{structure.id}".strip()
+        for structure in rows
+    ]
+
+    result = {
+        'structure_ids': [structure.id for structure in rows],
+        'labels': labels,
+        'matrix': [],
+        'n_matched': [],
+        'skipped': skipped
+    }
+
+    if len(parsed) < 2:
+        return result
+
+    key = rmsd_cache.key([p.content_hash for p in parsed])
+    cached = rmsd_cache.get(key)
+    if cached is None:
+        coords, mask, _ = union_ca_coords(parsed)
+        matrix, n_matched = rmsd_matrix(coords, mask)
+        rmsd_cache.put(key, matrix, n_matched)
+    else:
+        matrix, n_matched = cached
+
+    result['matrix'] = [
+        [None if np.isnan(value) else value for value in row]
+        for row in np.round(matrix, 3).tolist()
+    ]
+    result['n_matched'] = n_matched.tolist()
+    return result
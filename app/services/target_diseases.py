@@ -0,0 +1,94 @@
+# services/target_diseases.py
+
+from sqlalchemy import delete, insert, select
+
+from app.models.diseases import Disease, TargetDiseaseRelation
+from app.models.targets import Target
+
+RELATIONSHIP_TYPES = ("primary", "secondary", "exploratory")
+EVIDENCE_LEVELS = ("strong", "moderate", "hypothetical")
+
+
+def set_target_diseases(session, target_id, disease_ids, relationship_type="primary", evidence_level="moderate"):
+    """
+    Make the diseases of a target exactly ``disease_ids``.
+
+    Only the difference is written: one DELETE for pairs that were removed
+    and one multi-row INSERT for new pairs, which get the given
+    relationship type and evidence level. Kept pairs are left as they are.
+
+    The target row is locked first (SELECT ... FOR UPDATE where the
+    database supports it), so concurrent edits of the same target are
+    applied one after the other, each diffed against the other's result;
+    the unique index on (target_id, disease_id) rejects duplicates in any
+    case.
+
+    Args:
+        session: Database session (committed by the caller)
+        target_id: Target ID
+        disease_ids: IDs of the diseases the target should be related to
+        relationship_type: One of RELATIONSHIP_TYPES, for new pairs
+        evidence_level: One of EVIDENCE_LEVELS, for new pairs
+
+    Returns:
+        (added, removed) disease ID lists
+
+    Raises:
+        ValueError: If the target, a disease, the relationship type or the
+            evidence level is unknown
+    """
+    if relationship_type not in RELATIONSHIP_TYPES:
+        raise ValueError(f"Unknown relationship type '{relationship_type}'")
+    if evidence_level not in EVIDENCE_LEVELS:
+        raise ValueError(f"Unknown evidence level '{evidence_level}'")
+
+    if session.execute(select(Target.id).where(Target.id == target_id).with_for_update()).first() is None:
+        raise ValueError("Target not found")
+
+    wanted = {int(disease_id) for disease_id in disease_ids or []}
+    known = set(session.scalars(select(Disease.id).where(Disease.id.in_(wanted))))
+    if wanted - known:
+        raise ValueError(f"Unknown disease IDs: {', '.join(map(str, sorted(wanted - known)))}")
+
+    current = set(session.scalars(
+        select(TargetDiseaseRelation.disease_id).where(TargetDiseaseRelation.target_id == target_id)
+    ))
+    added = sorted(wanted - current)
+    removed = sorted(current - wanted)
+
+    if removed:
+        session.execute(delete(TargetDiseaseRelation).where(
+            TargetDiseaseRelation.target_id == target_id,
+            TargetDiseaseRelation.disease_id.in_(removed)
+        ))
+    if added:
+        session.execute(insert(TargetDiseaseRelation), [
+            {"target_id": target_id, "disease_id": disease_id,
+             "relationship_type": relationship_type, "evidence_level": evidence_level}
+            for disease_id in added
+        ])
+    return added, removed
+
+
+def get_target_disease_rows(session, target_id=None):
+    """
+    Target-disease relations joined with target and disease names.
+
+    Returns:
+        List of dicts with target_id, target_name, disease_id, disease_name,
+        relationship_type and evidence_level, ordered by target and disease
+    """
+    query = select(
+        Target.id, Target.name, Disease.id, Disease.name,
+        TargetDiseaseRelation.relationship_type, TargetDiseaseRelation.evidence_level
+    ).join(Target, Target.id == TargetDiseaseRelation.target_id).join(
+        Disease, Disease.id == TargetDiseaseRelation.disease_id
+    ).order_by(Target.name, Disease.name)
+    if target_id is not None:
+        query = query.where(TargetDiseaseRelation.target_id == target_id)
+
+    return [
+        {"target_id": t_id, "target_name": t_name, "disease_id": d_id, "disease_name": d_name,
+         "relationship_type": relationship_type, "evidence_level": evidence_level}
+        for t_id, t_name, d_id, d_name, relationship_type, evidence_level in session.execute(query)
+    ]
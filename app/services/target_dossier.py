@@ -0,0 +1,145 @@
+# services/target_dossier.py
+
+from sqlalchemy import JSON, func, select, type_coerce
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.compounds import Compound, CompoundActivity, TargetActivitySummary
+from app.models.diseases import Disease, TargetDiseaseRelation
+from app.models.structures import Structure
+from app.models.targets import Target
+
+TARGET_FIELDS = (
+    "id", "name", "alternative_names", "organism", "category", "validation_status", "priority",
+    "description", "mechanism", "notes", "molecular_weight", "cellular_location"
+)
+SUMMARY_FIELDS = ("compound_count", "activity_count", "assay_count", "mechanism_count", "best_pactivity")
+
+
+def _json_array(dialect_name, fields, from_clause, where):
+    """
+    Correlated scalar subquery aggregating rows into a JSON array of objects.
+
+    Args:
+        dialect_name: 'postgresql' or 'sqlite'
+        fields: Dict of JSON key -> column
+        from_clause: Table or join to aggregate over
+        where: Correlation condition
+    """
+    pairs = [part for key, column in fields.items() for part in (key, column)]
+    if dialect_name == "postgresql":
+        aggregate = func.coalesce(func.json_agg(func.json_build_object(*pairs)), func.json_build_array())
+    else:
+        aggregate = func.json_group_array(func.json_object(*pairs))
+    return type_coerce(select(aggregate).select_from(from_clause).where(where).scalar_subquery(), JSON)
+
+
+def _dossier_query(dialect_name, target_id):
+    structures = _json_array(dialect_name, {
+        "id": Structure.id,
+        "pdb_id": Structure.pdb_id,
+        "resolution": Structure.resolution,
+        "description": Structure.description
+    }, Structure, Structure.target_id == Target.id)
+
+    diseases = _json_array(dialect_name, {
+        "id": Disease.id,
+        "name": Disease.name,
+        "relationship_type": TargetDiseaseRelation.relationship_type,
+        "evidence_level": TargetDiseaseRelation.evidence_level
+    }, TargetDiseaseRelation.__table__.join(Disease.__table__), TargetDiseaseRelation.target_id == Target.id)
+
+    activities = _json_array(dialect_name, {
+        "id": CompoundActivity.id,
+        "compound_id": Compound.id,
+        "compound_name": Compound.name,
+        "activity_type": CompoundActivity.activity_type,
+        "activity_value": CompoundActivity.activity_value,
+        "activity_unit": CompoundActivity.activity_unit,
+        "pactivity": CompoundActivity.pactivity,
+        "mechanism": CompoundActivity.mechanism
+    }, CompoundActivity.__table__.join(Compound.__table__), CompoundActivity.target_id == Target.id)
+
+    return select(
+        *[getattr(Target, field) for field in TARGET_FIELDS],
+        *[getattr(TargetActivitySummary, field) for field in SUMMARY_FIELDS],
+        structures.label("structures"),
+        diseases.label("diseases"),
+        activities.label("activities")
+    ).outerjoin(TargetActivitySummary, TargetActivitySummary.target_id == Target.id).where(Target.id == target_id)
+
+
+def _load_with_relationships(session, target_id):
+    """Dossier rows through the ORM relationships, for databases without JSON aggregation."""
+    target = session.query(Target).options(
+        selectinload(Target.structures),
+        selectinload(Target.diseases).joinedload(TargetDiseaseRelation.disease),
+        selectinload(Target.compounds).joinedload(CompoundActivity.compound)
+    ).filter(Target.id == target_id).first()
+    if target is None:
+        return None
+    summary = session.get(TargetActivitySummary, target_id)
+
+    row = {field: getattr(target, field) for field in TARGET_FIELDS}
+    row.update({field: getattr(summary, field) if summary else None for field in SUMMARY_FIELDS})
+    row["structures"] = [
+        {"id": s.id, "pdb_id": s.pdb_id, "resolution": s.resolution, "description": s.description}
+        for s in target.structures
+    ]
+    row["diseases"] = [
+        {"id": r.disease.id, "name": r.disease.name,
+         "relationship_type": r.relationship_type, "evidence_level": r.evidence_level}
+        for r in target.diseases if r.disease is not None
+    ]
+    row["activities"] = [
+        {"id": a.id, "compound_id": a.compound_id, "compound_name": a.compound.name if a.compound else None,
+         "activity_type": a.activity_type, "activity_value": a.activity_value,
+         "activity_unit": a.activity_unit, "pactivity": a.pactivity, "mechanism": a.mechanism}
+        for a in target.compounds
+    ]
+    return row
+
+
+def load_target_dossier(session, target_id):
+    """
+    Load a target with everything the detail view shows.
+
+    On PostgreSQL and SQLite this is one round trip: structures, disease
+    relations (with relationship type and evidence) and activities (with
+    compound names) are aggregated into JSON arrays by correlated
+    subqueries next to the target and its activity summary row. Other
+    databases fall back to select-in loading of the relationships.
+
+    Args:
+        session: Database session
+        target_id: Target ID
+
+    Returns:
+        Dict of target fields plus 'activity_summary', 'structures'
+        (best resolution first), 'diseases' and 'activities' (most potent
+        first), as expected by create_target_details(); None if the target
+        doesn't exist
+    """
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name in ("postgresql", "sqlite"):
+        row = session.execute(_dossier_query(dialect_name, target_id)).mappings().first()
+        row = dict(row) if row is not None else None
+    else:
+        row = _load_with_relationships(session, target_id)
+    if row is None:
+        return None
+
+    dossier = {field: row[field] for field in TARGET_FIELDS}
+    dossier["activity_summary"] = {
+        field: row[field] if row[field] is not None or field == "best_pactivity" else 0
+        for field in SUMMARY_FIELDS
+    }
+    dossier["structures"] = sorted(
+        row["structures"] or [],
+        key=lambda s: (s["resolution"] is None, s["resolution"] or 0, s["id"])
+    )
+    dossier["diseases"] = sorted(row["diseases"] or [], key=lambda d: (d["name"] or "", d["id"]))
+    dossier["activities"] = sorted(
+        row["activities"] or [],
+        key=lambda a: (a["pactivity"] is None, -(a["pactivity"] or 0), a["id"])
+    )
+    return dossier
@@ -0,0 +1,172 @@
+# services/target_facets.py
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from itertools import chain
+
+from sqlalchemy import and_, case, event, func, literal, select, true, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app.models.compounds import TargetActivitySummary
+from app.models.targets import Target
+
+FACET_COLUMNS = {
+    "category": Target.category,
+    "validation_status": Target.validation_status,
+    "priority": Target.priority
+}
+# Seconds facet counts are reused; target writes in this process clear them at once
+FACET_CACHE_TTL = int(os.getenv("FACET_CACHE_TTL", "300"))
+FACET_CACHE_SIZE = 256
+PAGE_SIZE = 10
+
+
+def normalize_filters(filters):
+    """Hashable filter state: a tuple of sorted selected values per facet (empty = no filter)."""
+    filters = filters or {}
+    return tuple(
+        tuple(sorted({str(value) for value in filters.get(facet) or []})) for facet in FACET_COLUMNS
+    )
+
+
+def _conditions(key):
+    """Facet name -> IN condition, for the facets with a selection."""
+    return {
+        facet: column.in_(values)
+        for (facet, column), values in zip(FACET_COLUMNS.items(), key) if values
+    }
+
+
+def _matching(conditions, exclude=None):
+    parts = [condition for facet, condition in conditions.items() if facet != exclude]
+    return and_(*parts) if parts else true()
+
+
+def _count_matching(conditions, exclude=None):
+    return func.sum(case((_matching(conditions, exclude), 1), else_=0))
+
+
+def _facet_rows(session, key):
+    """
+    Facet counts as (facet, value, count) rows, with (None, None, total)
+    for the number of targets matching all filters.
+
+    Each facet's values are counted under the filters of the *other*
+    facets, so selecting a category still shows how many targets every
+    other category would add. All facets come from one query: GROUP BY
+    GROUPING SETS, or a UNION ALL of the same groupings on databases
+    without grouping sets (SQLite).
+    """
+    conditions = _conditions(key)
+    columns = list(FACET_COLUMNS.values())
+
+    if session.get_bind().dialect.name == "postgresql":
+        query = select(
+            *columns,
+            *[func.grouping(column) for column in columns],
+            *[_count_matching(conditions, facet) for facet in FACET_COLUMNS],
+            _count_matching(conditions)
+        ).group_by(func.grouping_sets(*[tuple_(column) for column in columns], tuple_()))
+
+        n = len(columns)
+        rows = []
+        for row in session.execute(query):
+            values, grouped, counts, total = row[:n], row[n:2 * n], row[2 * n:3 * n], row[3 * n]
+            for i, facet in enumerate(FACET_COLUMNS):
+                if grouped[i] == 0:
+                    rows.append((facet, values[i], counts[i] or 0))
+                    break
+            else:
+                rows.append((None, None, total or 0))
+        return rows
+
+    selects = [
+        select(literal(facet), column, _count_matching(conditions, facet)).group_by(column)
+        for facet, column in FACET_COLUMNS.items()
+    ]
+    selects.append(select(literal(None), literal(None), _count_matching(conditions)).select_from(Target))
+    return [(facet, value, count or 0) for facet, value, count in session.execute(union_all(*selects))]
+
+
+_facet_cache = OrderedDict()
+_facet_cache_lock = threading.Lock()
+
+
+def get_facet_counts(session, filters):
+    """
+    Facet counts for a filter state, cached per filter combination.
+
+    Args:
+        session: Database session
+        filters: Dict of facet name -> selected values
+
+    Returns:
+        Dict with one {value: count} dict per facet and 'total', the number
+        of targets matching all filters
+    """
+    key = normalize_filters(filters)
+    now = time.monotonic()
+    with _facet_cache_lock:
+        cached = _facet_cache.get(key)
+        if cached is not None and now - cached[0] < FACET_CACHE_TTL:
+            _facet_cache.move_to_end(key)
+            return cached[1]
+
+    counts = {facet: {} for facet in FACET_COLUMNS}
+    counts["total"] = 0
+    for facet, value, count in _facet_rows(session, key):
+        if facet is None:
+            counts["total"] = int(count)
+        elif value is not None:
+            counts[facet][value] = int(count)
+
+    with _facet_cache_lock:
+        _facet_cache[key] = (now, counts)
+        _facet_cache.move_to_end(key)
+        while len(_facet_cache) > FACET_CACHE_SIZE:
+            _facet_cache.popitem(last=False)
+    return counts
+
+
+def clear_facet_cache():
+    with _facet_cache_lock:
+        _facet_cache.clear()
+
+
+def search_targets(session, filters, page=0, page_size=PAGE_SIZE):
+    """
+    One page of targets matching the filters, with their activity summaries.
+
+    Returns:
+        (facet counts as from get_facet_counts(), list of (Target,
+        TargetActivitySummary or None) rows ordered by name)
+    """
+    counts = get_facet_counts(session, filters)
+    conditions = _conditions(normalize_filters(filters))
+    rows = session.query(Target, TargetActivitySummary).outerjoin(
+        TargetActivitySummary, TargetActivitySummary.target_id == Target.id
+    ).filter(_matching(conditions)).order_by(Target.name, Target.id).offset(
+        max(page, 0) * page_size
+    ).limit(page_size).all()
+    return counts, rows
+
+
+@event.listens_for(Session, "after_flush")
+def _note_target_changes(session, flush_context):
+    """Remember that targets were added, changed or deleted in this transaction."""
+    if any(isinstance(obj, Target) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["targets_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_on_target_change(session):
+    """Drop cached facet counts once target changes are committed."""
+    if session.info.pop("targets_changed", False):
+        clear_facet_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_target_changes(session):
+    session.info.pop("targets_changed", None)
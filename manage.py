@@ -0,0 +1,354 @@
+# manage.py
+"""
+Maintenance commands for the Drug Target Dashboard.
+
+Usage:
+    python manage.py compress-structures [--codec gzip|zstd] [--all-files] [--dry-run]
+    python manage.py benchmark-structures [FILE ...] [--repeat N]
+    python manage.py backfill-descriptors [--all]
+    python manage.py build-fingerprints [--kind pattern|morgan] [--rebuild]
+    python manage.py update-series [--full]
+    python manage.py backfill-pactivity [--all]
+    python manage.py rebuild-activity-summary
+    python manage.py refresh-dashboard
+    python manage.py check-callbacks
+"""
+
+import os
+import sys
+import time
+import pkgutil
+import argparse
+import importlib
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import update
+
+from app.models.database import get_session, init_db
+from app.models.structures import Structure
+from app.services.activities import update_pactivity
+from app.services.activity_summary import rebuild_target_summaries
+from app.services.callback_audit import find_ui_only_callbacks
+from app.services.compound_descriptors import update_compound_descriptors
+from app.services.compound_series import update_compound_clusters, update_compound_scaffolds
+from app.services.dashboard_rankings import DASHBOARD_CACHE_PATH, refresh_rankings
+from app.services.fingerprint_store import FingerprintStore
+from app.services.fingerprints import FINGERPRINT_KINDS
+from app.services.structure_parser import parse_pdb_text
+from app.services.structure_storage import (
+    CODEC_SUFFIXES, available_codec, compress_bytes, decompress_bytes, detect_codec,
+    read_structure_file, write_structure_file, zstandard
+)
+
+STRUCTURE_FOLDER = os.path.join("uploads", "structures")
+APP_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def _uncompressed_path(filepath):
+    for suffix in CODEC_SUFFIXES.values():
+        if suffix and filepath.endswith(suffix):
+            return filepath[:-len(suffix)]
+    return filepath
+
+
+def _recompress_file(filepath, codec):
+    """Rewrite one structure file with ``codec`` (runs in a worker process)."""
+    try:
+        with open(filepath, 'rb') as f:
+            stored = f.read()
+        if detect_codec(stored) == codec:
+            return filepath, filepath, len(stored), len(stored), None
+
+        data = decompress_bytes(stored)
+        new_path = write_structure_file(_uncompressed_path(filepath), data, codec)
+        if read_structure_file(new_path) != data:
+            raise ValueError("round-trip check failed")
+        return filepath, new_path, len(stored), os.path.getsize(new_path), None
+    except Exception as e:
+        return filepath, None, 0, 0, str(e)
+
+
+def compress_structures(args):
+    """Recompress stored structure files and point Structure.file_path at them."""
+    codec = available_codec(args.codec)
+    if args.codec and codec != args.codec.lower():
+        print(f"zstandard is not installed; using {codec} instead")
+
+    session = get_session()
+    try:
+        rows = session.query(Structure.id, Structure.file_path).filter(Structure.file_path.isnot(None)).all()
+        paths = {file_path for _, file_path in rows if os.path.exists(file_path)}
+        missing = {file_path for _, file_path in rows} - paths
+        if args.all_files and os.path.isdir(STRUCTURE_FOLDER):
+            paths.update(
+                os.path.join(STRUCTURE_FOLDER, name) for name in os.listdir(STRUCTURE_FOLDER)
+                if not name.endswith('.tmp')
+            )
+
+        if args.dry_run:
+            print(f"Would recompress {len(paths)} files with {codec} ({len(missing)} referenced files missing)")
+            return 0
+
+        renamed = {}
+        before = after = failed = 0
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            paths = sorted(paths)
+            for old_path, new_path, old_size, new_size, error in pool.map(
+                    _recompress_file, paths, [codec] * len(paths), chunksize=16):
+                if error:
+                    print(f"Error recompressing {old_path}: {error}")
+                    failed += 1
+                    continue
+                before += old_size
+                after += new_size
+                if new_path != old_path:
+                    renamed[old_path] = new_path
+
+        updates = [
+            {'id': structure_id, 'file_path': renamed[file_path]}
+            for structure_id, file_path in rows if file_path in renamed
+        ]
+        if updates:
+            session.execute(update(Structure), updates)
+        session.commit()
+
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    # Originals are only removed once the database points at the new files
+    for old_path in renamed:
+        os.remove(old_path)
+
+    print(f"Recompressed {len(renamed)} files with {codec}, updated {len(updates)} structures, {failed} failed")
+    if before:
+        print(f"Stored size: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB ({after / before:.0%})")
+    for file_path in sorted(missing):
+        print(f"Missing file: {file_path}")
+    return 1 if failed else 0
+
+
+def benchmark_structures(args):
+    """Measure read + decompress + parse throughput for each storage codec."""
+    files = args.files
+    if not files and os.path.isdir(STRUCTURE_FOLDER):
+        files = sorted(os.path.join(STRUCTURE_FOLDER, name) for name in os.listdir(STRUCTURE_FOLDER))[:args.limit]
+    if not files:
+        print("No structure files to benchmark")
+        return 1
+
+    raw = [read_structure_file(filepath) for filepath in files]
+    total = sum(len(data) for data in raw)
+    codecs = ['none', 'gzip'] + (['zstd'] if zstandard is not None else [])
+    print(f"{len(files)} files, {total / 1e6:.1f} MB uncompressed, best of {args.repeat} runs")
+    print(f"{'codec':<6} {'ratio':>7} {'decompress MB/s':>16} {'decompress+parse MB/s':>22}")
+
+    for codec in codecs:
+        stored = [compress_bytes(data, codec) for data in raw]
+        ratio = sum(len(data) for data in stored) / total
+
+        decompress_time = parse_time = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            decompressed = [decompress_bytes(data) for data in stored]
+            middle = time.perf_counter()
+            for data in decompressed:
+                parse_pdb_text(data)
+            end = time.perf_counter()
+            decompress_time = min(decompress_time, middle - start)
+            parse_time = min(parse_time, end - start)
+
+        print(
+            f"{codec:<6} {ratio:>7.1%} {total / 1e6 / max(decompress_time, 1e-9):>16.1f} "
+            f"{total / 1e6 / parse_time:>22.1f}"
+        )
+    return 0
+
+
+def backfill_descriptors(args):
+    """Compute canonical SMILES, InChIKeys and RDKit descriptors for stored compounds."""
+    init_db()
+    session = get_session()
+    try:
+        start = time.perf_counter()
+        updated, failed, duplicates = update_compound_descriptors(
+            session, only_missing=not args.all, workers=args.workers
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    print(f"Updated descriptors of {updated} compounds in {time.perf_counter() - start:.1f}s, "
+          f"{failed} with unparseable SMILES")
+    for compound_id, owner_id in duplicates:
+        print(f"Duplicate: compound {compound_id} is the same molecule as compound {owner_id}")
+    return 0
+
+
+def backfill_pactivity(args):
+    """Compute normalized pActivity values for stored compound activities."""
+    init_db()
+    session = get_session()
+    try:
+        updated, unconvertible = update_pactivity(session, only_missing=not args.all)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    print(f"Updated pActivity of {updated} activities, {unconvertible} with an unknown unit or non-positive value")
+    return 0
+
+
+def rebuild_activity_summary(args):
+    """Recompute the per-target activity summary table from scratch."""
+    init_db()
+    session = get_session()
+    try:
+        start = time.perf_counter()
+        targets = rebuild_target_summaries(session)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    print(f"Rebuilt activity summaries of {targets} targets in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def build_fingerprints(args):
+    """Build or update the on-disk fingerprint stores shared by the app workers."""
+    session = get_session()
+    try:
+        for kind in args.kind or sorted(FINGERPRINT_KINDS):
+            start = time.perf_counter()
+            store = FingerprintStore(kind)
+            if args.rebuild and os.path.exists(store.manifest_path):
+                os.remove(store.manifest_path)
+            store.sync(session)
+            print(f"{kind}: {len(store)} fingerprints in {len(store.snapshot())} segments, "
+                  f"generation {store.manifest['generation']} ({time.perf_counter() - start:.1f}s)")
+    finally:
+        session.close()
+    return 0
+
+
+def update_series(args):
+    """Compute Murcko scaffolds and Butina clusters of the compounds."""
+    init_db()
+    session = get_session()
+    try:
+        start = time.perf_counter()
+        updated, failed = update_compound_scaffolds(session, only_missing=not args.full, workers=args.workers)
+        session.commit()
+        print(f"Scaffolds of {updated} compounds ({failed} with unparseable SMILES) in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        assigned, new_clusters = update_compound_clusters(session, full=args.full, workers=args.workers)
+        session.commit()
+        print(f"Assigned {assigned} compounds to clusters, {new_clusters} new clusters in {time.perf_counter() - start:.1f}s")
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    return 0
+
+
+def refresh_dashboard(args):
+    """Recompute the dashboard rankings and write the shared cache file."""
+    init_db()
+    start = time.perf_counter()
+    rankings = refresh_rankings()
+    print(f"Ranked {len(rankings['top_targets'])} top targets, {len(rankings['recent_compounds'])} recent compounds "
+          f"in {time.perf_counter() - start:.1f}s; written to {DASHBOARD_CACHE_PATH}")
+    return 0
+
+
+def check_callbacks(args):
+    """List server callbacks that touch neither the database nor the filesystem."""
+    # app.py shares its name with the app package, so load it from its path
+    spec = importlib.util.spec_from_file_location("dashboard_app", APP_MODULE_PATH)
+    dashboard_app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(dashboard_app)
+
+    # Page modules register their callbacks with dash.callback on import
+    import app.pages
+    from dash._callback import GLOBAL_CALLBACK_MAP
+    for module in pkgutil.iter_modules(app.pages.__path__):
+        importlib.import_module(f"app.pages.{module.name}")
+
+    callback_map = dict(dashboard_app.app.callback_map)
+    callback_map.update(GLOBAL_CALLBACK_MAP)
+    flagged = find_ui_only_callbacks(callback_map)
+    for callback in flagged:
+        print(f"{callback['module']}: {callback['function']} -> {callback['output']}")
+    print(f"{len(flagged)} of {len(callback_map)} callbacks could run clientside")
+    return 1 if flagged else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drug Target Dashboard maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compress = subparsers.add_parser("compress-structures", help="Recompress stored structure files")
+    compress.add_argument("--codec", default=None, help="gzip, zstd or none (default: STRUCTURE_COMPRESSION)")
+    compress.add_argument("--all-files", action="store_true",
+                          help="Also recompress files in uploads/structures not referenced by a structure")
+    compress.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    compress.add_argument("--dry-run", action="store_true", help="Only report what would be done")
+    compress.set_defaults(func=compress_structures)
+
+    benchmark = subparsers.add_parser("benchmark-structures", help="Benchmark structure parsing per codec")
+    benchmark.add_argument("files", nargs="*", help="Structure files (default: uploads/structures)")
+    benchmark.add_argument("--limit", type=int, default=50, help="Maximum number of files from uploads/structures")
+    benchmark.add_argument("--repeat", type=int, default=3, help="Number of timed runs per codec")
+    benchmark.set_defaults(func=benchmark_structures)
+
+    descriptors = subparsers.add_parser("backfill-descriptors", help="Compute compound identifiers and descriptors")
+    descriptors.add_argument("--all", action="store_true",
+                             help="Recompute every compound, not only those without descriptors")
+    descriptors.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    descriptors.set_defaults(func=backfill_descriptors)
+
+    pactivity = subparsers.add_parser("backfill-pactivity", help="Compute normalized pActivity of activities")
+    pactivity.add_argument("--all", action="store_true", help="Recompute every activity, not only those without one")
+    pactivity.set_defaults(func=backfill_pactivity)
+
+    summary = subparsers.add_parser("rebuild-activity-summary", help="Rebuild the per-target activity summaries")
+    summary.set_defaults(func=rebuild_activity_summary)
+
+    dashboard = subparsers.add_parser("refresh-dashboard", help="Recompute the dashboard rankings")
+    dashboard.set_defaults(func=refresh_dashboard)
+
+    callbacks = subparsers.add_parser("check-callbacks", help="Flag server callbacks that could run clientside")
+    callbacks.set_defaults(func=check_callbacks)
+
+    fingerprints = subparsers.add_parser("build-fingerprints", help="Build the shared fingerprint stores")
+    fingerprints.add_argument("--kind", action="append", choices=sorted(FINGERPRINT_KINDS),
+                              help="Fingerprint kind (repeatable; default: all)")
+    fingerprints.add_argument("--rebuild", action="store_true", help="Rebuild from scratch instead of updating")
+    fingerprints.set_defaults(func=build_fingerprints)
+
+    series = subparsers.add_parser("update-series", help="Compute compound scaffolds and clusters")
+    series.add_argument("--full", action="store_true",
+                        help="Recompute all scaffolds and recluster everything instead of only new compounds")
+    series.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    series.set_defaults(func=update_series)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
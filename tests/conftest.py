@@ -0,0 +1,41 @@
+# tests/conftest.py
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers every model on Base.metadata)
+from app.models import database
+from app.services import fingerprint_store
+from app.services.target_facets import clear_facet_cache
+
+# Fixtures: no_n_plus_one fails a test that repeats a statement (an N+1 query)
+pytest_plugins = ["app.services.query_audit"]
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    """
+    In-memory SQLite database with all tables, used by get_session() and
+    SessionLocal for the duration of the test. Fingerprint stores built
+    from it are kept under tmp_path.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    database.Base.metadata.create_all(engine)
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(fingerprint_store, "FINGERPRINT_STORE_DIR", str(tmp_path / "fingerprints"))
+    monkeypatch.setattr(fingerprint_store, "_stores", {})
+    bind = database.SessionLocal.kw["bind"]
+    database.SessionLocal.configure(bind=engine)
+    clear_facet_cache()
+    yield engine
+    database.SessionLocal.configure(bind=bind)
+    clear_facet_cache()
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    session = database.get_session()
+    yield session
+    session.close()
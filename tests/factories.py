@@ -0,0 +1,46 @@
+# tests/factories.py
+"""Unsaved model instances with the required columns filled in."""
+
+from app.models.compounds import Compound, CompoundActivity
+from app.models.diseases import Disease, TargetDiseaseRelation
+from app.models.targets import Structure, Target
+from app.services.activities import apply_pactivity
+
+
+def make_target(name, **fields):
+    values = dict(
+        name=name, organism="human", category="viral", validation_status="novel",
+        priority="high", description=f"{name} description", mechanism=f"{name} mechanism"
+    )
+    values.update(fields)
+    return Target(**values)
+
+
+def make_disease(name, **fields):
+    values = dict(name=name, category="infectious", description=f"{name} description")
+    values.update(fields)
+    return Disease(**values)
+
+
+def make_compound(name, smiles="CCO", **fields):
+    values = dict(name=name, smiles=smiles, development_stage="hit")
+    values.update(fields)
+    return Compound(**values)
+
+
+def make_activity(compound, target, value=10.0, unit="nM", activity_type="IC50", **fields):
+    activity = CompoundActivity(
+        compound=compound, target=target, activity_type=activity_type,
+        activity_value=value, activity_unit=unit, **fields
+    )
+    return apply_pactivity(activity) if "pactivity" not in fields else activity
+
+
+def make_relation(target, disease, relationship_type="primary", evidence_level="moderate"):
+    return TargetDiseaseRelation(
+        target=target, disease=disease, relationship_type=relationship_type, evidence_level=evidence_level
+    )
+
+
+def make_structure(target, pdb_id, resolution=2.0, **fields):
+    return Structure(target=target, pdb_id=pdb_id, resolution=resolution, **fields)
@@ -0,0 +1,126 @@
+# tests/test_activities.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import event
+
+from app.models.compounds import CompoundActivity, TargetActivitySummary
+from app.services.activities import compute_pactivity, import_activities, validate_unit
+from app.services.activity_summary import get_target_summary, rebuild_target_summaries, refresh_target_summaries
+from tests.factories import make_activity, make_compound, make_target
+
+
+def test_compute_pactivity():
+    pactivity = compute_pactivity(
+        [100, 1, 7.5, 10, -1, 5],
+        ["nM", "µM", "", "furlongs", "nM", "mmol/L"],
+        ["IC50", "Ki", "pIC50", "IC50", "IC50", "EC50"]
+    )
+    np.testing.assert_allclose(pactivity[[0, 1, 2, 5]], [7.0, 6.0, 7.5, -np.log10(5e-3)])
+    assert np.isnan(pactivity[3]) and np.isnan(pactivity[4])
+
+
+def test_validate_unit():
+    validate_unit("uM")
+    validate_unit("", "pKi")
+    with pytest.raises(ValueError, match="Unknown activity unit"):
+        validate_unit("", "IC50")
+
+
+@pytest.fixture
+def compound_and_targets(session):
+    compound = make_compound("Aspirin", smiles="CC(=O)Oc1ccccc1C(=O)O")
+    targets = [make_target("COX-1"), make_target("COX-2")]
+    session.add_all([compound] + targets)
+    session.commit()
+    return compound.id, [target.id for target in targets]
+
+
+def test_import_activities(session, compound_and_targets):
+    compound_id, (cox1, cox2) = compound_and_targets
+    df = pd.DataFrame({
+        "Compound": ["Aspirin", "Aspirin", "Unknown", "Aspirin"],
+        "target_id": [cox1, cox2, cox1, cox1],
+        "activity_type": ["IC50", "pKi", "IC50", "IC50"],
+        "activity_value": [100, 6.5, 10, 10],
+        "activity_unit": ["nM", "", "nM", "parsecs"],
+    })
+    result = import_activities(session, df)
+    session.commit()
+
+    assert result["inserted"] == 2
+    assert result["errors"] == [
+        {"row": 3, "message": "Unknown compound"},
+        {"row": 4, "message": "Unknown activity unit"},
+    ]
+    stored = {a.target_id: a.pactivity for a in session.query(CompoundActivity)}
+    assert stored == {cox1: 7.0, cox2: 6.5}
+    # Bulk inserts refresh the summaries of their targets themselves
+    assert get_target_summary(session, cox1)["best_pactivity"] == 7.0
+    assert get_target_summary(session, cox2)["activity_count"] == 1
+
+
+def test_summaries_follow_orm_changes(session):
+    first, second = make_target("First"), make_target("Second")
+    compounds = [make_compound(f"Compound {i}", smiles="C" * (i + 1)) for i in range(3)]
+    activities = [
+        make_activity(compounds[0], first, value=1000, mechanism="inhibitor"),
+        make_activity(compounds[1], first, value=10, mechanism="allosteric"),
+        make_activity(compounds[2], second, value=1, unit="uM"),
+    ]
+    session.add_all(activities)
+    session.commit()
+
+    summary = get_target_summary(session, first.id)
+    assert (summary["compound_count"], summary["activity_count"], summary["mechanism_count"]) == (2, 2, 2)
+    assert summary["best_pactivity"] == 8.0
+
+    # Moving an activity refreshes both targets; a target left without activities loses its row
+    activities[2].target = first
+    session.commit()
+    assert get_target_summary(session, first.id)["activity_count"] == 3
+    assert session.get(TargetActivitySummary, second.id) is None
+
+    session.delete(activities[0])
+    session.commit()
+    assert get_target_summary(session, first.id)["activity_count"] == 2
+
+
+def test_rebuild_upserts_and_removes_stale_rows(session, compound_and_targets):
+    compound_id, (cox1, cox2) = compound_and_targets
+    import_activities(session, pd.DataFrame({
+        "compound_id": [compound_id], "target_id": [cox1],
+        "activity_type": ["IC50"], "activity_value": [1], "activity_unit": ["uM"],
+    }))
+    session.query(TargetActivitySummary).update({"activity_count": 99})
+    session.add(TargetActivitySummary(target_id=cox2, activity_count=5, updated_at=pd.Timestamp.utcnow()))
+    session.flush()
+
+    assert rebuild_target_summaries(session) == 1
+    session.expire_all()
+    assert get_target_summary(session, cox1)["activity_count"] == 1
+    assert session.get(TargetActivitySummary, cox2) is None
+
+
+def test_summary_rows_are_locked_before_aggregating(engine, session, compound_and_targets):
+    compound_id, (cox1, cox2) = compound_and_targets
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    try:
+        refresh_target_summaries(session, [cox2, cox1])
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # Placeholder rows, the row lock, then the aggregate in a statement of its own
+    assert [statement.split()[0] for statement in statements] == ["INSERT", "SELECT", "INSERT", "DELETE"]
+    assert "FROM targets" in statements[0] and "DO NOTHING" in statements[0]
+    assert statements[1].startswith("SELECT target_activity_summary.target_id FROM target_activity_summary")
+    assert "FROM compound_activities" in statements[2] and "DO UPDATE" in statements[2]
+    # Neither target has activities, so neither keeps a row
+    session.commit()
+    assert get_target_summary(session, cox1)["activity_count"] == 0
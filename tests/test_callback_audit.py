@@ -0,0 +1,55 @@
+# tests/test_callback_audit.py
+
+import functools
+
+import dash
+import dash_bootstrap_components as dbc
+from dash import html
+from dash.dependencies import Input, Output
+
+import manage
+from app.models.database import get_session
+from app.services.callback_audit import find_ui_only_callbacks
+
+
+@functools.lru_cache(maxsize=None)
+def cached_count():
+    session = get_session()
+    session.close()
+    return 0
+
+
+def build_alert(value):
+    return dbc.Alert(value)
+
+
+BUILDERS = {"alert": build_alert}
+
+
+def test_find_ui_only_callbacks():
+    app = dash.Dash(__name__)
+
+    @app.callback(Output("copy", "children"), Input("source", "value"))
+    def copy_value(value):
+        return value
+
+    @app.callback(Output("count", "children"), Input("source", "value"))
+    def count(value):
+        return cached_count()
+
+    @app.callback(Output("layout", "children"), Input("source", "value"))
+    def show_alert(value):
+        return html.Div(value)
+
+    @app.callback(Output("tab", "children"), Input("source", "value"))
+    def load_tab(value):
+        return BUILDERS[value](value)
+
+    flagged = find_ui_only_callbacks(app.callback_map)
+    assert [callback["function"] for callback in flagged] == ["test_find_ui_only_callbacks.<locals>.copy_value"]
+    assert flagged[0]["output"] == "copy.children"
+
+
+def test_dashboard_has_no_ui_only_callbacks(engine, capsys):
+    assert manage.main(["check-callbacks"]) == 0
+    assert "0 of" in capsys.readouterr().out
@@ -0,0 +1,77 @@
+# tests/test_callback_metrics.py
+
+import dash
+import pytest
+from dash import html
+from dash.dependencies import Input, Output
+from sqlalchemy import text
+
+from app.models.database import get_session
+from app.services import callback_metrics
+from app.services.callback_metrics import init_callback_metrics, render_metrics, reset_metrics
+
+
+@pytest.fixture
+def client(engine, monkeypatch, tmp_path):
+    monkeypatch.setattr(callback_metrics, "SLOW_CALLBACK_LOG", str(tmp_path / "slow.log"))
+    reset_metrics()
+    app = dash.Dash(__name__)
+    app.layout = html.Div([html.Button(id="button"), html.Div(id="output")])
+
+    @app.callback(Output("output", "children"), Input("button", "n_clicks"))
+    def query_twice(n_clicks):
+        session = get_session()
+        try:
+            try:
+                session.execute(text("SELECT * FROM no_such_table"))
+            except Exception:
+                session.rollback()
+            return session.execute(text("SELECT 1")).scalar()
+        finally:
+            session.close()
+
+    init_callback_metrics(app)
+    yield app.server.test_client()
+    reset_metrics()
+
+
+def dispatch(client):
+    return client.post("/_dash-update-component", json={
+        "output": "output.children",
+        "outputs": {"id": "output", "property": "children"},
+        "inputs": [{"id": "button", "property": "n_clicks", "value": 1}],
+        "changedPropIds": ["button.n_clicks"],
+        "state": []
+    })
+
+
+def test_callbacks_are_measured(client):
+    assert dispatch(client).status_code == 200
+    assert dispatch(client).status_code == 200
+
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert 'dash_callback_duration_seconds_count{callback="output.children"} 2' in metrics
+    # The failed statement counts too, and leaves nothing behind that skews the next one
+    assert 'dash_callback_sql_statements_total{callback="output.children"} 4' in metrics
+    assert 'dash_callback_errors_total{callback="output.children"} 0' in metrics
+
+
+def test_slow_callbacks_are_logged(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(callback_metrics, "SLOW_CALLBACK_SECONDS", 0.0)
+    dispatch(client)
+    log = (tmp_path / "slow.log").read_text()
+    assert '"callback": "output.children"' in log
+    assert '"button.n_clicks": "1"' in log
+
+
+def test_render_metrics_escapes_labels():
+    reset_metrics()
+    with callback_metrics._stats_lock:
+        callback_metrics._stats['a"b'] = callback_metrics.CallbackStats()
+        callback_metrics._stats['a"b'].add(0.02, 3, 0.01, 100, False)
+    try:
+        metrics = render_metrics()
+    finally:
+        reset_metrics()
+    assert 'dash_callback_duration_seconds_bucket{callback="a\\"b",le="0.025"} 1' in metrics
+    assert 'dash_callback_response_bytes_total{callback="a\\"b"} 100' in metrics
@@ -0,0 +1,37 @@
+# tests/test_compound_series.py
+
+from app.services.compound_descriptors import SERIES_COLUMNS
+from app.services.compound_series import compute_scaffolds, update_compound_clusters, update_compound_scaffolds
+from tests.factories import make_compound
+
+BENZENES = ["c1ccccc1CCO", "c1ccccc1CCN", "c1ccccc1CCC"]
+
+
+def test_compute_scaffolds():
+    murcko, generic = compute_scaffolds("c1ccccc1CC(=O)NC1CCNCC1")
+    assert murcko == "O=C(Cc1ccccc1)NC1CCNCC1"
+    assert "N" not in generic and "=" not in generic
+    assert compute_scaffolds("CCCCO")[0] == ""
+
+
+def test_edited_compounds_rejoin_the_incremental_series_update(session):
+    compounds = [make_compound(f"Compound {i}", smiles=smiles) for i, smiles in enumerate(BENZENES)]
+    session.add_all(compounds)
+    session.commit()
+    update_compound_scaffolds(session)
+    update_compound_clusters(session, similarity=0.3)
+    session.commit()
+    assert len({compound.cluster_id for compound in compounds}) == 1
+    assert compounds[2].murcko_scaffold == "c1ccccc1"
+
+    # A new SMILES clears the scaffolds and the cluster of the old molecule
+    compounds[2].smiles = "CCCCCCCCCC"
+    session.commit()
+    assert all(getattr(compounds[2], column) is None for column in SERIES_COLUMNS)
+
+    assert update_compound_scaffolds(session) == (1, 0)
+    update_compound_clusters(session, similarity=0.3)
+    session.commit()
+    assert compounds[2].murcko_scaffold == ""
+    assert compounds[2].cluster_id == compounds[2].id
+    assert compounds[0].cluster_id == compounds[1].cluster_id != compounds[2].id
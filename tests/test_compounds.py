@@ -0,0 +1,57 @@
+# tests/test_compounds.py
+
+import pandas as pd
+
+from app.models.compounds import Compound
+from app.services.compound_descriptors import compute_descriptors, find_compound_by_smiles
+from app.services.compound_import import import_compounds
+from tests.factories import make_compound
+
+ETHANOL_INCHIKEY = "LFQSCWFLJHTTHZ-UHFFFAOYSA-N"
+
+
+def test_compute_descriptors():
+    descriptors = compute_descriptors("OCC")
+    assert descriptors["canonical_smiles"] == "CCO"
+    assert descriptors["inchikey"] == ETHANOL_INCHIKEY
+    assert descriptors["molecular_formula"] == "C2H6O"
+    assert (descriptors["hbd"], descriptors["hba"]) == (1, 1)
+    assert compute_descriptors("not a smiles") is None
+
+
+def test_descriptors_follow_the_smiles(session):
+    compound = make_compound("Ethanol", smiles="OCC")
+    session.add(compound)
+    session.commit()
+    assert compound.inchikey == ETHANOL_INCHIKEY
+    assert find_compound_by_smiles(session, "C(O)C").id == compound.id
+
+    compound.smiles = "c1ccccc1"
+    session.commit()
+    assert compound.canonical_smiles == "c1ccccc1"
+    assert compound.molecular_formula == "C6H6"
+
+    # An unparseable SMILES must not keep the identifiers of the old molecule
+    compound.smiles = "C1CC"
+    session.commit()
+    assert compound.inchikey is None and compound.molecular_weight is None
+
+
+def test_import_compounds(session):
+    session.add(make_compound("Ethanol", smiles="CCO"))
+    session.commit()
+
+    df = pd.DataFrame({
+        "Name": ["Benzene", "Ethyl alcohol", "Benzene again", "Broken", "Phenol"],
+        "SMILES": ["c1ccccc1", "OCC", "C1=CC=CC=C1", "C1CC", "Oc1ccccc1"],
+        "origin": ["literature", None, None, None, "purchased"],
+    })
+    result = import_compounds(session, df)
+    session.commit()
+
+    assert result == {"inserted": 2, "duplicates": 2, "invalid": 1, "rejected": ["Broken"]}
+    stored = {compound.name: compound for compound in session.query(Compound)}
+    assert set(stored) == {"Ethanol", "Benzene", "Phenol"}
+    assert stored["Phenol"].origin == "purchased"
+    assert stored["Benzene"].development_stage == "Discovery"
+    assert stored["Benzene"].inchikey is not None
@@ -0,0 +1,45 @@
+# tests/test_database.py
+
+from sqlalchemy import inspect, text
+
+from app.models import database
+from app.models.diseases import TargetDiseaseRelation
+from tests.factories import make_disease, make_relation, make_target
+
+
+def test_upgrade_removes_duplicates_before_a_unique_index(engine, session, capsys):
+    # A database from before the unique (target, disease) index, with duplicate pairs
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_target_disease_relations_pair"))
+    target, flu, covid = make_target("Protease"), make_disease("Influenza"), make_disease("COVID-19")
+    session.add_all([
+        make_relation(target, flu, evidence_level="hypothetical"),
+        make_relation(target, covid),
+        make_relation(target, flu, evidence_level="strong"),
+    ])
+    session.commit()
+
+    database.upgrade_db()
+
+    assert "Removed 1 duplicate rows of target_disease_relations" in capsys.readouterr().out
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("target_disease_relations")}
+    assert indexes["ix_target_disease_relations_pair"]["unique"]
+    rows = session.query(TargetDiseaseRelation.disease_id, TargetDiseaseRelation.evidence_level).all()
+    assert sorted(rows) == sorted([(flu.id, "strong"), (covid.id, "moderate")])
+
+
+def test_upgrade_skips_a_unique_index_over_referenced_rows(engine, capsys):
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_compounds_inchikey"))
+        for name in ("Ethanol", "Ethyl alcohol"):
+            connection.execute(text(
+                "INSERT INTO compounds (name, smiles, inchikey, development_stage) "
+                "VALUES (:name, 'CCO', 'LFQSCWFLJHTTHZ-UHFFFAOYSA-N', 'hit')"
+            ), {"name": name})
+
+    database.upgrade_db()
+
+    assert "Not creating unique index ix_compounds_inchikey" in capsys.readouterr().out
+    assert "ix_compounds_inchikey" not in {index["name"] for index in inspect(engine).get_indexes("compounds")}
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM compounds")).scalar() == 2
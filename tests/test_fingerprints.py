@@ -0,0 +1,130 @@
+# tests/test_fingerprints.py
+
+import numpy as np
+from rdkit import Chem, DataStructs
+from rdkit.Chem import rdMolDescriptors
+
+from app.services.compound_series import butina, neighbour_pairs
+from sqlalchemy import insert
+
+from app.models.compounds import Compound
+from app.services import fingerprint_store
+from app.services.fingerprint_store import FingerprintStore, get_store
+from app.services.fingerprints import MORGAN_FP_BITS, MORGAN_RADIUS, morgan_fingerprint, popcount_rows
+from app.services.similarity_search import similarity_search, tanimoto, top_k
+from app.services.substructure_search import substructure_search
+from tests.factories import make_compound
+
+SMILES = ["c1ccccc1O", "c1ccccc1N", "c1ccccc1C", "CCCCCCO", "CCCCCCN", "C1CCNCC1", "CC(=O)Oc1ccccc1C(=O)O"]
+
+
+def fingerprints(smiles):
+    mols = [Chem.MolFromSmiles(s) for s in smiles]
+    fps = np.stack([morgan_fingerprint(mol) for mol in mols])
+    bit_vects = [rdMolDescriptors.GetMorganFingerprintAsBitVect(mol, MORGAN_RADIUS, nBits=MORGAN_FP_BITS) for mol in mols]
+    return fps, bit_vects
+
+
+def test_popcount_and_tanimoto_match_rdkit():
+    fps, bit_vects = fingerprints(SMILES)
+    counts = popcount_rows(fps)
+    assert counts.tolist() == [bit_vect.GetNumOnBits() for bit_vect in bit_vects]
+
+    scores = tanimoto(fps, counts, fps[0], int(counts[0]))
+    np.testing.assert_allclose(scores, DataStructs.BulkTanimotoSimilarity(bit_vects[0], bit_vects), rtol=1e-6)
+    assert top_k(scores, 3)[0] == 0
+    assert len(top_k(scores, 10, threshold=0.3)) == int((scores >= 0.3).sum())
+
+
+def test_neighbour_pairs_and_butina():
+    fps, bit_vects = fingerprints(SMILES)
+    counts = popcount_rows(fps)
+    order = np.argsort(counts, kind="stable")
+    fps, counts = fps[order], counts[order]
+    similarity = 0.3
+
+    rows, cols = neighbour_pairs(fps, counts, similarity, workers=1)
+    expected = {
+        (i, j) for i in range(len(SMILES)) for j in range(i + 1, len(SMILES))
+        if DataStructs.TanimotoSimilarity(bit_vects[order[i]], bit_vects[order[j]]) >= similarity
+    }
+    assert set(zip(rows.tolist(), cols.tolist())) == expected
+
+    centroids = butina(len(SMILES), rows, cols)
+    # Every compound is a centroid or a neighbour of its centroid
+    for i, centroid in enumerate(centroids.tolist()):
+        assert centroid == i or (min(i, centroid), max(i, centroid)) in expected
+        assert centroids[centroid] == centroid
+
+
+def test_butina_picks_the_densest_centroid_first():
+    # 0 - 1 - 2 - 3: rows 1 and 2 have two neighbours each, 1 wins the tie
+    centroids = butina(5, np.array([0, 1, 2]), np.array([1, 2, 3]))
+    assert centroids.tolist() == [1, 1, 1, 3, 4]
+
+
+def live_ids(store):
+    return sorted(np.concatenate([
+        segment.ids if alive is None else segment.ids[alive] for segment, alive in store.snapshot()
+    ]).tolist())
+
+
+def test_fingerprint_store_follows_committed_changes(session):
+    compounds = [make_compound(f"Compound {i}", smiles=smiles) for i, smiles in enumerate(SMILES[:4])]
+    session.add_all(compounds)
+    session.commit()
+    store = get_store("morgan", session)
+    assert len(store) == 4
+
+    # Committed additions, deletions and edits update the store without waiting for the next sync
+    piperidine = make_compound("Piperidine", smiles=SMILES[5])
+    session.add(piperidine)
+    session.delete(compounds[0])
+    compounds[1].smiles = SMILES[6]
+    session.commit()
+    assert live_ids(store) == sorted(c.id for c in compounds[1:] + [piperidine])
+    assert store.snapshot()[-1][0].smiles.take([0]) == [Chem.MolToSmiles(Chem.MolFromSmiles(SMILES[6]))]
+
+    # Another process sees the same store through the manifest
+    reader = FingerprintStore("morgan")
+    reader.reload()
+    assert live_ids(reader) == live_ids(store)
+
+
+def test_fingerprint_store_checks_the_table_after_the_sync_interval(session, monkeypatch):
+    session.add(make_compound("Phenol", smiles=SMILES[0]))
+    session.commit()
+    store = get_store("morgan", session)
+
+    # A Core insert outside the ORM, e.g. from another tool
+    session.execute(insert(Compound), [{"name": "Hexanol", "smiles": SMILES[3], "development_stage": "hit"}])
+    session.commit()
+    assert len(get_store("morgan", session)) == 1
+    monkeypatch.setattr(fingerprint_store, "FINGERPRINT_SYNC_INTERVAL", 0)
+    assert len(get_store("morgan", session)) == 2
+
+
+def test_similarity_search_sees_edited_smiles(session):
+    compounds = [make_compound(f"Compound {i}", smiles=smiles) for i, smiles in enumerate(SMILES)]
+    session.add_all(compounds)
+    session.commit()
+    aspirin = compounds[-1]
+    assert similarity_search(session, SMILES[-1], k=1)["ids"] == [aspirin.id]
+
+    aspirin.smiles = "CCCCCCCC"
+    session.commit()
+    result = similarity_search(session, SMILES[-1], k=len(SMILES))
+    assert result["ids"][0] != aspirin.id
+    assert result["scores"][result["ids"].index(aspirin.id)] < 0.2
+    assert similarity_search(session, "CCCCCCCC", k=1)["ids"] == [aspirin.id]
+
+
+def test_substructure_screen_sees_edited_smiles(session):
+    compound = make_compound("Benzene", smiles="c1ccccc1")
+    session.add(compound)
+    session.commit()
+    assert compound.id in substructure_search(session, "c1ccccc1")["ids"]
+
+    compound.smiles = "CCCCCC"
+    session.commit()
+    assert compound.id not in substructure_search(session, "c1ccccc1")["ids"]
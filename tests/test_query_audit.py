@@ -0,0 +1,62 @@
+# tests/test_query_audit.py
+
+import pytest
+
+from app.models.targets import Target
+from app.services.query_audit import (
+    NPlusOneError, NPlusOneWarning, QueryAudit, detect_n_plus_one, normalize_sql
+)
+from tests.factories import make_structure, make_target
+
+
+@pytest.fixture
+def target_ids(session):
+    targets = [make_target(f"Target {i}") for i in range(4)]
+    session.add_all(make_structure(target, f"{i + 1}XYZ") for i, target in enumerate(targets))
+    session.commit()
+    ids = [target.id for target in targets]
+    session.expunge_all()
+    return ids
+
+
+def test_normalize_sql_replaces_literals_and_in_lists():
+    assert normalize_sql("SELECT * FROM t WHERE id = 42 AND name = 'it''s'") == \
+        "SELECT * FROM t WHERE id = ? AND name = ?"
+    assert normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?)") == \
+        normalize_sql("SELECT * FROM t WHERE id IN (%(id_1)s)") == "SELECT * FROM t WHERE id IN (...)"
+    assert normalize_sql("SELECT *\n  FROM t LIMIT 10 OFFSET 20") == "SELECT * FROM t LIMIT ? OFFSET ?"
+
+
+def test_lazy_loop_raises(session, target_ids):
+    with pytest.raises(NPlusOneError, match="possible N\\+1 query"):
+        with detect_n_plus_one(threshold=2, label="loop"):
+            for target in session.query(Target).all():
+                target.structures
+
+
+def test_lazy_loop_warns_once(session, target_ids):
+    with pytest.warns(NPlusOneWarning) as record:
+        with detect_n_plus_one(threshold=2, mode="warn") as audit:
+            for target in session.query(Target).all():
+                target.structures
+    assert len(record) == 1
+    assert list(audit.repeated().values()) == [len(target_ids)]
+
+
+def test_statements_under_threshold_pass(session, target_ids):
+    with detect_n_plus_one(threshold=len(target_ids)) as audit:
+        for target_id in target_ids:
+            session.get(Target, target_id)
+    assert audit.repeated() == {}
+
+
+def test_statements_outside_the_block_are_not_counted(session, target_ids):
+    with detect_n_plus_one() as audit:
+        pass
+    session.query(Target).all()
+    assert not audit.counts
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        QueryAudit(mode="loud")
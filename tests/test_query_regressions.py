@@ -0,0 +1,74 @@
+# tests/test_query_regressions.py
+"""
+Views that used to run one query per row. Each test seeds more rows than
+N_PLUS_ONE_THRESHOLD, so a per-row query fails it through no_n_plus_one.
+"""
+
+import dash
+import pytest
+
+from app.components.relationship_manager import RelationshipManager
+from app.components.target_browser import get_target_page
+from app.pages.structures_page import get_structure_data
+from app.services.query_audit import N_PLUS_ONE_THRESHOLD
+from app.services.target_dossier import load_target_dossier
+from tests.factories import (
+    make_activity, make_compound, make_disease, make_relation, make_structure, make_target
+)
+
+N_ROWS = N_PLUS_ONE_THRESHOLD + 3
+
+
+@pytest.fixture
+def seeded(session):
+    """IDs of N_ROWS targets, each with a disease relation, a structure and two activities."""
+    targets = [make_target(f"Target {i}") for i in range(N_ROWS)]
+    compounds = [make_compound(f"Compound {i}", smiles="C" * (i + 1)) for i in range(N_ROWS)]
+    for i, target in enumerate(targets):
+        session.add(make_relation(target, make_disease(f"Disease {i}")))
+        session.add(make_structure(target, f"{i + 1}ABC", resolution=1.5 + i / 10))
+        session.add(make_activity(compounds[i], target, value=10.0 * (i + 1)))
+        session.add(make_activity(compounds[-1 - i], target, value=5.0))
+    session.commit()
+    return [target.id for target in targets]
+
+
+@pytest.fixture
+def relationship_manager():
+    return RelationshipManager(dash.Dash(__name__))
+
+
+def test_target_disease_table(seeded, relationship_manager, no_n_plus_one):
+    table = relationship_manager._render_target_disease_table()
+    assert len(table.data) == N_ROWS
+    assert {row["disease_name"] for row in table.data} == {f"Disease {i}" for i in range(N_ROWS)}
+
+
+def test_activity_table(seeded, relationship_manager, no_n_plus_one):
+    table = relationship_manager._render_activity_table()
+    assert len(table.data) == 2 * N_ROWS
+    assert all(row["compound_name"].startswith("Compound") for row in table.data)
+    assert all(row["target_name"].startswith("Target") for row in table.data)
+
+
+def test_structure_data(seeded, no_n_plus_one):
+    data = get_structure_data()
+    assert len(data) == N_ROWS
+    assert {row["pdb_id"] for row in data} == {f"{i + 1}ABC" for i in range(N_ROWS)}
+    assert all(row["target_name"].startswith("Target") for row in data)
+
+
+def test_target_page(seeded, no_n_plus_one):
+    data, counts = get_target_page({"category": ["viral"]})
+    assert counts["total"] == N_ROWS
+    assert len(data) == min(N_ROWS, 10)
+    assert all(row["compound_count"] == 2 for row in data)
+
+
+def test_target_dossier_is_one_query(seeded, session, no_n_plus_one):
+    dossier = load_target_dossier(session, seeded[0])
+    assert sum(no_n_plus_one.counts.values()) == 1
+    assert dossier["name"] == "Target 0"
+    assert [structure["pdb_id"] for structure in dossier["structures"]] == ["1ABC"]
+    assert [disease["name"] for disease in dossier["diseases"]] == ["Disease 0"]
+    assert len(dossier["activities"]) == 2
@@ -0,0 +1,109 @@
+# tests/test_structure_ingest.py
+
+import gzip
+import zipfile
+
+import pytest
+
+from app.models.targets import Structure
+from app.services import structure_ingest
+from app.services.jobs import JobReporter
+from app.services.structure_ingest import extract_metadata, ingest_structure_archive
+from app.services.structure_storage import decompress_bytes
+from tests.factories import make_structure, make_target
+
+ATOMS = "".join(
+    f"ATOM  {i + 1:5d}  CA  ALA A{i + 1:4d}    {x:8.3f}{0.0:8.3f}{0.0:8.3f}  1.00  0.00           C\n"
+    for i, x in enumerate([0.0, 3.8, 7.6, 11.4])
+)
+
+
+@pytest.mark.parametrize("filename, pdb_id", [
+    ("1abc.pdb", "1ABC"),
+    ("pdb1abc.ent.gz", "1ABC"),
+    ("1abc_chainA.pdb", "1ABC"),
+    ("model_4hhb_relaxed.pdb", "4HHB"),
+    ("2024_1abc.pdb", "1ABC"),
+    ("2024.pdb", None),
+    ("11abcd.pdb", None),
+])
+def test_pdb_id_from_filename(filename, pdb_id):
+    assert extract_metadata(ATOMS.encode(), filename)["pdb_id"] == pdb_id
+
+
+def test_metadata_from_header():
+    header = (
+        f"{'HEADER    HYDROLASE':<50}01-JAN-00   2xyz              \n"
+        "TITLE     A PROTEASE                                                            \n"
+        "REMARK   2 RESOLUTION.    1.85 ANGSTROMS.                                       \n"
+    )
+    metadata = extract_metadata((header + ATOMS).encode(), "3abc.pdb")
+    assert metadata == {"pdb_id": "2XYZ", "resolution": 1.85, "description": "A PROTEASE"}
+
+
+def test_ingest_archive(session, tmp_path, monkeypatch):
+    # Extracted files, the parse cache and job files all go under tmp_path
+    monkeypatch.chdir(tmp_path)
+    target = make_target("Protease")
+    session.add_all([target, make_structure(target, "2DEF", file_path=None)])
+    session.commit()
+    target_id = target.id
+
+    archive_path = tmp_path / "structures.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("1abc.pdb", ATOMS)
+        archive.writestr("models/1abc_chainA.pdb", ATOMS)
+        archive.writestr("2def.pdb", ATOMS)
+        archive.writestr("3ghi.pdb", ATOMS)
+        archive.writestr("empty_9zzz.pdb", "REMARK nothing here\n")
+
+    job = {"id": "test", "items": [], "progress": 0, "total": 0}
+    mapping = f"pdb_id,target_id\n1ABC,{target_id}\n9ZZZ,{target_id}\n"
+    ingest_structure_archive(JobReporter(job), str(archive_path), mapping, upload_folder="structures")
+
+    # Every file was reported as it finished parsing
+    assert job["progress"] == job["total"] == 5
+    statuses = {item["file"]: item["status"] for item in job["items"]}
+    # The second file of the same (target, PDB ID) is a duplicate, whichever finished first
+    assert sorted([statuses.pop("1abc.pdb"), statuses.pop("models/1abc_chainA.pdb")]) == ["duplicate", "inserted"]
+    assert statuses == {"2def.pdb": "updated", "3ghi.pdb": "unmatched", "empty_9zzz.pdb": "error"}
+
+    session.expire_all()
+    structures = {s.pdb_id: s for s in session.query(Structure)}
+    assert set(structures) == {"1ABC", "2DEF"}
+    assert all(s.file_path and s.target_id == target_id for s in structures.values())
+    # Files that weren't registered are removed again
+    assert len(list((tmp_path / "structures").iterdir())) == 2
+
+
+def test_ingest_rejects_compressed_members_over_the_size_limit(session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(structure_ingest, "MAX_MEMBER_BYTES", 10_000)
+    target = make_target("Protease")
+    session.add(target)
+    session.commit()
+
+    archive_path = tmp_path / "structures.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        # Well under the limit compressed, far over it decompressed
+        archive.writestr("pdb1abc.ent.gz", gzip.compress(ATOMS.encode() + b"REMARK\n" * 100_000))
+        archive.writestr("pdb2abc.ent.gz", b"\x1f\x8bnot really gzip")
+        archive.writestr("pdb3abc.ent.gz", gzip.compress(ATOMS.encode()))
+
+    job = {"id": "test", "items": [], "progress": 0, "total": 0}
+    mapping = f"pdb_id,target_id\n1ABC,{target.id}\n3ABC,{target.id}\n"
+    ingest_structure_archive(JobReporter(job), str(archive_path), mapping, upload_folder="structures")
+
+    messages = {item["file"]: (item["status"], item["message"]) for item in job["items"]}
+    assert messages["pdb1abc.ent.gz"] == ("error", "File too large when decompressed")
+    assert messages["pdb2abc.ent.gz"][1].startswith("Decompression error")
+    assert messages["pdb3abc.ent.gz"] == ("inserted", None)
+
+
+def test_decompress_bytes_limit():
+    data = gzip.compress(b"x" * 1000)
+    assert decompress_bytes(data, max_size=1000) == b"x" * 1000
+    with pytest.raises(ValueError):
+        decompress_bytes(data, max_size=999)
+    with pytest.raises(ValueError):
+        decompress_bytes(b"x" * 1000, max_size=999)
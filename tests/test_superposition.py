@@ -0,0 +1,125 @@
+# tests/test_superposition.py
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services import structure_parser, superposition
+from app.services.superposition import RMSDCache, compare_structures, kabsch_batch, rmsd_matrix
+
+
+def rotation(angle, axis):
+    axis = np.asarray(axis, dtype=float) / np.linalg.norm(axis)
+    k = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+    return np.eye(3) + np.sin(angle) * k + (1 - np.cos(angle)) * k @ k
+
+
+def test_kabsch_recovers_a_rigid_motion():
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=(2, 20, 3)) * 5
+    mobile = np.stack([
+        reference[0] @ rotation(0.7, [1, 2, 3]).T + [1, -2, 3],
+        reference[1] @ rotation(2.5, [0, 0, 1]).T,
+    ])
+    rotations, translations, rmsd = kabsch_batch(mobile, reference)
+
+    np.testing.assert_allclose(rmsd, 0, atol=1e-6)
+    superposed = np.einsum("bni,bij->bnj", mobile, rotations) + translations[:, None, :]
+    np.testing.assert_allclose(superposed, reference, atol=1e-6)
+    # Proper rotations only, never reflections
+    np.testing.assert_allclose(np.linalg.det(rotations), 1)
+
+
+def test_kabsch_cannot_superpose_a_mirror_image():
+    reference = np.array([[[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]]], dtype=float)
+    mirrored = reference * [1, 1, -1]
+    _, _, rmsd = kabsch_batch(mirrored, reference)
+    assert rmsd[0] > 0.1
+
+
+def test_rmsd_matrix_matches_pairwise_kabsch(monkeypatch):
+    rng = np.random.default_rng(1)
+    coords = rng.normal(size=(6, 15, 3))
+    expected = np.zeros((6, 6))
+    for i in range(6):
+        for j in range(6):
+            expected[i, j] = kabsch_batch(coords[[i]], coords[[j]])[2][0]
+
+    # Several chunks, the last one partial
+    monkeypatch.setattr(superposition, "RMSD_PAIR_CHUNK", 4)
+    matrix, n_matched = rmsd_matrix(coords)
+    np.testing.assert_allclose(matrix, expected, atol=1e-6)
+    np.testing.assert_allclose(matrix, matrix.T)
+    assert (n_matched == 15).all()
+    assert rmsd_matrix(coords[:1])[0].shape == (1, 1)
+
+
+def test_a_fragment_only_shortens_its_own_pairs():
+    rng = np.random.default_rng(2)
+    coords = rng.normal(size=(4, 20, 3))
+    mask = np.ones((4, 20), dtype=bool)
+    mask[3, 5:] = False  # a 5-residue fragment
+    mask[2, :2] = False
+
+    matrix, n_matched = rmsd_matrix(coords, mask)
+
+    for i, j in [(0, 1), (0, 2), (1, 2), (0, 3), (2, 3)]:
+        shared = mask[i] & mask[j]
+        expected = kabsch_batch(coords[[i]][:, shared], coords[[j]][:, shared])[2][0]
+        np.testing.assert_allclose(matrix[i, j], expected, atol=1e-6)
+        assert n_matched[i, j] == n_matched[j, i] == shared.sum()
+    assert n_matched[0, 1] == 20
+    assert n_matched[2, 3] == 3
+
+
+def test_pairs_sharing_too_few_atoms_are_nan():
+    coords = np.random.default_rng(3).normal(size=(3, 10, 3))
+    mask = np.ones((3, 10), dtype=bool)
+    mask[1, 5:] = False
+    mask[2, :7] = False
+
+    matrix, n_matched = rmsd_matrix(coords, mask)
+
+    assert np.isnan(matrix[1, 2]) and np.isnan(matrix[2, 1])
+    assert n_matched[1, 2] == 0
+    assert not np.isnan(matrix[0, 1]) and not np.isnan(matrix[0, 2])
+
+
+def test_rmsd_memory_cache_is_bounded(tmp_path):
+    cache = RMSDCache(cache_dir=str(tmp_path), maxsize=2)
+    for name in ("a", "b", "c"):
+        cache.put(cache.key([name]), np.zeros((2, 2)), np.zeros((2, 2), dtype=int))
+
+    assert len(cache._items._items) == 2
+    # Evicted from memory, still on disk
+    assert cache.get(cache.key(["a"])) is not None
+
+
+def write_pdb(path, residues, offset=0.0):
+    lines = [
+        f"ATOM  {n:5d}  CA  ALA A{n:4d}    {n * 3.8 + offset:8.3f}{(n % 3) * 1.5:8.3f}{(n % 2) * 2.0:8.3f}  1.00  0.00           C"
+        for n in residues
+    ]
+    path.write_text("\n".join(lines) + "\nEND\n")
+    return str(path)
+
+
+def test_compare_structures_skips_structures_with_too_few_c_alphas(tmp_path, monkeypatch):
+    monkeypatch.setattr(structure_parser, "STRUCTURE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(superposition, "rmsd_cache", RMSDCache(cache_dir=str(tmp_path / "rmsd")))
+    structures = [
+        SimpleNamespace(id=1, pdb_id="1AAA", file_path=write_pdb(tmp_path / "a.pdb", range(1, 30))),
+        SimpleNamespace(id=2, pdb_id="2BBB", file_path=write_pdb(tmp_path / "b.pdb", range(1, 30), 0.5)),
+        SimpleNamespace(id=3, pdb_id="3CCC", file_path=write_pdb(tmp_path / "c.pdb", range(10, 20), 1.0)),
+        SimpleNamespace(id=4, pdb_id="4DDD", file_path=write_pdb(tmp_path / "d.pdb", [40, 41])),
+        SimpleNamespace(id=5, pdb_id=None, file_path=None),
+    ]
+
+    result = compare_structures(structures)
+
+    assert result['labels'] == ["1AAA", "2BBB", "3CCC"]
+    assert result['skipped'] == ["4DDD (too few C-alpha atoms)", "#5 (no file)"]
+    # The fragment doesn't shrink the full-length pair
+    assert result['n_matched'][0][1] == 29
+    assert result['n_matched'][0][2] == result['n_matched'][1][2] == 10
+    assert all(value is not None for row in result['matrix'] for value in row)
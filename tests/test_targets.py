@@ -0,0 +1,92 @@
+# tests/test_targets.py
+
+import pytest
+
+from app.components.target_browser import facet_options
+from app.models.diseases import TargetDiseaseRelation
+from app.services.target_diseases import get_target_disease_rows, set_target_diseases
+from app.services.target_facets import get_facet_counts, normalize_filters, search_targets
+from tests.factories import make_disease, make_target
+
+
+@pytest.fixture
+def targets(session):
+    session.add_all([
+        make_target("Alpha", category="viral", priority="high"),
+        make_target("Beta", category="viral", priority="low"),
+        make_target("Gamma", category="fungal", priority="high"),
+        make_target("Delta", category="cardiovascular", priority="medium", validation_status="established"),
+    ])
+    session.commit()
+
+
+def test_normalize_filters():
+    assert normalize_filters({"priority": ["low", "high", "low"], "unknown": ["x"]}) == ((), (), ("high", "low"))
+    assert normalize_filters(None) == ((), (), ())
+
+
+def test_facet_counts_ignore_their_own_filter(session, targets):
+    counts = get_facet_counts(session, {"category": ["viral"], "priority": ["high"]})
+    assert counts["total"] == 1
+    # Every category is counted under the priority filter only, and vice versa
+    assert counts["category"] == {"viral": 1, "fungal": 1, "cardiovascular": 0}
+    assert counts["priority"] == {"high": 1, "low": 1, "medium": 0}
+    assert counts["validation_status"] == {"novel": 1, "established": 0}
+
+
+def test_facet_counts_are_cleared_by_target_writes(session, targets):
+    assert get_facet_counts(session, {})["total"] == 4
+    session.add(make_target("Epsilon"))
+    session.commit()
+    assert get_facet_counts(session, {})["total"] == 5
+
+
+def test_search_targets_pages_by_name(session, targets):
+    counts, rows = search_targets(session, {"category": ["viral", "fungal"]}, page=1, page_size=2)
+    assert counts["total"] == 3
+    assert [target.name for target, summary in rows] == ["Gamma"]
+    assert all(summary is None for target, summary in rows)
+
+
+def test_facet_options_keep_selected_values():
+    options = facet_options({"viral": 2, "Fungal": 1}, selected=["bacterial"])
+    assert options == [
+        {"label": "bacterial (0)", "value": "bacterial"},
+        {"label": "Fungal (1)", "value": "Fungal"},
+        {"label": "viral (2)", "value": "viral"},
+    ]
+
+
+@pytest.fixture
+def target_and_diseases(session):
+    target = make_target("Protease")
+    diseases = [make_disease(name) for name in ("Influenza", "COVID-19", "Hepatitis C")]
+    session.add_all([target] + diseases)
+    session.commit()
+    return target.id, [disease.id for disease in diseases]
+
+
+def test_set_target_diseases_writes_the_difference(session, target_and_diseases):
+    target_id, (flu, covid, hcv) = target_and_diseases
+    assert set_target_diseases(session, target_id, [flu, covid], evidence_level="strong") == ([flu, covid], [])
+    session.commit()
+    relation_id = session.query(TargetDiseaseRelation.id).filter_by(disease_id=flu).scalar()
+
+    assert set_target_diseases(session, target_id, [flu, hcv]) == ([hcv], [covid])
+    session.commit()
+    rows = get_target_disease_rows(session, target_id)
+    assert [(row["disease_name"], row["evidence_level"]) for row in rows] == [
+        ("Hepatitis C", "moderate"), ("Influenza", "strong")
+    ]
+    # Kept pairs are not rewritten
+    assert session.query(TargetDiseaseRelation.id).filter_by(disease_id=flu).scalar() == relation_id
+
+
+def test_set_target_diseases_rejects_unknown_ids(session, target_and_diseases):
+    target_id, disease_ids = target_and_diseases
+    with pytest.raises(ValueError, match="Unknown disease IDs: 999"):
+        set_target_diseases(session, target_id, disease_ids + [999])
+    with pytest.raises(ValueError, match="Target not found"):
+        set_target_diseases(session, 999, disease_ids)
+    with pytest.raises(ValueError, match="relationship type"):
+        set_target_diseases(session, target_id, disease_ids, relationship_type="causal")